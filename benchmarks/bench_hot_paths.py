@@ -0,0 +1,264 @@
+"""
+Hot Path Benchmarks
+Times the code that runs per message, per tick or per frame, and saves
+the results as JSON so two commits can be compared.
+
+    movement      movement_step() and one Room.simulate() of every player
+    snapshot      Room.tick() (simulate, record, build every client's
+                  frame) and json.dumps of a full JSON snapshot
+    client        json.loads of a JSON snapshot and
+                  NetworkClient._process_messages for both protocols
+    config        ConfigManager.get() and a property read
+    draw          GameScreen.draw() under the SDL dummy video driver, a full
+                  repaint and an idle frame where nothing moved
+
+Sized benchmarks run with 8, 64 and 512 players. Times are the best of
+five runs, in microseconds per call.
+
+Usage:
+    python benchmarks/bench_hot_paths.py
+    python benchmarks/bench_hot_paths.py --only draw,client
+    python benchmarks/bench_hot_paths.py --compare benchmarks/results/hot_paths-abc1234.json
+"""
+
+import argparse
+import copy
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from config.defaults import DEFAULT_CONFIG
+from game.constants import MOVE_RIGHT, MOVE_UP
+from game.movement import movement_step
+from game.multiplayer.client import NetworkClient
+from game.multiplayer.protocol import PROTOCOL_JSON, BINARY_VERSION, encode_snapshot
+from library.config_manager import ConfigManager
+from server.connection import Connection
+from server.room import Room
+from server.server_config import DEFAULT_SERVER_CONFIG
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+PLAYER_COUNTS = (8, 64, 512)
+GROUPS = ("movement", "snapshot", "client", "config", "draw")
+
+
+def bench(fn):
+    """Best-of-5 time per call in microseconds, with the call count calibrated to ~0.2 s per run."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def make_config():
+    """ConfigManager with the default settings, without load() writing settings.yaml."""
+    config = ConfigManager.__new__(ConfigManager)
+    config._config = copy.deepcopy(DEFAULT_CONFIG)
+    return config
+
+
+def make_room(count, protocol=BINARY_VERSION):
+    """A room of `count` moving players, every client acking the previous tick."""
+    server_config = SimpleNamespace(**DEFAULT_SERVER_CONFIG)
+    room = Room("bench", count, server_config)
+    for pid in range(1, count + 1):
+        connection = Connection(None, ("127.0.0.1", pid), pid, server_config.max_lag_ticks)
+        connection.protocol = protocol
+        room.add_player(connection, f"Player{pid}", f"client-{pid}")
+        # Half the players move each tick, so deltas carry real changes
+        if pid % 2:
+            room.movement[pid] = MOVE_RIGHT
+            room.applied[pid] = [1, 0]
+    return room
+
+
+def room_tick(room):
+    for connection in room.connections.values():
+        connection.ack = room.tick_count or None
+    return room.tick()
+
+
+def make_snapshot(count):
+    """JSON snapshot dict as the server sends it."""
+    return {
+        "tick": 100, "base": None, "removed": [],
+        "players": {str(pid): {"x": 400.0 + pid, "y": 300.0 - pid, "name": f"Player{pid}"} for pid in range(1, count + 1)}
+    }
+
+
+def make_client(protocol):
+    client = NetworkClient(use_binary=protocol == BINARY_VERSION)
+    client.protocol = protocol
+    client.player_id = 1
+    client._send = lambda data: None  # Acks have nowhere to go
+    return client
+
+
+def process(client, messages):
+    # Every call is a new tick, as on a live connection
+    client.latest_tick = None
+    client.snapshots.clear()
+    client.snapshot_ticks.clear()
+    client._process_messages(messages)
+
+
+class DrawClient:
+    """The part of NetworkClient GameScreen reads, serving a fixed player table."""
+
+    def __init__(self, players):
+        self.players = players
+        self.player_id = 1
+        self.tick_rate = None
+        self.player_speed = None
+
+    def get_players(self):
+        return dict(self.players)
+
+    def get_interpolated_players(self, delay):
+        return dict(self.players)
+
+    def get_roster_version(self):
+        return 1
+
+    def get_roster(self):
+        return {pid: player["name"] for pid, player in self.players.items()}
+
+    def get_rtt(self):
+        return 0.012
+
+    def is_connected(self):
+        return True
+
+
+def bench_movement(results):
+    results["movement_step"] = bench(lambda: movement_step(MOVE_UP | MOVE_RIGHT, 5, 2.0))
+    for count in PLAYER_COUNTS:
+        room = make_room(count)
+        results[f"room_simulate[{count}]"] = bench(room.simulate)
+
+
+def bench_snapshot(results):
+    for count in PLAYER_COUNTS:
+        for protocol, name in ((BINARY_VERSION, "binary"), (PROTOCOL_JSON, "json")):
+            room = make_room(count, protocol)
+            room_tick(room)
+            results[f"room_tick_{name}[{count}]"] = bench(lambda: room_tick(room))
+        snapshot = make_snapshot(count)
+        results[f"json_dumps_snapshot[{count}]"] = bench(lambda: json.dumps(snapshot).encode())
+
+
+def bench_client(results):
+    for count in PLAYER_COUNTS:
+        snapshot = make_snapshot(count)
+        payload = json.dumps(snapshot).encode()
+        results[f"json_loads_snapshot[{count}]"] = bench(lambda: json.loads(payload))
+        client = make_client(PROTOCOL_JSON)
+        results[f"client_process_json[{count}]"] = bench(lambda: process(client, [payload]))
+        binary = encode_snapshot(100, [(pid, 400.0 + pid, 300.0 - pid) for pid in range(1, count + 1)])
+        client = make_client(BINARY_VERSION)
+        results[f"client_process_binary[{count}]"] = bench(lambda: process(client, [binary]))
+
+
+def bench_config(results):
+    config = make_config()
+    results["config_get"] = bench(lambda: config.get("multiplayer.input_rate"))
+    results["config_resolution"] = bench(lambda: config.resolution)
+
+
+def bench_draw(results):
+    import pygame
+    from gui.screens.game_screen import GameScreen
+
+    pygame.init()
+    config = make_config()
+    screen = pygame.display.set_mode(config.resolution)
+    for count in PLAYER_COUNTS:
+        players = {
+            str(pid): {"x": 40.0 + (pid * 37) % 700, "y": 130.0 + (pid * 53) % 380, "name": f"Player{pid}"}
+            for pid in range(1, count + 1)
+        }
+        game_screen = GameScreen(screen, config, DrawClient(players), False, None)
+        def full_frame():
+            game_screen.invalidate()
+            game_screen.draw()
+
+        results[f"game_screen_draw[{count}]"] = bench(full_frame)
+        results[f"game_screen_draw_idle[{count}]"] = bench(game_screen.draw)
+    pygame.quit()
+
+
+def commit_id():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    old_results = baseline["results"]
+    print(f"\nvs {baseline_path} ({baseline.get('commit', '?')})")
+    print(f"{'benchmark':<32} {'old us':>12} {'new us':>12} {'change':>8}")
+    for name, new in results.items():
+        old = old_results.get(name)
+        if old is None:
+            print(f"{name:<32} {'-':>12} {new:>12.2f} {'new':>8}")
+            continue
+        print(f"{name:<32} {old:>12.2f} {new:>12.2f} {(new - old) / old * 100:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-message and per-frame hot paths")
+    parser.add_argument('--only', help=f"Comma-separated groups to run: {', '.join(GROUPS)} (default: all)")
+    parser.add_argument('-o', '--output', help="Results file (default: benchmarks/results/hot_paths-<commit>.json)")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    results = {}
+    runners = {
+        "movement": bench_movement, "snapshot": bench_snapshot, "client": bench_client,
+        "config": bench_config, "draw": bench_draw
+    }
+    for group in groups:
+        before = set(results)
+        runners[group](results)
+        for name in results:
+            if name not in before:
+                print(f"{name:<32} {results[name]:>12.2f} us")
+
+    commit = commit_id()
+    output = Path(args.output) if args.output else RESULTS_DIR / f"hot_paths-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "unit": "us per call",
+        "results": results
+    }, indent=2) + "\n")
+    print(f"[SAVED] {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Interest Culling Benchmark
+Cost and size of one tick's binary snapshots for 1,000 players spread
+over a big map, with and without area-of-interest culling.
+
+"everyone" sends each client the shared full-world delta. "brute force"
+finds each client's neighbours by checking every other player, the
+"spatial grid" rows use SpatialGrid queries kept up to date with move().
+
+Usage:
+    python benchmarks/bench_interest.py
+"""
+
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from game.constants import PLAYER_SIZE, PLAYER_SPEED
+from game.multiplayer.protocol import BINARY_VERSION
+from server.snapshots import SnapshotHistory
+from server.spatial_grid import SpatialGrid
+
+PLAYERS = 1000
+MAP_SIZE = 20000
+INTEREST_RADIUS = 600
+MOVING = 0.25  # Share of players moving each tick
+TICKS = 30
+
+
+def make_world(seed=1):
+    rng = random.Random(seed)
+    return {pid: [rng.uniform(0, MAP_SIZE), rng.uniform(0, MAP_SIZE)] for pid in range(1, PLAYERS + 1)}
+
+
+def step(world, rng, grid=None):
+    """Move a random subset of players one step, keeping the grid in sync."""
+    for pid in rng.sample(sorted(world), int(PLAYERS * MOVING)):
+        pos = world[pid]
+        pos[0] = min(MAP_SIZE, max(0.0, pos[0] + rng.choice((-1, 1)) * PLAYER_SPEED))
+        pos[1] = min(MAP_SIZE, max(0.0, pos[1] + rng.choice((-1, 1)) * PLAYER_SPEED))
+        if grid is not None:
+            grid.move(pid, pos[0], pos[1])
+
+
+def brute_force(world, pid):
+    x, y = world[pid]
+    radius_sq = INTEREST_RADIUS * INTEREST_RADIUS
+    return [other for other, (ox, oy) in world.items() if (ox - x) ** 2 + (oy - y) ** 2 <= radius_sq]
+
+
+def run(label, neighbours):
+    """
+    Simulate TICKS ticks where every client acks the previous one.
+
+    Args:
+        neighbours: None to send everyone, else fn(world, grid, pid) -> ids
+    """
+    world = make_world()
+    rng = random.Random(2)
+    grid = None
+    if neighbours is not None:
+        grid = SpatialGrid(PLAYER_SIZE * math.ceil(INTEREST_RADIUS / PLAYER_SIZE))
+        for pid, (x, y) in world.items():
+            grid.insert(pid, x, y)
+    history = SnapshotHistory(10 ** 9, 8)
+    views = {}
+    elapsed = 0.0
+    sent = 0
+    for tick in range(1, TICKS + 2):
+        start = time.perf_counter()
+        step(world, rng, grid)
+        history.record(tick, {pid: (x, y, None) for pid, (x, y) in world.items()})
+        ack = tick - 1 if tick > 1 else None
+        size = 0
+        for pid in world:
+            if neighbours is None:
+                frame = history.frame_for(BINARY_VERSION, ack)
+            else:
+                visible = frozenset(neighbours(world, grid, pid))
+                frame = history.view_frame_for(BINARY_VERSION, ack, visible, views.get((pid, ack)))
+                views[(pid, tick)] = visible
+                views.pop((pid, tick - 2), None)
+            size += len(frame)
+        if tick > 1:
+            # The first tick is everyone's keyframe, measure steady-state deltas
+            elapsed += time.perf_counter() - start
+            sent += size
+    print(f"{label:<16} {elapsed / TICKS * 1000:>10.2f} {sent / TICKS / 1024:>14.1f}")
+
+
+def main():
+    print(f"{PLAYERS} players on a {MAP_SIZE}x{MAP_SIZE} map, interest radius {INTEREST_RADIUS}, "
+          f"{int(MOVING * 100)}% moving per tick")
+    print(f"{'':<16} {'ms / tick':>10} {'KiB sent/tick':>14}")
+    run("everyone", None)
+    run("brute force", lambda world, grid, pid: brute_force(world, pid))
+    run("spatial grid", lambda world, grid, pid: grid.query(world[pid][0], world[pid][1], INTEREST_RADIUS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Protocol Benchmark
+Compares encode/decode cost and wire size of the JSON and binary protocols
+for the per-input and per-tick messages.
+
+Usage:
+    python benchmarks/bench_protocol.py
+"""
+
+import json
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from game.constants import MOVE_UP, MOVE_RIGHT
+from game.multiplayer.framing import HEADER
+from game.multiplayer.protocol import (
+    encode_input, decode_client_message, encode_snapshot, decode_server_message
+)
+
+PLAYER_COUNTS = (8, 64)
+
+
+def make_players(count):
+    """Players dict as the server's JSON snapshot sends it."""
+    return {
+        str(pid): {"x": 400.0 + pid * 3.5, "y": 300.0 - pid * 3.5, "name": f"Player{pid}", "client_id": str(uuid.uuid4())}
+        for pid in range(1, count + 1)
+    }
+
+
+def bench(stmt, number):
+    """Best-of-5 time per call in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def report(name, json_bytes, binary_bytes, json_encode, binary_encode, json_decode, binary_decode, per=1):
+    print(f"{name}")
+    print(f"  bytes{' per player' if per > 1 else ''}:  json {json_bytes / per:8.1f}   binary {binary_bytes / per:8.1f}   "
+          f"({json_bytes / binary_bytes:.1f}x smaller)")
+    print(f"  encode us:  json {json_encode:8.2f}   binary {binary_encode:8.2f}   ({json_encode / binary_encode:.1f}x faster)")
+    print(f"  decode us:  json {json_decode:8.2f}   binary {binary_decode:8.2f}   ({json_decode / binary_decode:.1f}x faster)")
+
+
+def main():
+    client_id = str(uuid.uuid4())
+    movement = MOVE_UP | MOVE_RIGHT
+    json_input = {"seq": 1234, "movement": movement, "name": "Player1", "client_id": client_id}
+    json_payload = json.dumps(json_input).encode()
+    binary_payload = encode_input(1234, movement)
+    report(
+        "Input (one message)",
+        len(json_payload) + HEADER.size, len(binary_payload) + HEADER.size,
+        bench(lambda: json.dumps(json_input).encode(), 20000),
+        bench(lambda: encode_input(1234, movement), 20000),
+        bench(lambda: json.loads(json_payload), 20000),
+        bench(lambda: decode_client_message(binary_payload), 20000),
+    )
+
+    for count in PLAYER_COUNTS:
+        players = make_players(count)
+        positions = [(int(pid), pdata["x"], pdata["y"]) for pid, pdata in players.items()]
+        json_payload = json.dumps(players).encode()
+        binary_payload = encode_snapshot(1, positions)
+        number = max(100, 20000 // count)
+        print()
+        report(
+            f"Snapshot ({count} players)",
+            len(json_payload) + HEADER.size, len(binary_payload) + HEADER.size,
+            bench(lambda: json.dumps(players).encode(), number),
+            bench(lambda: encode_snapshot(1, positions), number),
+            bench(lambda: json.loads(json_payload), number),
+            bench(lambda: decode_server_message(binary_payload), number),
+            per=count,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Snapshot Build Benchmark
+Cost of producing one tick's snapshots for every connected client.
+
+"per client" filters the socket fields out of a mixed player table and
+serializes it once per recipient, as the server used to. "encode once"
+records the tick in a SnapshotHistory and asks it for every client's
+frame, so clients on the same protocol and ack share one buffer.
+
+Usage:
+    python benchmarks/bench_snapshot.py
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from game.multiplayer.framing import encode_frame
+from game.multiplayer.protocol import PROTOCOL_JSON, BINARY_VERSION
+from server.snapshots import SnapshotHistory
+
+PLAYER_COUNTS = (8, 64, 512)
+
+
+def make_players(count):
+    """Player table as the server kept it before connections were split out."""
+    return {
+        pid: {"x": 400.0 + pid * 3.5, "y": 300.0 - pid * 3.5, "name": f"Player{pid}",
+              "client_id": f"client-{pid}", "conn": object(), "addr": ("127.0.0.1", 50000 + pid)}
+        for pid in range(1, count + 1)
+    }
+
+
+def per_client(players):
+    """Filter and serialize the table once per recipient."""
+    frames = []
+    for _ in players:
+        serializable = {
+            pid: {k: v for k, v in pdata.items() if k != "conn" and k != "addr"}
+            for pid, pdata in players.items()
+        }
+        frames.append(encode_frame(json.dumps(serializable).encode()))
+    return frames
+
+
+def encode_once(history, players, tick, protocol, acks):
+    """Record the tick once and hand out the shared frames."""
+    history.record(tick, {pid: (p["x"], p["y"], p["name"]) for pid, p in players.items()})
+    return [history.frame_for(protocol, acks.get(pid)) for pid in players]
+
+
+def bench(stmt, number):
+    """Best-of-5 time per call in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    print(f"{'players':>8} {'per client us':>14} {'json once us':>13} {'binary once us':>15} {'binary delta us':>16}")
+    for count in PLAYER_COUNTS:
+        players = make_players(count)
+        number = max(3, 20000 // (count * count // 8 + 1))
+
+        histories = {}
+
+        def once(protocol, delta):
+            history = histories.setdefault((protocol, delta), SnapshotHistory(10 ** 9, 8))
+            tick = (history.tick or 0) + 1
+            # Every client acked the previous tick, one mover per tick keeps the delta small
+            players[1]["x"] += 1.0
+            acks = {pid: tick - 1 for pid in players} if delta else {}
+            return encode_once(history, players, tick, protocol, acks)
+
+        # Warm the histories so deltas have a base
+        once(BINARY_VERSION, True)
+
+        print(f"{count:>8} "
+              f"{bench(lambda: per_client(players), number):>14.1f} "
+              f"{bench(lambda: once(PROTOCOL_JSON, False), number * 10):>13.1f} "
+              f"{bench(lambda: once(BINARY_VERSION, False), number * 10):>15.1f} "
+              f"{bench(lambda: once(BINARY_VERSION, True), number * 10):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
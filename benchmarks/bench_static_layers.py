@@ -0,0 +1,83 @@
+"""
+Static Layer Benchmark
+Per-frame cost of GameScreen's full repaint with the static layers
+(background, UI bars, play area, title, controls hint) painted every
+frame, as the screen used to, against one blit of the cached
+background. Runs headless under the SDL dummy video driver.
+
+Both paths draw the same players, player list and ping on top, so the
+difference is what caching the static layers saves. "draw()" is a whole
+forced repaint, player layout included.
+
+Usage:
+    python benchmarks/bench_static_layers.py
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from bench_hot_paths import DrawClient, make_config
+from gui.screens.game_screen import GameScreen
+
+PLAYER_COUNTS = (0, 8, 64, 512)
+
+
+def frame_time(fn):
+    """Best-of-5 time per call in milliseconds."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e3
+
+
+def main():
+    pygame.init()
+    config = make_config()
+    screen = pygame.display.set_mode(config.resolution)
+    print(f"{'players':>8} {'painted ms':>11} {'cached ms':>10} {'saved':>7} {'draw() ms':>10}")
+    for count in PLAYER_COUNTS:
+        players = {
+            str(pid): {"x": 40.0 + (pid * 37) % 700, "y": 130.0 + (pid * 53) % 380, "name": f"Player{pid}"}
+            for pid in range(1, count + 1)
+        }
+        game_screen = GameScreen(screen, config, DrawClient(players), False, None)
+        game_screen.draw()
+        sprites = game_screen._player_sprites(players)
+        ping = "Ping: 12 ms"
+
+        def dynamic():
+            game_screen.player_list.draw(screen)
+            game_screen._draw_players(sprites)
+            game_screen._draw_bottom_ui(ping)
+
+        def painted():
+            game_screen._paint_background(screen)
+            dynamic()
+
+        def cached():
+            screen.blit(game_screen._background(), (0, 0))
+            dynamic()
+
+        def full_draw():
+            game_screen.invalidate()
+            game_screen.draw()
+
+        before = frame_time(painted)
+        after = frame_time(cached)
+        print(
+            f"{count:>8} {before:>11.3f} {after:>10.3f} {(before - after) / before * 100:>6.1f}% "
+            f"{frame_time(full_draw):>10.3f}"
+        )
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Bot Fleet
+Headless load generator: connects N simulated players to a game server
+with NetworkClient, moves them around and reports what they experienced.
+
+Every bot has its own client_id and movement pattern and samples its
+input at the game's input rate, so the server sees the same traffic as
+from real players. The report covers connect latency, input -> broadcast
+round trip (an input is sent until the snapshot whose input ack includes
+it arrives), ping round trip, bytes per second each way and
+disconnects, as JSON.
+
+With --server MODE the script starts its own game_server.py on a free
+local port, sized for the fleet, so runs are repeatable.
+
+Usage:
+    python benchmarks/bot_fleet.py --server event_loop --bots 200 --duration 20
+    python benchmarks/bot_fleet.py --port 50000 --bots 50 --rooms 5 --output report.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from game.constants import MOVE_NONE, MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT
+from game.multiplayer.client import NetworkClient
+from library.log import setup_logging
+
+ROOT = Path(__file__).parent.parent
+DIRECTIONS = (
+    MOVE_UP, MOVE_UP | MOVE_RIGHT, MOVE_RIGHT, MOVE_DOWN | MOVE_RIGHT,
+    MOVE_DOWN, MOVE_DOWN | MOVE_LEFT, MOVE_LEFT, MOVE_UP | MOVE_LEFT
+)
+PATTERNS = ("random", "circle", "zigzag", "idle", "mixed")
+
+
+class BotClient(NetworkClient):
+    """NetworkClient that counts traffic and times inputs until the server broadcasts them."""
+
+    def __init__(self, use_binary=True):
+        super().__init__(use_binary)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.sent_inputs = {}  # {seq: time sent} not yet seen in an input ack
+        self.input_rtts = []   # Seconds from sending an input to the snapshot that applied it
+        # Held while sending, so the receive thread can't see an ack before the send is recorded
+        self.timing_lock = threading.Lock()
+
+    def _send(self, data):
+        super()._send(data)
+        self.bytes_sent += len(data)
+
+    def send_input(self, movement_direction):
+        with self.timing_lock:
+            sequence = self.input_sequence
+            start = time.perf_counter()
+            sent = super().send_input(movement_direction)
+            if self.input_sequence != sequence:
+                self.sent_inputs[self.input_sequence] = start
+            return sent
+
+    def _process_messages(self, messages):
+        self.bytes_received += sum(len(message) + 4 for message in messages)
+        super()._process_messages(messages)
+        reconciliation = self.reconciliation
+        if reconciliation is None:
+            return
+        now = time.perf_counter()
+        acked = reconciliation[2]
+        with self.timing_lock:
+            for sequence in [s for s in self.sent_inputs if s <= acked]:
+                self.input_rtts.append(now - self.sent_inputs.pop(sequence))
+
+
+class Bot:
+    """One simulated player: a client and the movement pattern it follows."""
+
+    def __init__(self, index, pattern, rng, use_binary):
+        self.index = index
+        self.client_id = f"bot-{os.getpid()}-{index}"
+        self.pattern = pattern if pattern != "mixed" else rng.choice(PATTERNS[:-1])
+        self.rng = rng
+        self.client = BotClient(use_binary)
+        self.connect_time = None  # Seconds until the welcome arrived, None if it failed
+        self.error = None
+        self.movement = MOVE_NONE
+        self.next_change = 0.0
+        self.step = rng.randrange(len(DIRECTIONS))
+
+    def connect(self, host, port, room, max_players):
+        start = time.perf_counter()
+        ok, error = self.client.connect(host, port, f"Bot{self.index}", self.client_id, room=room, max_players=max_players)
+        if ok:
+            self.connect_time = time.perf_counter() - start
+        else:
+            self.error = error
+        return ok
+
+    def update(self, now):
+        """Pick this sample's movement and hand it to the client."""
+        if now >= self.next_change:
+            if self.pattern == "random":
+                self.movement = self.rng.choice((MOVE_NONE,) + DIRECTIONS)
+                self.next_change = now + self.rng.uniform(0.2, 1.0)
+            elif self.pattern == "circle":
+                self.step = (self.step + 1) % len(DIRECTIONS)
+                self.movement = DIRECTIONS[self.step]
+                self.next_change = now + 0.25
+            elif self.pattern == "zigzag":
+                self.movement = MOVE_LEFT if self.movement != MOVE_LEFT else MOVE_RIGHT
+                self.next_change = now + 0.5
+            else:
+                self.next_change = math.inf
+        self.client.send_input(self.movement)
+
+
+def percentiles(values, scale=1000.0):
+    """p50/p90/p99/max of a list of seconds, in milliseconds."""
+    if not values:
+        return {"samples": 0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale
+    return {
+        "samples": len(ordered),
+        "p50": round(pick(0.50), 3),
+        "p90": round(pick(0.90), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(ordered[-1] * scale, 3)
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, port):
+    """Start a local game_server.py with room limits that fit the fleet."""
+    per_room = math.ceil(args.bots / args.rooms)
+    command = [
+        sys.executable, str(ROOT / "server" / "game_server.py"),
+        "-H", "127.0.0.1", "-p", str(port), "--mode", args.server,
+        "-m", str(per_room), "--max-rooms", str(args.rooms), "-t", str(args.tick_rate)
+    ]
+    if args.server == "sharded":
+        command += ["-w", str(args.workers)]
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL if not args.verbose else None)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Game server didn't start")
+
+
+def run_fleet(args, host, port):
+    rng = random.Random(args.seed)
+    bots = [Bot(i, args.pattern, random.Random(rng.random()), not args.json) for i in range(args.bots)]
+    per_room = math.ceil(args.bots / args.rooms)
+
+    # Connect, at most --ramp bots per second
+    start = time.perf_counter()
+    for bot in bots:
+        if args.ramp:
+            delay = start + bot.index / args.ramp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        bot.connect(host, port, f"{args.room_prefix}{bot.index % args.rooms}", per_room)
+    connected = [bot for bot in bots if bot.connect_time is not None]
+
+    # Drive every bot from this thread at the input rate
+    interval = 1.0 / args.input_rate
+    received_before = sum(bot.client.bytes_received for bot in connected)
+    sent_before = sum(bot.client.bytes_sent for bot in connected)
+    for bot in connected:
+        bot.client.input_rtts.clear()
+    measure_start = time.perf_counter()
+    next_sample = measure_start
+    while time.perf_counter() - measure_start < args.duration:
+        now = time.perf_counter()
+        for bot in connected:
+            if bot.client.is_connected():
+                bot.update(now)
+        next_sample += interval
+        delay = next_sample - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_sample = time.perf_counter()
+    elapsed = time.perf_counter() - measure_start
+
+    disconnects = Counter(bot.client.connection_error or "unknown" for bot in connected if not bot.client.is_connected())
+    report = {
+        "config": {
+            "host": host, "port": port, "bots": args.bots, "rooms": args.rooms, "pattern": args.pattern,
+            "protocol": "json" if args.json else "binary", "duration": args.duration,
+            "input_rate": args.input_rate, "server": args.server, "seed": args.seed
+        },
+        "connected": len(connected),
+        "failed_connects": dict(Counter(bot.error for bot in bots if bot.connect_time is None)),
+        "connect_ms": percentiles([bot.connect_time for bot in connected]),
+        "input_rtt_ms": percentiles([rtt for bot in connected for rtt in bot.client.input_rtts]),
+        "ping_ms": percentiles([bot.client.get_rtt() for bot in connected if bot.client.get_rtt() is not None]),
+        "bytes_per_s": {
+            "received": round((sum(bot.client.bytes_received for bot in connected) - received_before) / elapsed),
+            "sent": round((sum(bot.client.bytes_sent for bot in connected) - sent_before) / elapsed),
+            "received_per_bot": round(
+                (sum(bot.client.bytes_received for bot in connected) - received_before) / elapsed / max(1, len(connected))
+            )
+        },
+        "disconnects": {"count": sum(disconnects.values()), "reasons": dict(disconnects)}
+    }
+    for bot in connected:
+        bot.client.disconnect()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many players against a game server")
+    parser.add_argument('-H', '--host', default="127.0.0.1", help="Server host (default: 127.0.0.1)")
+    parser.add_argument('-p', '--port', type=int, default=50000, help="Server port (default: 50000)")
+    parser.add_argument('--server', choices=("threaded", "event_loop", "sharded"),
+                        help="Start a local server in this mode on a free port instead")
+    parser.add_argument('-w', '--workers', type=int, default=0, help="Workers for --server sharded (default: one per core)")
+    parser.add_argument('-t', '--tick-rate', type=int, default=30, help="Tick rate for --server (default: 30)")
+    parser.add_argument('-n', '--bots', type=int, default=32, help="Simulated players (default: 32)")
+    parser.add_argument('--rooms', type=int, default=1, help="Spread bots over this many rooms (default: 1)")
+    parser.add_argument('--room-prefix', default="bots-", help="Room name prefix (default: bots-)")
+    parser.add_argument('--pattern', choices=PATTERNS, default="mixed", help="Movement pattern (default: mixed)")
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help="Seconds to measure after connecting (default: 10)")
+    parser.add_argument('--ramp', type=float, default=0, help="Connects per second, 0 for as fast as possible (default: 0)")
+    parser.add_argument('--input-rate', type=int, default=30, help="Input samples per second per bot (default: 30)")
+    parser.add_argument('--json', action='store_true', help="Use the JSON protocol instead of binary")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument('-o', '--output', help="Write the JSON report to this file instead of stdout")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show client and server logs")
+    args = parser.parse_args()
+    if args.bots < 1 or args.rooms < 1 or args.rooms > args.bots:
+        parser.error("need at least one bot and one room, and no more rooms than bots")
+
+    server = None
+    host, port = args.host, args.port
+    if args.server:
+        host, port = "127.0.0.1", free_port()
+        server = start_server(args, port)
+    # Every client logs its connection; keep the report readable
+    setup_logging("INFO" if args.verbose else "ERROR")
+    try:
+        report = run_fleet(args, host, port)
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(f"[REPORT] Written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,8 +15,10 @@ DEFAULT_CONFIG = {
         "input_active": [0, 200, 255]
     },
     "singleplayer": {"speed": 10, "difficulty": "medium"},
-    "multiplayer": {"lobby_name": "My Lobby", "lobby_password": "", "max_players": 4, "speed": 10},
-    "server": {"ip": "127.0.0.1", "port": 50000, "timeout": 5}
+    "multiplayer": {"lobby_name": "My Lobby", "lobby_password": "", "max_players": 4, "speed": 10, "input_rate": 30, "interpolation_delay": 100},
+    "server": {"ip": "127.0.0.1", "port": 50000, "timeout": 5},
+    "logging": {"level": "INFO", "format": "text", "debug": ""},
+    "trace": {"seconds": 0, "dir": "traces"}
 }
 
 CONSTRAINTS = {
@@ -25,5 +27,7 @@ CONSTRAINTS = {
     "server_port": {"min": 1024, "max": 65535},
     "speed": {"min": 1, "max": 100},
     "max_players": {"min": 2, "max": 8},
+    "input_rate": {"min": 10, "max": 120},
+    "interpolation_delay": {"min": 0, "max": 500},
     "resolution": {"width_min": 640, "height_min": 480}
 }
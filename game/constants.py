@@ -33,6 +33,7 @@ DIRECTION_NAMES = {
 PLAYER_SIZE = 40
 PLAYER_SPEED = 5
 PLAYER_SPEED_DIAGONAL = 3.5  # Slightly slower diagonal to balance
+SIMULATION_BASE_RATE = 60    # Speeds above are distances per 1/60 s
 INITIAL_X = 400
 INITIAL_Y = 300
 
@@ -0,0 +1,33 @@
+"""
+Movement Rules
+The movement step shared by the server simulation and client-side
+prediction, so both always agree on where an input takes a player.
+"""
+
+from game.constants import *
+
+
+def movement_step(movement, speed, scale=1.0):
+    """
+    Distance a player moves in one tick.
+
+    Args:
+        movement: MOVE_* flags held during the tick
+        speed: Straight-line speed per 1/SIMULATION_BASE_RATE s
+        scale: SIMULATION_BASE_RATE / tick rate
+
+    Returns:
+        tuple: (dx, dy)
+    """
+    dx = dy = 0
+    if movement & MOVE_UP:
+        dy -= 1
+    if movement & MOVE_DOWN:
+        dy += 1
+    if movement & MOVE_LEFT:
+        dx -= 1
+    if movement & MOVE_RIGHT:
+        dx += 1
+    if dx != 0 and dy != 0:
+        speed = PLAYER_SPEED_DIAGONAL
+    return dx * speed * scale, dy * speed * scale
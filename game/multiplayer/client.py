@@ -3,27 +3,84 @@ Network Client
 Handles connection to game server and data synchronization.
 """
 
+import select
 import socket
 import threading
 import json
 import time
+from collections import deque
+
+from game.multiplayer.clock import ClockSync
+from game.multiplayer.framing import FrameReader, encode_frame
+from game.multiplayer.interpolation import SnapshotBuffer
+from library.log import get_logger
+from library.trace import tracer
+from game.multiplayer.protocol import (
+    PROTOCOL_JSON, BINARY_VERSION, MSG_SNAPSHOT, MSG_DELTA, MSG_PLAYER_INFO, MSG_PLAYER_LEFT, MSG_INPUT_ACK,
+    MSG_PONG, encode_input, encode_name, encode_ack, encode_ping, decode_server_message
+)
+
+SNAPSHOT_HISTORY = 64  # Received ticks kept as possible delta bases
+INPUT_KEEPALIVE = 0.5  # Seconds before an unchanged input is sent again
+MISSED_HEARTBEATS = 3  # Heartbeat intervals without data before the server counts as gone
+
+log = get_logger("client")
+net_log = get_logger("client.net")  # Every snapshot, input and pong, DEBUG only
+
+# Handshake rejections the server can send
+ERROR_MESSAGES = {
+    "CLIENT_ALREADY_CONNECTED": "This client is already connected to the server",
+    "ROOM_NOT_FOUND": "No game with that lobby name",
+    "ROOM_EXISTS": "A game with that lobby name already exists",
+    "ROOM_FULL": "That game is full",
+    "SERVER_FULL": "The server can't host more games"
+}
 
 
 class NetworkClient:
     """Manages client-server communication."""
     
-    def __init__(self):
+    def __init__(self, use_binary=True):
+        """
+        Args:
+            use_binary: Offer the binary protocol in the handshake.
+                        The JSON protocol is used if False or if the server declines.
+        """
+        self.use_binary = use_binary
+        self.protocol = PROTOCOL_JSON
+        self.player_id = None  # Assigned by the server in the welcome
+        self.room = None  # Name of the room the server put us in
+        self.room_max_players = None
+        self.tick_rate = None  # Server movement rules from the welcome, for prediction
+        self.player_speed = None
+        self.heartbeat_interval = None  # Longest gap between pings the server accepts
+        self.input_acks = {}  # {tick: (seq, held)} not yet matched with their snapshot
+        self.reconciliation = None  # Newest (x, y, seq, held) of our own player, until taken
+        self.names = {}  # {player_id: name} from binary roster messages
+        self.sent_name = None
+        self.input_sequence = 0  # Sequence number of the last input sent
+        self.last_input = None  # Movement last sent and when
+        self.last_input_time = 0.0
+        self.snapshots = {}  # {tick: {player_id: (x, y, name or None)}}
+        self.snapshot_ticks = deque()
+        self.latest_tick = None
+        self.timeline = SnapshotBuffer()  # Recent snapshots for drawing players smoothly
+        self.clock = ClockSync()  # Round-trip time and server clock from pings
+        self.send_lock = threading.Lock()  # Acks (receive thread) and inputs share the socket
         self.socket = None
         self.connected = False
         self.running = False
         self.players = {}
+        self.roster = {}  # {player_id: name} of the newest snapshot
+        self.roster_version = 0  # Bumped when a player joins, leaves or is renamed
         self.player_name = "Player"
         self.client_id = None  # Store client ID
         self.lock = threading.Lock()
         self.receive_thread = None
         self.connection_error = None
+        self.reader = None
     
-    def connect(self, host, port, username, client_id):
+    def connect(self, host, port, username, client_id, room=None, create=None, max_players=None):
         """
         Connect to game server.
         
@@ -32,6 +89,10 @@ class NetworkClient:
             port: Server port
             username: Player name
             client_id: Unique client identifier
+            room: Name of the room (lobby) to enter, None for the server's default
+            create: True to only create the room, False to only join an
+                    existing one, None for either
+            max_players: Player limit requested for a room we create
             
         Returns:
             tuple: (success: bool, error_message: str or None)
@@ -43,10 +104,12 @@ class NetworkClient:
             
             # Create new socket
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Inputs are tiny and time-critical - don't let Nagle batch them
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.socket.settimeout(5)  # 5 second timeout for connection
             
             # Try to connect
-            print(f"Connecting to {host}:{port}...")
+            log.info(f"Connecting to {host}:{port}...")
             self.socket.connect((host, port))
             self.socket.settimeout(None)  # Remove timeout after connection
             
@@ -62,53 +125,85 @@ class NetworkClient:
                 "name": username,
                 "client_id": client_id
             }
-            self.socket.sendall(json.dumps(initial_state).encode())
+            if self.use_binary:
+                initial_state["protocol"] = BINARY_VERSION
+            if room:
+                initial_state["room"] = room
+            if create is not None:
+                initial_state["create"] = create
+            if max_players:
+                initial_state["max_players"] = max_players
+            self.reader = FrameReader()
+            self.socket.sendall(encode_frame(json.dumps(initial_state).encode()))
             
-            # Wait for response
-            data = self.socket.recv(4096)
-            if data:
-                response = json.loads(data.decode())
-                # Check for error (duplicate client_id)
-                if isinstance(response, dict) and "error" in response:
-                    if response["error"] == "CLIENT_ALREADY_CONNECTED":
-                        self.socket.close()
-                        self.connected = False
-                        error_msg = "This client is already connected to the server"
-                        print(f"Connection failed: {error_msg}")
-                        return (False, error_msg)
-                
-                # Success - store initial player data
-                with self.lock:
-                    self.players = response
+            # Wait for response (snapshots may already follow it in the same read)
+            messages = []
+            while not messages:
+                if not self.reader.recv_from(self.socket):
+                    raise ConnectionResetError("Server closed connection during handshake")
+                messages = self.reader.messages()
+            response = json.loads(messages[0])
+            # Check for error (duplicate client_id, room rules)
+            if isinstance(response, dict) and "error" in response:
+                self.socket.close()
+                self.connected = False
+                error_msg = ERROR_MESSAGES.get(response["error"], response["error"])
+                log.warning(f"Connection failed: {error_msg}")
+                return (False, error_msg)
+            
+            # Success - the roster and current keyframe follow the welcome
+            self.protocol = BINARY_VERSION if response.get("protocol") == BINARY_VERSION else PROTOCOL_JSON
+            self.player_id = response.get("player_id")
+            self.room = response.get("room")
+            self.room_max_players = response.get("max_players")
+            self.tick_rate = response.get("tick_rate")
+            self.player_speed = response.get("player_speed")
+            self.heartbeat_interval = response.get("heartbeat_interval")
+            self.input_acks.clear()
+            self.reconciliation = None
+            self.names = {}
+            self.sent_name = username
+            self.input_sequence = 0
+            self.last_input = None
+            self.snapshots.clear()
+            self.snapshot_ticks.clear()
+            self.latest_tick = None
+            with self.lock:
+                self.players = {}
+                self.roster = {}
+                self.roster_version += 1
+                self.timeline.clear(self.tick_rate)
+                self.clock.reset(self.tick_rate, self.heartbeat_interval)
+            self._process_messages(messages[1:])
             
             # Start receive thread
             self.receive_thread = threading.Thread(target=self._receive_data, daemon=True)
             self.receive_thread.start()
             
-            print(f"Connected to server at {host}:{port}")
+            log.info(f"Connected to server at {host}:{port} (room: {self.room})")
             return (True, None)
             
         except socket.timeout:
             self.connected = False
             error_msg = "Connection timeout - server not responding"
-            print(f"Connection failed: {error_msg}")
+            log.warning(f"Connection failed: {error_msg}")
             return (False, error_msg)
             
         except ConnectionRefusedError:
             self.connected = False
             error_msg = "Connection refused - server not running"
-            print(f"Connection failed: {error_msg}")
+            log.warning(f"Connection failed: {error_msg}")
             return (False, error_msg)
             
         except Exception as e:
             self.connected = False
             error_msg = f"Connection error: {str(e)}"
-            print(f"Connection failed: {error_msg}")
+            log.warning(f"Connection failed: {error_msg}")
             return (False, error_msg)
     
     def disconnect(self):
         """Disconnect from server."""
-        print("Disconnecting from server...")
+        log.info("Disconnecting from server...")
         self.running = False
         self.connected = False
         
@@ -125,43 +220,168 @@ class NetworkClient:
         
         with self.lock:
             self.players = {}
+            self.roster = {}
+            self.roster_version += 1
+        self.room = None
         
-        print("Disconnected")
+        log.info("Disconnected")
     
     def _receive_data(self):
         """Background thread to receive game state from server."""
+        last_received = time.monotonic()
         while self.running and self.connected:
             try:
-                data = self.socket.recv(4096)
-                if not data:
-                    print("Server closed connection")
+                # Pings double as heartbeats, keep sending them even if the server goes quiet
+                self._ping_if_due()
+                readable, _, _ = select.select([self.socket], [], [], self.clock.ping_interval / 2)
+                now = time.monotonic()
+                if not readable:
+                    if now - last_received > self.clock.ping_interval * MISSED_HEARTBEATS:
+                        log.warning("Server stopped responding")
+                        self.connected = False
+                        self.connection_error = "Server stopped responding"
+                        break
+                    continue
+                if not self.reader.recv_from(self.socket):
+                    log.info("Server closed connection")
                     self.connected = False
                     self.connection_error = "Server closed connection"
                     break
+                last_received = now
                 
-                # Deserialize player data
-                with self.lock:
-                    self.players = json.loads(data.decode())
-                    print(f"Received player data: {self.players}")
+                with tracer.span("network receive", "net"):
+                    self._process_messages(self.reader.messages())
                     
             except ConnectionResetError:
-                print("Connection reset by server")
+                log.warning("Connection reset by server")
                 self.connected = False
                 self.connection_error = "Connection lost"
                 break
                 
             except Exception as e:
                 if self.running:  # Only log if not intentionally disconnecting
-                    print(f"Receive error: {e}")
+                    log.error(f"Receive error: {e}")
                     self.connected = False
                     self.connection_error = f"Network error: {str(e)}"
                 break
         
-        print("Receive thread stopped")
+        log.info("Receive thread stopped")
+    
+    def _process_messages(self, messages):
+        """Apply received roster messages and snapshots, then ack the newest tick."""
+        if not messages:
+            return
+        newest = self.latest_tick
+        for message in messages:
+            if self.protocol == PROTOCOL_JSON:
+                data = json.loads(message)
+                if "input_ack" in data:
+                    self.input_acks[data["tick"]] = (data["input_ack"], data["held"])
+                    continue
+                if "pong" in data:
+                    self._add_clock_sample(data["pong"], data["received"], data["sent"], data["tick"])
+                    continue
+                players = {pid: (p["x"], p["y"], p["name"]) for pid, p in data["players"].items()}
+                tick = self._apply_snapshot(data["tick"], data["base"], players, data["removed"])
+            else:
+                msg_type, data = decode_server_message(message)
+                tick = None
+                if msg_type == MSG_SNAPSHOT:
+                    tick = self._apply_snapshot(data[0], None, {str(pid): (x, y, None) for pid, x, y in data[1]}, [])
+                elif msg_type == MSG_DELTA:
+                    tick = self._apply_snapshot(data[0], data[1], {str(pid): (x, y, None) for pid, x, y in data[2]}, data[3])
+                elif msg_type == MSG_PLAYER_INFO:
+                    self.names[str(data[0])] = data[1]
+                elif msg_type == MSG_PLAYER_LEFT:
+                    self.names.pop(str(data), None)
+                elif msg_type == MSG_INPUT_ACK:
+                    self.input_acks[data[0]] = data[1:]
+                elif msg_type == MSG_PONG:
+                    self._add_clock_sample(*data)
+            if tick is not None and (newest is None or tick > newest):
+                newest = tick
+        
+        if newest is None:
+            return
+        players = {}
+        for pid, (x, y, name) in self.snapshots[newest].items():
+            if name is None:
+                name = self.names.get(pid, f"Player{pid}")
+            players[pid] = {"x": x, "y": y, "name": name}
+        roster = {pid: player["name"] for pid, player in players.items()}
+        own = self.snapshots[newest].get(str(self.player_id))
+        sequence, held = self.input_acks.get(newest, (0, 0))
+        for tick in [t for t in self.input_acks if t <= newest]:
+            del self.input_acks[tick]
+        net_log.debug("Snapshot tick %d: %d players, input %d acked", newest, len(players), sequence)
+        with self.lock:
+            self.players = players
+            if roster != self.roster:
+                self.roster = roster
+                self.roster_version += 1
+            if newest != self.latest_tick:
+                self.timeline.push(newest, players, time.monotonic())
+                if own is not None:
+                    self.reconciliation = (own[0], own[1], sequence, held)
+        if newest != self.latest_tick:
+            self.latest_tick = newest
+            if self.protocol == BINARY_VERSION:
+                self._send(encode_frame(encode_ack(newest)))
+            else:
+                self._send(encode_frame(json.dumps({"ack": newest}).encode()))
+    
+    def _apply_snapshot(self, tick, base, changed, removed):
+        """
+        Rebuild the state of a tick from a keyframe (base None) or a delta.
+        
+        Returns:
+            int or None: The tick, or None if the delta's base is unknown
+                (the next keyframe recovers)
+        """
+        if base is None:
+            state = changed
+        else:
+            base_state = self.snapshots.get(base)
+            if base_state is None:
+                return None
+            state = dict(base_state)
+            state.update(changed)
+            for pid in removed:
+                state.pop(str(pid), None)
+        self.snapshots[tick] = state
+        self.snapshot_ticks.append(tick)
+        while len(self.snapshot_ticks) > SNAPSHOT_HISTORY:
+            self.snapshots.pop(self.snapshot_ticks.popleft(), None)
+        return tick
+    
+    def _ping_if_due(self):
+        """Send a clock sync ping if it's time for the next one."""
+        now = time.monotonic()
+        if not self.clock.ping_due(now):
+            return
+        self.clock.ping_sent(now)
+        if self.protocol == BINARY_VERSION:
+            self._send(encode_frame(encode_ping(now)))
+        else:
+            self._send(encode_frame(json.dumps({"ping": now}).encode()))
+    
+    def _add_clock_sample(self, sent, received, replied, tick):
+        arrived = time.monotonic()
+        with self.lock:
+            self.clock.add_sample(sent, received, replied, arrived, tick)
+        net_log.debug("Pong: round trip %.1f ms, server tick %d", (arrived - sent) * 1000, tick)
+    
+    def _send(self, data):
+        with self.send_lock:
+            self.socket.sendall(data)
     
     def send_input(self, movement_direction):
         """
-        Send player input to server.
+        Send player input to server if it changed.
+        
+        Call it at the input sample rate. An unchanged input is only
+        repeated every INPUT_KEEPALIVE seconds; every input sent gets the
+        next sequence number.
         
         Args:
             movement_direction: int (bitwise flags) representing movement direction
@@ -176,27 +396,41 @@ class NetworkClient:
                 10 = down-right (2 | 8)
             
         Returns:
-            bool: True if sent successfully
+            bool: True unless sending failed
         """
         if not self.connected or not self.socket:
             return False
         
+        now = time.monotonic()
+        if movement_direction == self.last_input and now - self.last_input_time < INPUT_KEEPALIVE:
+            return True
+        
         try:
-            # Create input state with movement, name, and client_id
-            input_state = {
-                "movement": movement_direction,
-                "name": self.player_name,
-                "client_id": self.client_id
-            }
+            self.input_sequence += 1
+            if self.protocol == BINARY_VERSION:
+                # Names only travel when they change
+                data = encode_frame(encode_input(self.input_sequence, movement_direction))
+                if self.player_name != self.sent_name:
+                    data = encode_frame(encode_name(self.player_name)) + data
+                    self.sent_name = self.player_name
+            else:
+                # Create input state with movement, name, and client_id
+                input_state = {
+                    "seq": self.input_sequence,
+                    "movement": movement_direction,
+                    "name": self.player_name,
+                    "client_id": self.client_id
+                }
+                data = encode_frame(json.dumps(input_state).encode())
             
-            # Serialize and send
-
-            data = json.dumps(input_state).encode()
-            self.socket.sendall(data)
+            self._send(data)
+            net_log.debug("Input %d: movement %d", self.input_sequence, movement_direction)
+            self.last_input = movement_direction
+            self.last_input_time = now
             return True
             
         except Exception as e:
-            print(f"Send error: {e}")
+            log.error(f"Send error: {e}")
             self.connected = False
             self.connection_error = "Failed to send data"
             return False
@@ -211,6 +445,85 @@ class NetworkClient:
         with self.lock:
             return self.players.copy()
     
+    def get_roster_version(self):
+        """
+        Get a number that changes whenever a player joins, leaves or is
+        renamed, so callers only fetch the roster when it did.
+        
+        Returns:
+            int: Roster version
+        """
+        return self.roster_version
+    
+    def get_roster(self):
+        """
+        Get the names of the players in the newest snapshot.
+        
+        Returns:
+            dict: {player_id: name}
+        """
+        with self.lock:
+            return self.roster.copy()
+    
+    def get_interpolated_players(self, delay):
+        """
+        Get player positions as they were `delay` seconds ago, blended
+        between received snapshots for smooth movement.
+        
+        Args:
+            delay: Interpolation delay in seconds; should cover a snapshot
+                   interval plus network jitter
+        
+        Returns:
+            dict: {player_id: {"x": x, "y": y, "name": name}}
+        """
+        with self.lock:
+            return self.timeline.sample(time.monotonic(), delay)
+    
+    def get_rtt(self):
+        """
+        Get the round-trip time to the server.
+        
+        Returns:
+            float or None: Median of recent pings in seconds, None until the first pong
+        """
+        with self.lock:
+            return self.clock.rtt
+    
+    def get_server_time(self):
+        """
+        Get the server's clock right now, estimated from pings.
+        
+        Returns:
+            float or None: Server time.monotonic() seconds, None until the first pong
+        """
+        with self.lock:
+            return self.clock.server_time()
+    
+    def get_server_tick(self):
+        """
+        Get the tick the server is simulating right now, estimated from pings.
+        
+        Returns:
+            float or None: Fractional tick of our room, None until the first pong
+        """
+        with self.lock:
+            return self.clock.server_tick()
+    
+    def take_reconciliation(self):
+        """
+        Authoritative state of our own player from the newest snapshot, once.
+        
+        Returns:
+            tuple or None: (x, y, seq, held) - position, newest input the
+                server applied and for how many ticks - or None if no new
+                snapshot arrived since the last call
+        """
+        with self.lock:
+            reconciliation = self.reconciliation
+            self.reconciliation = None
+            return reconciliation
+    
     def is_connected(self):
         """Check if connected to server."""
         return self.connected
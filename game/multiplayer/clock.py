@@ -0,0 +1,122 @@
+"""
+Clock Synchronization
+Estimates the round-trip time to the server and the offset between our
+clock and the server's from ping/pong exchanges, NTP style.
+
+Each pong gives four timestamps: ping sent (t0, ours), ping received (t1,
+server), pong sent (t2, server) and pong received (t3, ours):
+
+    round trip = (t3 - t0) - (t2 - t1)
+    offset     = ((t1 - t0) + (t2 - t3)) / 2
+
+The offset is exact when both directions take equally long, and wrong by
+at most half the round trip otherwise, so it is taken from the sample
+with the shortest round trip of the last few (queueing only ever adds
+delay). The reported round trip is their median.
+"""
+
+import statistics
+import time
+from collections import deque
+
+CLOCK_SAMPLES = 8       # Pongs the estimate is filtered over
+PING_INTERVAL = 2.0     # Seconds between pings once the filter is full, unless the server asks for less
+FAST_PING_INTERVAL = 0.2  # Seconds between the first pings after connecting
+
+
+class ClockSync:
+    """Round-trip time and server clock estimate for one connection."""
+
+    def __init__(self):
+        self.samples = deque(maxlen=CLOCK_SAMPLES)  # (round trip, offset)
+        self.last_ping = None
+        self.ping_interval = PING_INTERVAL
+        self.tick_interval = None
+        self.tick_reference = None  # (server time, server tick) of the newest pong
+
+    def reset(self, tick_rate=None, ping_interval=None):
+        """
+        Forget every sample, e.g. for a new connection.
+
+        Args:
+            tick_rate: Server ticks per second, for server_tick()
+            ping_interval: Longest gap between pings; pings double as the
+                           heartbeat the server expects
+        """
+        self.samples.clear()
+        self.last_ping = None
+        self.ping_interval = min(PING_INTERVAL, ping_interval or PING_INTERVAL)
+        self.tick_interval = 1.0 / tick_rate if tick_rate else None
+        self.tick_reference = None
+
+    def ping_due(self, now):
+        """True if a ping should be sent at local time `now`."""
+        if self.last_ping is None:
+            return True
+        interval = self.ping_interval if len(self.samples) == CLOCK_SAMPLES else FAST_PING_INTERVAL
+        return now - self.last_ping >= interval
+
+    def ping_sent(self, now):
+        self.last_ping = now
+
+    def add_sample(self, sent, received, replied, arrived, tick):
+        """
+        Record one ping/pong exchange.
+
+        Args:
+            sent: Our clock when the ping was sent (t0)
+            received: Server clock when it read the ping (t1)
+            replied: Server clock when it queued the pong (t2)
+            arrived: Our clock when the pong was read (t3)
+            tick: Server tick of our room when it answered
+        """
+        round_trip = max(0.0, (arrived - sent) - (replied - received))
+        offset = ((received - sent) + (replied - arrived)) / 2
+        self.samples.append((round_trip, offset))
+        self.tick_reference = (received, tick)
+
+    @property
+    def synchronized(self):
+        return bool(self.samples)
+
+    @property
+    def rtt(self):
+        """Median round-trip time in seconds, None before the first pong."""
+        if not self.samples:
+            return None
+        return statistics.median(round_trip for round_trip, _ in self.samples)
+
+    @property
+    def jitter(self):
+        """Spread of the round-trip time (mean deviation from the median) in seconds."""
+        if not self.samples:
+            return None
+        median = self.rtt
+        return sum(abs(round_trip - median) for round_trip, _ in self.samples) / len(self.samples)
+
+    @property
+    def offset(self):
+        """Seconds to add to our clock to get the server's, None before the first pong."""
+        if not self.samples:
+            return None
+        return min(self.samples)[1]
+
+    def server_time(self, now=None):
+        """Server clock at local time `now` (time.monotonic() by default)."""
+        if not self.samples:
+            return None
+        if now is None:
+            now = time.monotonic()
+        return now + self.offset
+
+    def server_tick(self, now=None):
+        """
+        Tick the server is simulating at local time `now`, as a float.
+
+        Returns:
+            float or None: None until a pong arrived or without a tick rate
+        """
+        if self.tick_reference is None or self.tick_interval is None:
+            return None
+        reference_time, reference_tick = self.tick_reference
+        return reference_tick + (self.server_time(now) - reference_time) / self.tick_interval
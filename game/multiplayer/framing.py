@@ -0,0 +1,122 @@
+"""
+Message Framing
+Length-prefixed framing shared by client and server.
+
+TCP is a byte stream: one recv() can hold half a message or several of
+them. Every message is therefore sent as a 4-byte big-endian payload
+length followed by the payload, and FrameReader reassembles complete
+payloads from a reusable receive buffer.
+
+Snapshots can be large, but clients only send inputs, acks, pings and
+names, so the server reads client sockets with a much lower frame limit.
+"""
+
+import struct
+
+HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 4 * 1024 * 1024  # Reject anything bigger as a corrupt stream
+MAX_CLIENT_FRAME_SIZE = 4 * 1024  # Limit on frames the server reads from a client
+INITIAL_BUFFER_SIZE = 64 * 1024
+
+
+class FrameError(ValueError):
+    """Raised when the stream can't be a valid sequence of frames."""
+
+
+def encode_frame(payload):
+    """
+    Prefix a payload with its length.
+
+    Args:
+        payload: bytes to send as one message
+
+    Returns:
+        bytes: Header + payload, ready for sendall()
+    """
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds {MAX_FRAME_SIZE}")
+    return HEADER.pack(len(payload)) + payload
+
+
+class FrameReader:
+    """Reassembles length-prefixed frames from a byte stream."""
+
+    def __init__(self, buffer_size=INITIAL_BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        """
+        Args:
+            buffer_size: Initial receive buffer size, grown for larger frames
+            max_frame_size: Largest payload accepted, anything bigger raises FrameError
+        """
+        self.buffer = bytearray(buffer_size)
+        self.max_frame_size = max_frame_size
+        self.start = 0  # First unconsumed byte
+        self.end = 0    # One past the last received byte
+
+    def recv_from(self, sock):
+        """
+        Receive straight into the buffer with recv_into (no per-read allocation).
+
+        Returns:
+            int: Bytes read, 0 if the peer closed the connection.
+                 Socket errors (including BlockingIOError) propagate.
+        """
+        if self.end == len(self.buffer):
+            self._make_room()
+        with memoryview(self.buffer) as view:
+            count = sock.recv_into(view[self.end:])
+        self.end += count
+        return count
+
+    def feed(self, data):
+        """Append bytes that were received some other way."""
+        needed = len(data)
+        if len(self.buffer) - self.end < needed:
+            self._make_room(needed)
+        self.buffer[self.end:self.end + needed] = data
+        self.end += needed
+
+    def unread(self):
+        """Bytes received but not yet returned by messages()."""
+        return bytes(self.buffer[self.start:self.end])
+
+    def messages(self):
+        """
+        Pop every complete payload currently buffered.
+
+        Returns:
+            list: Payloads as bytes, oldest first
+        """
+        result = []
+        buffer = self.buffer
+        start, end = self.start, self.end
+        while end - start >= HEADER.size:
+            (length,) = HEADER.unpack_from(buffer, start)
+            if length > self.max_frame_size:
+                raise FrameError(f"Frame of {length} bytes exceeds {self.max_frame_size}")
+            frame_end = start + HEADER.size + length
+            if frame_end > end:
+                # Grow now so a large frame can be received in as few reads as possible
+                if frame_end - start > len(buffer):
+                    self.start = start
+                    self._make_room(frame_end - end)
+                    buffer = self.buffer
+                    start, end = self.start, self.end
+                break
+            result.append(bytes(buffer[start + HEADER.size:frame_end]))
+            start = frame_end
+        if start == end:
+            start = end = 0
+        self.start, self.end = start, end
+        return result
+
+    def _make_room(self, needed=1):
+        """Compact unconsumed bytes to the front and grow if still short."""
+        pending = self.end - self.start
+        if self.start:
+            self.buffer[:pending] = self.buffer[self.start:self.end]
+            self.start, self.end = 0, pending
+        if len(self.buffer) - self.end < needed:
+            size = len(self.buffer)
+            while size - self.end < needed:
+                size *= 2
+            self.buffer.extend(bytes(size - len(self.buffer)))
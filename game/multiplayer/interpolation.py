@@ -0,0 +1,113 @@
+"""
+Snapshot Interpolation
+Draws remote players a little in the past, between two snapshots that
+have both arrived, so they move smoothly whatever the network timing.
+
+Snapshots are placed on the server's timeline by their tick number, not
+by when they happened to arrive. The local clock is mapped to that
+timeline with the earliest arrival seen (jitter only ever makes packets
+late), and the mapping creeps forward slowly so it follows a server that
+falls behind. If the render time runs past the newest snapshot, players
+keep moving along their last velocity for a short while, then stop.
+"""
+
+from collections import deque
+
+BUFFER_SIZE = 64          # Snapshots kept, about two seconds at 30 ticks/s
+MAX_EXTRAPOLATION = 0.25  # Seconds players keep moving past the newest snapshot
+OFFSET_CREEP = 0.02       # Share of a late arrival the clock mapping moves forward per snapshot
+
+
+class SnapshotBuffer:
+    """Ring buffer of received snapshots, sampled at any point in time."""
+
+    def __init__(self, tick_rate=None, size=BUFFER_SIZE):
+        """
+        Args:
+            tick_rate: Server ticks per second; without it snapshots are
+                       placed by arrival time instead
+            size: Snapshots kept
+        """
+        self.tick_interval = 1.0 / tick_rate if tick_rate else None
+        self.samples = deque(maxlen=size)  # (server time, {player_id: {"x", "y", "name"}})
+        self.offset = None  # Local time minus server time of the earliest arrival
+
+    def clear(self, tick_rate=None):
+        self.tick_interval = 1.0 / tick_rate if tick_rate else None
+        self.samples.clear()
+        self.offset = None
+
+    def push(self, tick, players, arrival):
+        """
+        Add the newest snapshot.
+
+        Args:
+            tick: Its server tick
+            players: {player_id: {"x", "y", "name"}}
+            arrival: Local time.monotonic() it was received
+        """
+        server_time = tick * self.tick_interval if self.tick_interval else arrival
+        if self.samples and server_time <= self.samples[-1][0]:
+            return
+        offset = arrival - server_time
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        else:
+            self.offset += (offset - self.offset) * OFFSET_CREEP
+        self.samples.append((server_time, players))
+
+    def sample(self, now, delay):
+        """
+        Player positions as of `delay` seconds before `now`.
+
+        Args:
+            now: Local time.monotonic()
+            delay: Interpolation delay in seconds
+
+        Returns:
+            dict: {player_id: {"x", "y", "name"}}, empty before the first snapshot
+        """
+        if not self.samples:
+            return {}
+        render_time = now - self.offset - delay
+        samples = self.samples
+        if render_time <= samples[0][0]:
+            return dict(samples[0][1])
+        if render_time >= samples[-1][0]:
+            return self._extrapolate(render_time)
+        # Newest pair around the render time; it is almost always near the end
+        index = len(samples) - 1
+        while samples[index - 1][0] > render_time:
+            index -= 1
+        start_time, start = samples[index - 1]
+        end_time, end = samples[index]
+        return self._blend(start, end, (render_time - start_time) / (end_time - start_time))
+
+    def _extrapolate(self, render_time):
+        newest_time, newest = self.samples[-1]
+        if len(self.samples) < 2:
+            return dict(newest)
+        previous_time, previous = self.samples[-2]
+        ahead = min(render_time - newest_time, MAX_EXTRAPOLATION)
+        return self._blend(previous, newest, 1.0 + ahead / (newest_time - previous_time))
+
+    @staticmethod
+    def _blend(start, end, fraction):
+        """
+        Players of `start` moved `fraction` of the way to `end`.
+
+        Players that joined after `start` aren't shown yet, players gone
+        by `end` stay where they were last seen.
+        """
+        players = {}
+        for player_id, old in start.items():
+            new = end.get(player_id)
+            if new is None:
+                players[player_id] = old
+                continue
+            players[player_id] = {
+                "x": old["x"] + (new["x"] - old["x"]) * fraction,
+                "y": old["y"] + (new["y"] - old["y"]) * fraction,
+                "name": new["name"]
+            }
+        return players
@@ -0,0 +1,110 @@
+"""
+Client-Side Prediction
+Moves our own player locally with the server's movement rules, so input
+shows up on the next frame instead of a round trip later.
+
+Every input sent has a sequence number, and the prediction counts how
+many ticks each input has been held locally. Snapshots carry the newest
+input the server applied and how many ticks it has held it; the
+prediction restarts from the authoritative position and replays what the
+server hasn't simulated yet. Any remaining difference is blended out
+over a few frames instead of snapping.
+"""
+
+import math
+from collections import deque
+
+from game.constants import MOVE_NONE, SIMULATION_BASE_RATE
+from game.movement import movement_step
+
+CORRECTION_RATE = 12.0  # 1/s: how fast a misprediction is blended out
+SNAP_DISTANCE = 120     # Errors this large (teleports, long stalls) snap instead
+MAX_PENDING_INPUTS = 256
+
+
+class Predictor:
+    """Predicted position of the local player."""
+
+    def __init__(self, tick_rate, speed):
+        """
+        Args:
+            tick_rate: Server ticks per second
+            speed: Server player speed per 1/SIMULATION_BASE_RATE s
+        """
+        self.tick_interval = 1.0 / tick_rate
+        self.scale = SIMULATION_BASE_RATE / tick_rate
+        self.speed = speed
+        self.position = None      # Predicted simulation position, None until the first snapshot
+        self.offset = (0.0, 0.0)  # Visual correction still being blended out
+        self.inputs = deque()     # [seq, movement, ticks held locally] not yet confirmed
+        self.elapsed = 0.0        # Time into the current local tick
+
+    def update(self, dt, sequence, movement):
+        """
+        Advance the prediction.
+
+        Args:
+            dt: Frame time in seconds
+            sequence: Sequence number of the input most recently sent (0 for none)
+            movement: That input's MOVE_* flags
+        """
+        if self.position is None:
+            return
+        if not self.inputs or self.inputs[-1][0] != sequence:
+            self.inputs.append([sequence, movement, 0])
+            if len(self.inputs) > MAX_PENDING_INPUTS:
+                self.inputs.popleft()
+        self.elapsed += dt
+        while self.elapsed >= self.tick_interval:
+            self.elapsed -= self.tick_interval
+            current = self.inputs[-1]
+            current[2] += 1
+            self.position = self._advance(self.position, current[1], 1)
+        decay = math.exp(-CORRECTION_RATE * dt)
+        self.offset = (self.offset[0] * decay, self.offset[1] * decay)
+
+    def reconcile(self, x, y, sequence, held):
+        """
+        Rebase on an authoritative snapshot and replay unconfirmed input.
+
+        Args:
+            x, y: Our position in the snapshot
+            sequence: Newest input the server had applied by then
+            held: Ticks the server had applied that input
+        """
+        while self.inputs and self.inputs[0][0] < sequence:
+            self.inputs.popleft()
+        position = (x, y)
+        for input_sequence, movement, ticks in self.inputs:
+            if input_sequence == sequence:
+                ticks = max(0, ticks - held)
+            position = self._advance(position, movement, ticks)
+        shown = self.display_position()
+        self.position = position
+        self.offset = (0.0, 0.0)
+        if shown is not None:
+            # Keep drawing where we were and blend the error out from there
+            corrected = self.display_position()
+            error = (shown[0] - corrected[0], shown[1] - corrected[1])
+            if math.hypot(*error) <= SNAP_DISTANCE:
+                self.offset = error
+
+    def display_position(self):
+        """
+        Where to draw the player: the prediction, advanced through the
+        current tick so motion starts on the next frame, plus the
+        correction being blended out.
+        """
+        if self.position is None:
+            return None
+        movement = self.inputs[-1][1] if self.inputs else MOVE_NONE
+        dx, dy = movement_step(movement, self.speed, self.scale)
+        fraction = self.elapsed / self.tick_interval
+        return (self.position[0] + dx * fraction + self.offset[0],
+                self.position[1] + dy * fraction + self.offset[1])
+
+    def _advance(self, position, movement, ticks):
+        if not ticks:
+            return position
+        dx, dy = movement_step(movement, self.speed, self.scale)
+        return (position[0] + dx * ticks, position[1] + dy * ticks)
@@ -0,0 +1,300 @@
+"""
+Wire Protocol
+Compact binary messages used after the JSON handshake.
+
+The client advertises the binary version it speaks in its handshake
+("protocol": BINARY_VERSION). If the server speaks it too, the welcome
+reply carries the same version and every later message on that
+connection is binary; otherwise both sides keep using JSON.
+
+Inputs carry a sequence number that grows by one per input sent on the
+connection ("seq" in JSON); the server ignores stale or repeated ones.
+
+Every binary payload starts with a one-byte message type. Positions are
+sent as float32, players as uint16 ids. Names travel only in
+MSG_PLAYER_INFO when a player joins or renames, never per tick.
+
+The handshake also names the room to enter ("room", DEFAULT_ROOM if
+omitted). "create": True only creates it, "create": False only joins an
+existing one, and leaving "create" out does either.
+
+Each snapshot is preceded by a per-client input ack (MSG_INPUT_ACK,
+{"input_ack", "held", "tick"} in JSON) once the client has sent input:
+the newest input the tick's state includes and how many ticks its
+movement has been applied, so the client can replay the rest on top.
+
+Clients ping the server now and then (MSG_PING with the client's clock,
+{"ping"} in JSON) and the server answers right away (MSG_PONG with the
+ping's time, its own receive and send times and its current tick,
+{"pong", "received", "sent", "tick"} in JSON), which is enough to
+estimate the round-trip time and the offset between the two clocks.
+
+Snapshots are full keyframes (MSG_SNAPSHOT) or deltas (MSG_DELTA) against
+a base tick the client acknowledged with MSG_ACK. The JSON protocol uses
+the same scheme with {"tick", "base", "players", "removed"} and {"ack"}.
+
+The server checks the types and sizes of every handshake and client message with
+validate_handshake() and validate_client_message() before acting on it.
+"""
+
+import math
+import struct
+
+PROTOCOL_JSON = 0
+BINARY_VERSION = 3  # 2: sequenced inputs, 3: clock sync pings
+
+MAX_PLAYER_ID = 0xFFFF  # Player ids must fit the uint16 wire id
+MAX_NAME_BYTES = 255
+DEFAULT_ROOM = "default"
+MAX_ROOM_NAME = 32      # Characters kept of a requested room name
+MAX_CLIENT_ID = 64      # Characters allowed in a handshake client_id
+MAX_MOVEMENT = 0x0F     # Every MOVE_* flag set
+
+# Client -> server
+MSG_INPUT = 0x01        # sequence + movement flags
+MSG_NAME = 0x02         # new display name
+MSG_ACK = 0x03          # newest snapshot tick applied
+MSG_PING = 0x04         # client clock
+# Server -> client
+MSG_SNAPSHOT = 0x10     # tick + (id, x, y) for every player
+MSG_PLAYER_INFO = 0x11  # id + name, on join or rename
+MSG_PLAYER_LEFT = 0x12  # id
+MSG_DELTA = 0x13        # tick + base tick + changed (id, x, y) + removed ids
+MSG_INPUT_ACK = 0x14    # tick + seq of the input held + ticks it was applied
+MSG_PONG = 0x15         # ping's client clock + server receive and send clocks + server tick
+
+_INPUT = struct.Struct("!BIB")
+_TYPE = struct.Struct("!B")
+_SNAPSHOT_HEADER = struct.Struct("!BIH")
+_ENTITY = struct.Struct("!Hff")
+_PLAYER_INFO_HEADER = struct.Struct("!BHB")
+_PLAYER_LEFT = struct.Struct("!BH")
+_ACK = struct.Struct("!BI")
+_DELTA_HEADER = struct.Struct("!BIIH")
+_COUNT = struct.Struct("!H")
+_INPUT_ACK = struct.Struct("!BIIH")
+_PING = struct.Struct("!Bd")
+_PONG = struct.Struct("!BdddI")
+
+
+class ProtocolError(ValueError):
+    """Raised for a payload that isn't a valid binary message."""
+
+
+def _encode_name(name):
+    return name.encode("utf-8")[:MAX_NAME_BYTES].decode("utf-8", "ignore").encode("utf-8")
+
+
+# Client -> server
+
+def encode_input(sequence, movement):
+    return _INPUT.pack(MSG_INPUT, sequence & 0xFFFFFFFF, movement)
+
+
+def encode_name(name):
+    return _TYPE.pack(MSG_NAME) + _encode_name(name)
+
+
+def encode_ack(tick):
+    return _ACK.pack(MSG_ACK, tick & 0xFFFFFFFF)
+
+
+def encode_ping(client_time):
+    return _PING.pack(MSG_PING, client_time)
+
+
+def decode_client_message(payload):
+    """
+    Decode a client message into the same dict shape the JSON path uses.
+
+    Returns:
+        dict: {"seq": n, "movement": flags}, {"name": name}, {"ack": tick}
+              or {"ping": client time}
+    """
+    if not payload:
+        raise ProtocolError("Empty message")
+    msg_type = payload[0]
+    if msg_type == MSG_INPUT and len(payload) == _INPUT.size:
+        _, sequence, movement = _INPUT.unpack(payload)
+        return {"seq": sequence, "movement": movement}
+    if msg_type == MSG_NAME and len(payload) - 1 <= MAX_NAME_BYTES:
+        return {"name": bytes(payload[1:]).decode("utf-8", "replace")}
+    if msg_type == MSG_ACK and len(payload) == _ACK.size:
+        return {"ack": _ACK.unpack(payload)[1]}
+    if msg_type == MSG_PING and len(payload) == _PING.size:
+        return {"ping": _PING.unpack(payload)[1]}
+    raise ProtocolError(f"Unknown client message 0x{msg_type:02x} ({len(payload)} bytes)")
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_name(name, what):
+    """Cap a name's size the way _encode_name does: every player in the room is sent it."""
+    if len(name.encode("utf-8", "replace")) > MAX_NAME_BYTES:
+        raise ProtocolError(f"{what} name is longer than {MAX_NAME_BYTES} bytes")
+
+
+def validate_handshake(handshake):
+    """
+    Check the types of a decoded JSON handshake.
+
+    Returns:
+        dict: The handshake
+
+    Raises:
+        ProtocolError: If it isn't an object or a field has the wrong type
+    """
+    if not isinstance(handshake, dict):
+        raise ProtocolError("Handshake is not an object")
+    for key in ("name", "client_id", "room"):
+        value = handshake.get(key)
+        if value is not None and not isinstance(value, str):
+            raise ProtocolError(f"Handshake {key} is not a string")
+    if handshake.get("name"):
+        _check_name(handshake["name"], "Handshake")
+    if len(handshake.get("client_id") or "") > MAX_CLIENT_ID:
+        raise ProtocolError(f"Handshake client_id is longer than {MAX_CLIENT_ID} characters")
+    if handshake.get("create") not in (None, True, False):
+        raise ProtocolError("Handshake create is not a boolean")
+    max_players = handshake.get("max_players")
+    if max_players is not None and not _is_int(max_players):
+        raise ProtocolError("Handshake max_players is not an integer")
+    return handshake
+
+
+def validate_client_message(message):
+    """
+    Check the types of a decoded client message (JSON or binary).
+
+    Returns:
+        dict: The message
+
+    Raises:
+        ProtocolError: If it isn't an object or a field has the wrong type
+    """
+    if not isinstance(message, dict):
+        raise ProtocolError("Message is not an object")
+    for key in ("seq", "ack"):
+        if key in message and not (_is_int(message[key]) and message[key] >= 0):
+            raise ProtocolError(f"Message {key} is not a non-negative integer")
+    if "movement" in message:
+        movement = message["movement"]
+        if not (_is_int(movement) and 0 <= movement <= MAX_MOVEMENT):
+            raise ProtocolError(f"Message movement is not MOVE_* flags (0-{MAX_MOVEMENT})")
+    if "name" in message:
+        if not isinstance(message["name"], str):
+            raise ProtocolError("Message name is not a string")
+        _check_name(message["name"], "Message")
+    if "ping" in message:
+        ping = message["ping"]
+        if not isinstance(ping, (int, float)) or isinstance(ping, bool) or not math.isfinite(ping):
+            raise ProtocolError("Message ping is not a number")
+    return message
+
+
+# Server -> client
+
+def encode_snapshot(tick, positions):
+    """
+    Args:
+        tick: Server tick number
+        positions: list of (player_id, x, y)
+    """
+    parts = [_SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, tick & 0xFFFFFFFF, len(positions))]
+    pack = _ENTITY.pack
+    parts.extend(pack(pid, x, y) for pid, x, y in positions)
+    return b"".join(parts)
+
+
+def encode_delta(tick, base, positions, removed):
+    """
+    Args:
+        tick: Server tick number
+        base: Acknowledged tick the delta applies to
+        positions: list of (player_id, x, y) that changed since base
+        removed: list of player ids gone since base
+    """
+    parts = [_DELTA_HEADER.pack(MSG_DELTA, tick & 0xFFFFFFFF, base & 0xFFFFFFFF, len(positions))]
+    pack = _ENTITY.pack
+    parts.extend(pack(pid, x, y) for pid, x, y in positions)
+    parts.append(_COUNT.pack(len(removed)))
+    parts.append(struct.pack(f"!{len(removed)}H", *removed))
+    return b"".join(parts)
+
+
+def encode_player_info(player_id, name):
+    data = _encode_name(name)
+    return _PLAYER_INFO_HEADER.pack(MSG_PLAYER_INFO, player_id, len(data)) + data
+
+
+def encode_player_left(player_id):
+    return _PLAYER_LEFT.pack(MSG_PLAYER_LEFT, player_id)
+
+
+def encode_input_ack(tick, sequence, held):
+    """
+    Args:
+        tick: Server tick the ack belongs to
+        sequence: Newest input applied by that tick
+        held: Ticks that input's movement has been applied, this one included
+    """
+    return _INPUT_ACK.pack(MSG_INPUT_ACK, tick & 0xFFFFFFFF, sequence & 0xFFFFFFFF, min(held, 0xFFFF))
+
+
+def encode_pong(client_time, received, sent, tick):
+    """
+    Args:
+        client_time: Client clock from the ping
+        received: Server clock when the ping was read
+        sent: Server clock when the pong was queued
+        tick: Server tick of the client's room
+    """
+    return _PONG.pack(MSG_PONG, client_time, received, sent, tick & 0xFFFFFFFF)
+
+
+def decode_server_message(payload):
+    """
+    Returns:
+        tuple: (MSG_SNAPSHOT, (tick, [(id, x, y), ...]))
+               (MSG_DELTA, (tick, base, [(id, x, y), ...], [removed id, ...]))
+               (MSG_PLAYER_INFO, (id, name))
+               (MSG_PLAYER_LEFT, id)
+               (MSG_INPUT_ACK, (tick, seq, held))
+               (MSG_PONG, (client time, received, sent, tick))
+    """
+    if not payload:
+        raise ProtocolError("Empty message")
+    msg_type = payload[0]
+    try:
+        if msg_type == MSG_SNAPSHOT:
+            _, tick, count = _SNAPSHOT_HEADER.unpack_from(payload)
+            offset = _SNAPSHOT_HEADER.size
+            if len(payload) != offset + count * _ENTITY.size:
+                raise ProtocolError(f"Snapshot of {len(payload)} bytes can't hold {count} players")
+            return msg_type, (tick, list(_ENTITY.iter_unpack(payload[offset:])))
+        if msg_type == MSG_DELTA:
+            _, tick, base, count = _DELTA_HEADER.unpack_from(payload)
+            offset = _DELTA_HEADER.size
+            removed_offset = offset + count * _ENTITY.size
+            (removed_count,) = _COUNT.unpack_from(payload, removed_offset)
+            removed_offset += _COUNT.size
+            if len(payload) != removed_offset + removed_count * 2:
+                raise ProtocolError(f"Delta of {len(payload)} bytes doesn't match its counts")
+            positions = list(_ENTITY.iter_unpack(payload[offset:offset + count * _ENTITY.size]))
+            removed = list(struct.unpack_from(f"!{removed_count}H", payload, removed_offset))
+            return msg_type, (tick, base, positions, removed)
+        if msg_type == MSG_PLAYER_INFO:
+            _, player_id, length = _PLAYER_INFO_HEADER.unpack_from(payload)
+            start = _PLAYER_INFO_HEADER.size
+            return msg_type, (player_id, bytes(payload[start:start + length]).decode("utf-8", "replace"))
+        if msg_type == MSG_PLAYER_LEFT:
+            return msg_type, _PLAYER_LEFT.unpack(payload)[1]
+        if msg_type == MSG_INPUT_ACK:
+            return msg_type, _INPUT_ACK.unpack(payload)[1:]
+        if msg_type == MSG_PONG:
+            return msg_type, _PONG.unpack(payload)[1:]
+    except struct.error as e:
+        raise ProtocolError(str(e)) from e
+    raise ProtocolError(f"Unknown server message 0x{msg_type:02x} ({len(payload)} bytes)")
@@ -6,5 +6,6 @@
 from .button import Button
 from .text_input import TextInput
 from .label import Label
+from .player_list import PlayerList
 
-__all__ = ['Button', 'TextInput', 'Label']
\ No newline at end of file
+__all__ = ['Button', 'TextInput', 'Label', 'PlayerList']
\ No newline at end of file
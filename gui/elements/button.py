@@ -2,13 +2,16 @@
 
 import pygame
 
+from gui.fonts import get_font
+from gui.text_cache import render_text
+
 
 class Button:
     def __init__(self, text, rect, action=None, font_size=24, enabled = True):
         self.text = text
         self.rect = pygame.Rect(rect)
         self.action = action
-        self.font = pygame.font.SysFont(None, font_size)
+        self.font = get_font(font_size)
         self.hover = False
         self.enabled = enabled
         # self.enabled = False
@@ -21,9 +24,13 @@ class Button:
         else:
             color = theme.get('button_color', (0, 150, 200))
         pygame.draw.rect(surface, color, self.rect, border_radius=5)
-        text_surf = self.font.render(self.text, True, theme.get('text_color', (255, 255, 255)))
+        text_surf = render_text(self.font, self.text, theme.get('text_color', (255, 255, 255)))
         surface.blit(text_surf, text_surf.get_rect(center=self.rect.center))
     
+    def state(self):
+        """Everything draw() depends on besides the theme; a change means self.rect is dirty."""
+        return (self.text, self.hover, self.enabled)
+    
     def handle_event(self, event):
         if not self.enabled:
             return
@@ -2,6 +2,9 @@
 
 import pygame
 
+from gui.fonts import get_font
+from gui.text_cache import render_text
+
 
 class Label:
     """A non-interactive text label."""
@@ -9,7 +12,7 @@ class Label:
     def __init__(self, text, rect, font_size=24):
         self.text = text
         self.rect = pygame.Rect(rect)
-        self.font = pygame.font.SysFont(None, font_size)
+        self.font = get_font(font_size)
     
     def draw(self, surface, theme):
         """Draw the label."""
@@ -18,9 +21,13 @@ class Label:
         pygame.draw.rect(surface, color, self.rect, border_radius=5)
         
         # Draw text
-        text_surf = self.font.render(self.text, True, theme.get('text_color', (255, 255, 255)))
+        text_surf = render_text(self.font, self.text, theme.get('text_color', (255, 255, 255)))
         surface.blit(text_surf, text_surf.get_rect(center=self.rect.center))
     
+    def state(self):
+        """Everything draw() depends on besides the theme; a change means self.rect is dirty."""
+        return self.text
+    
     def handle_event(self, event):
         """Labels don't handle events."""
         pass
@@ -32,7 +39,7 @@ class Label2:
     def __init__(self, text, rect):
         self.text = text
         self.rect = pygame.Rect(rect)
-        self.font = pygame.font.SysFont(None, 18)
+        self.font = get_font(18)
     
     def draw(self, surface, theme):
         """Draw the label."""
@@ -40,9 +47,9 @@ class Label2:
         color = theme.get('label_color', (100, 100, 100))
         pygame.draw.rect(surface, color, self.rect, border_radius=5)
     
-        text_surf = self.font.render(
+        text_surf = render_text(
+            self.font,
             f"Server: {self.config.server_ip}:{self.config.server_port}",
-            True,
             (150, 150, 150)
         )
         surface.blit(text_surf, (10, self.config.resolution[1] - 30))
@@ -0,0 +1,130 @@
+"""Player List UI Element."""
+
+import pygame
+
+from gui.text_cache import render_text
+
+
+class PlayerList:
+    """
+    Scrollable grid of player names, filled column by column.
+    
+    The panel is rendered into a cached surface that is rebuilt only when
+    the players, the scroll position or the size change, and only the
+    visible columns are rendered into it, so drawing costs one blit
+    however many players there are.
+    """
+    
+    ROWS = 2
+    ROW_HEIGHT = 18
+    COLUMN_WIDTH = 120
+    HEADER_HEIGHT = 25
+    
+    def __init__(self, rect, header_font, font, username, theme):
+        """
+        Args:
+            rect: Area of the panel
+            header_font: Font of the "Players (N):" header
+            font: Font of the entries
+            username: Name shown as "(You)"
+            theme: Colors: 'bg_color', 'text_color', 'self_color', 'dim_color'
+        """
+        self.rect = pygame.Rect(rect)
+        self.header_font = header_font
+        self.font = font
+        self.username = username
+        self.theme = theme
+        self.entries = []  # [(text, color)] sorted by player id
+        self.first_column = 0
+        self.revision = 0  # Bumped on every change of what the panel shows
+        self.surface = None
+    
+    @property
+    def visible_columns(self):
+        return max(1, (self.rect.width - 10) // self.COLUMN_WIDTH)
+    
+    @property
+    def max_first_column(self):
+        columns = (len(self.entries) + self.ROWS - 1) // self.ROWS
+        return max(0, columns - self.visible_columns)
+    
+    def set_players(self, roster):
+        """
+        Replace the listed players. Called when the roster changes, not every frame.
+        
+        Args:
+            roster: {player_id: name}
+        """
+        self.entries = []
+        # Ids are numbers sent as strings: shorter first puts "9" before "10"
+        for _, name in sorted(roster.items(), key=lambda item: (len(item[0]), item[0])):
+            if name == self.username:
+                self.entries.append((f"• {name} (You)", self.theme['self_color']))
+            else:
+                self.entries.append((f"• {name}", self.theme['dim_color']))
+        self.first_column = min(self.first_column, self.max_first_column)
+        self._changed()
+    
+    def set_rect(self, rect):
+        """Move or resize the panel."""
+        self.rect = pygame.Rect(rect)
+        self.first_column = min(self.first_column, self.max_first_column)
+        self._changed()
+    
+    def scroll(self, columns):
+        """Scroll by a number of columns, negative towards the start."""
+        first = max(0, min(self.first_column + columns, self.max_first_column))
+        if first != self.first_column:
+            self.first_column = first
+            self._changed()
+    
+    def _changed(self):
+        self.revision += 1
+        self.surface = None
+    
+    def state(self):
+        """Changes whenever the panel looks different; a change means self.rect is dirty."""
+        return self.revision
+    
+    def handle_event(self, event):
+        """Mouse wheel over the panel scrolls a column, Page Up / Page Down a page."""
+        if event.type == pygame.MOUSEWHEEL and self.rect.collidepoint(pygame.mouse.get_pos()):
+            self.scroll(-event.y)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_PAGEUP:
+            self.scroll(-self.visible_columns)
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_PAGEDOWN:
+            self.scroll(self.visible_columns)
+    
+    def draw(self, surface):
+        if self.surface is None:
+            self.surface = self._render(surface)
+        surface.blit(self.surface, self.rect)
+    
+    def _render(self, target):
+        """Render the header and the visible entries into a surface in `target`'s pixel format."""
+        panel = pygame.Surface(self.rect.size, 0, target)
+        panel.fill(self.theme['bg_color'])
+        
+        count = len(self.entries)
+        header = render_text(self.header_font, f"Players ({count}):", self.theme['text_color'])
+        panel.blit(header, (0, 0))
+        
+        first = self.first_column * self.ROWS
+        last = min(count, first + self.visible_columns * self.ROWS)
+        if first > 0 or last < count:
+            # Where the visible page sits in the whole list
+            position = render_text(
+                self.font,
+                f"{first + 1}-{last} of {count}  (scroll for more)",
+                self.theme['dim_color']
+            )
+            panel.blit(position, position.get_rect(topright=(self.rect.width, 4)))
+        
+        for i in range(first, last):
+            text, color = self.entries[i]
+            row = (i - first) % self.ROWS
+            col = (i - first) // self.ROWS
+            x = 10 + col * self.COLUMN_WIDTH
+            y = self.HEADER_HEIGHT + row * self.ROW_HEIGHT
+            panel.blit(render_text(self.font, text, color), (x, y))
+        return panel
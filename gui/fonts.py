@@ -0,0 +1,48 @@
+"""
+Fonts
+Every pygame font the GUI uses, loaded once and shared.
+
+pygame.font.SysFont() looks the face up and loads the font file on
+every call. get_font() does that once per (face, size, bold, italic)
+and hands the same Font to every screen and widget after that, which
+also lets the text cache share rendered text between them. Screens
+list the fonts they draw with in FONTS; BaseScreen.on_enter() loads
+them before the first frame.
+"""
+
+import pygame
+
+_fonts = {}  # {(face, size, bold, italic): pygame.font.Font}
+
+
+def get_font(size, bold=False, italic=False, face=None):
+    """
+    Shared font instance.
+
+    Args:
+        size: Point size
+        bold: Bold style
+        italic: Italic style
+        face: System font name, None for pygame's default font
+    """
+    key = (face, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(face, size, bold, italic)
+    return font
+
+
+def preload_fonts(specs):
+    """
+    Load fonts ahead of the frame that first needs them.
+
+    Args:
+        specs: Iterable of get_font() argument tuples, e.g. ((72, True), (20,))
+    """
+    for spec in specs:
+        get_font(*spec)
+
+
+def clear_fonts():
+    """Forget every font, e.g. after pygame.font.quit()."""
+    _fonts.clear()
@@ -1,17 +1,34 @@
-"""Base Screen Class."""
+"""
+Base Screen Class.
+
+draw() only repaints when something on screen changed and returns what
+to push to the window: None for the whole window, a list of rects for
+just those regions, or [] for nothing. update_display() does the push.
+"""
 
 import pygame
 
+from gui.fonts import preload_fonts
+
 
 class BaseScreen:
     """Base class for all game screens/menus."""
     
+    FONTS = ()  # get_font() arguments of every font the screen draws with, loaded by on_enter
+    
     def __init__(self, screen, config):
         self.screen = screen
         self.config = config
         self.buttons = []
         self.inputs = []
         self.labels = []
+        self.full_redraw = True  # Push the whole window on the next draw()
+        self.drawn = {}  # {widget: (state, rect)} as of the last draw()
+        self.drawn_screen_state = None
+    
+    def invalidate(self):
+        """Repaint and push the whole window on the next draw()."""
+        self.full_redraw = True
     
     def add_button(self, button):
         """Add a button to this screen."""
@@ -39,8 +56,57 @@ class BaseScreen:
         for input_field in self.inputs:
             input_field.update(dt)
     
+    def screen_state(self):
+        """
+        Anything the screen draws besides its widgets, e.g. a status line.
+        A change repaints the whole window.
+        """
+        return None
+    
+    def dirty_rects(self):
+        """
+        Regions that changed since the last draw().
+        
+        Returns:
+            list or None: Changed rects, None if the whole window changed
+        """
+        if self.full_redraw or self.screen_state() != self.drawn_screen_state:
+            return None
+        dirty = []
+        for widget in self.labels + self.buttons + self.inputs:
+            drawn = self.drawn.get(widget)
+            if drawn is None:
+                dirty.append(widget.rect.copy())
+            elif drawn[0] != widget.state() or drawn[1] != widget.rect:
+                dirty.append(widget.rect.union(drawn[1]))
+        return dirty
+    
     def draw(self):
-        """Draw the screen."""
+        """
+        Repaint the screen if anything on it changed.
+        
+        Returns:
+            list or None: Rects to push ([] if nothing changed), None for the whole window
+        """
+        dirty = self.dirty_rects()
+        if dirty is not None and not dirty:
+            return dirty
+        # The back buffer is always repainted whole, so pushing part of it is always correct
+        self.render()
+        self.full_redraw = False
+        self.drawn_screen_state = self.screen_state()
+        self.drawn = {
+            widget: (widget.state(), widget.rect.copy())
+            for widget in self.labels + self.buttons + self.inputs
+        }
+        return dirty
+    
+    def present(self):
+        """Draw and push the result to the window right away, outside the main loop."""
+        update_display(self.draw())
+    
+    def render(self):
+        """Paint the whole screen into the back buffer."""
         self.screen.fill(self.config.bg_color)
         
         theme = {
@@ -59,13 +125,25 @@ class BaseScreen:
             button.draw(self.screen, theme)
         for input_field in self.inputs:
             input_field.draw(self.screen, theme)
-        
-        # pygame.display.flip()
     
     def on_enter(self):
         """Called when entering this screen."""
-        pass
+        preload_fonts(self.FONTS)
+        self.invalidate()
     
     def on_exit(self):
         """Called when leaving this screen."""
         pass
+
+
+def update_display(dirty):
+    """
+    Push what draw() returned to the window.
+    
+    Args:
+        dirty: None to flip the whole window, else a list of rects to update
+    """
+    if dirty is None:
+        pygame.display.flip()
+    elif dirty:
+        pygame.display.update(dirty)
@@ -5,7 +5,16 @@ The actual gameplay screen where players move around.
 
 import pygame
 from gui.screens.base_screen import BaseScreen
+from gui.elements.player_list import PlayerList
+from gui.fonts import get_font
+from gui.text_cache import render_text
 from game.constants import *
+from game.multiplayer.prediction import Predictor
+from library.log import get_logger
+
+log = get_logger("gui")
+
+MAX_DIRTY_RECTS = 64  # Past this many changed regions one full flip is cheaper
 
 
 class GameScreen(BaseScreen):
@@ -26,24 +35,60 @@ class GameScreen(BaseScreen):
         self.client = client
         self.is_host = is_host
         self.back_callback = back_callback
+        # Input is sampled at a fixed rate, not every frame
+        self.input_interval = 1.0 / self.config.input_rate
+        self.input_timer = self.input_interval
+        # Other players are drawn this far in the past, between two snapshots
+        self.interpolation_delay = self.config.interpolation_delay / 1000.0
+        # Our own player moves locally and is corrected by the server's snapshots
+        self.predictor = None
+        if self.client.tick_rate and self.client.player_speed:
+            self.predictor = Predictor(self.client.tick_rate, self.client.player_speed)
+        # What the last frame showed, to find what changed: {player_id: Rect}, HUD contents
+        self.drawn_bounds = {}
+        self.drawn_player_list = None
+        self.roster_version = None  # Client roster the player list shows
+        self.drawn_ping = None
+        # Everything that never moves, composed once: see _background()
+        self.background = None
+        self.background_key = None
         
         # Fonts
-        self.font_small = pygame.font.SysFont(None, 20)
-        self.font_medium = pygame.font.SysFont(None, 24)
-        self.font_title = pygame.font.SysFont(None, 36, bold=True)
+        self.font_small = get_font(20)
+        self.font_medium = get_font(24)
+        self.font_title = get_font(36, bold=True)
         
         # Calculate play area
+        self.play_area = self._play_area()
+        
+        # Player list in the top UI, fed from the client's roster
+        self.player_list = PlayerList(
+            self._player_list_rect(),
+            self.font_medium,
+            self.font_small,
+            self.config.username,
+            {'bg_color': COLOR_UI_BG, 'text_color': COLOR_TEXT, 'self_color': COLOR_SELF, 'dim_color': COLOR_TEXT_DIM}
+        )
+    
+    def _play_area(self):
+        """Rect players move in, between the UI bars."""
         screen_w, screen_h = self.config.resolution
-        self.play_area = pygame.Rect(
+        return pygame.Rect(
             UI_SIDE_MARGIN,
             UI_TOP_HEIGHT,
             screen_w - 2 * UI_SIDE_MARGIN,
             screen_h - UI_TOP_HEIGHT - UI_BOTTOM_HEIGHT
         )
     
+    def _player_list_rect(self):
+        """Top UI area below the title."""
+        screen_w, screen_h = self.config.resolution
+        return pygame.Rect(UI_SIDE_MARGIN, 50, screen_w - 2 * UI_SIDE_MARGIN, UI_TOP_HEIGHT - 50)
+    
     def handle_event(self, event):
         """Handle input events."""
         super().handle_event(event)
+        self.player_list.handle_event(event)
         
         # ESC to exit game
         if event.type == pygame.KEYDOWN:
@@ -56,10 +101,25 @@ class GameScreen(BaseScreen):
         
         # Check if still connected
         if not self.client.is_connected():
-            print("Connection lost during game!")
+            log.warning("Connection lost during game!")
             self._exit_game()
             return
         
+        self.input_timer += dt
+        if self.input_timer >= self.input_interval:
+            # Never owe more than one sample after a slow frame
+            self.input_timer = min(self.input_timer - self.input_interval, self.input_interval)
+            self._sample_input()
+        
+        if self.predictor is not None:
+            reconciliation = self.client.take_reconciliation()
+            if reconciliation is not None:
+                self.predictor.reconcile(*reconciliation)
+            movement = self.client.last_input if self.client.last_input is not None else MOVE_NONE
+            self.predictor.update(dt, self.client.input_sequence, movement)
+    
+    def _sample_input(self):
+        """Read the keyboard and send the movement it maps to."""
         # Get keyboard input and convert to movement direction (bitwise flags)
         keys = pygame.key.get_pressed()
         movement = MOVE_NONE
@@ -74,150 +134,212 @@ class GameScreen(BaseScreen):
         if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
             movement |= MOVE_RIGHT
 
-        if movement != MOVE_NONE:
-            self.client.send_input(movement)
+        # The client only sends changes (releases included) and a periodic keepalive
+        self.client.send_input(movement)
     
     def draw(self):
-        """Draw the game."""
-        screen_w, screen_h = self.config.resolution
+        """
+        Draw the game, pushing only the regions that changed.
         
-        # Fill background
-        self.screen.fill(COLOR_BG)
+        Returns:
+            list or None: Rects to push ([] if nothing changed), None for the whole window
+        """
+        background = self._background()
         
-        # Draw UI areas
-        self._draw_ui_background()
+        # Get all players from server, smoothed unless disabled
+        if self.interpolation_delay > 0:
+            players = self.client.get_interpolated_players(self.interpolation_delay)
+        else:
+            players = self.client.get_players()
+        own_id = str(self.client.player_id)
+        position = self.predictor.display_position() if self.predictor is not None else None
+        if position is not None and own_id in players:
+            players[own_id] = dict(players[own_id], x=position[0], y=position[1])
         
-        # Draw play area background and border
-        self._draw_play_area_background()
+        sprites = self._player_sprites(players)
+        # The list only changes when someone joins, leaves or is renamed
+        roster_version = self.client.get_roster_version()
+        if roster_version != self.roster_version:
+            self.roster_version = roster_version
+            self.player_list.set_players(self.client.get_roster())
+        player_list = self.player_list.state()
+        rtt = self.client.get_rtt()
+        ping = f"Ping: {rtt * 1000:.0f} ms" if rtt is not None else None
+        
+        dirty = None
+        if not self.full_redraw:
+            dirty = self._dirty_rects(sprites, player_list, ping)
+            if not dirty:
+                return dirty
+            if len(dirty) > MAX_DIRTY_RECTS:
+                dirty = None
         
-        # Get all players from server
-        players = self.client.get_players()
+        # Background, UI bars, play area, title and controls hint in one copy
+        self.screen.blit(background, (0, 0))
+        
+        # The player list is opaque, so it goes under the name tags that reach into the top UI
+        self.player_list.draw(self.screen)
         
         # Draw all players (server handles wrapping now)
-        self._draw_players(players)
+        self._draw_players(sprites)
         
         # Draw UI overlay
-        self._draw_top_ui(players)
-        self._draw_bottom_ui()
+        self._draw_bottom_ui(ping)
+        
+        self.full_redraw = False
+        self.drawn_bounds = {pid: sprite["bounds"] for pid, sprite in sprites.items()}
+        self.drawn_player_list = player_list
+        self.drawn_ping = ping
+        return dirty
+    
+    def _background(self):
+        """
+        The static layers of the screen, rebuilt only when the window size
+        or the title changes.
+        
+        Returns:
+            pygame.Surface: In the window's pixel format, so blitting it is a plain copy
+        """
+        key = (tuple(self.config.resolution), self.screen.get_size(), self.is_host)
+        if key != self.background_key:
+            self.play_area = self._play_area()
+            self.player_list.set_rect(self._player_list_rect())
+            # Same pixel format as the window, so blitting it needs no conversion
+            self.background = pygame.Surface(self.screen.get_size(), 0, self.screen)
+            self._paint_background(self.background)
+            self.background_key = key
+            self.invalidate()
+        return self.background
+    
+    def _paint_background(self, surface):
+        """Draw everything that never moves onto `surface`."""
+        # Fill background
+        surface.fill(COLOR_BG)
+        
+        # Draw UI areas
+        self._draw_ui_background(surface)
+        
+        # Draw play area background and border
+        self._draw_play_area_background(surface)
+        
+        # Draw title
+        role_text = "HOST" if self.is_host else "CLIENT"
+        title = render_text(self.font_title, f"DASH DASH - {role_text}", COLOR_TEXT)
+        surface.blit(title, (UI_SIDE_MARGIN, 10))
+        
+        # Controls hint
+        screen_w, screen_h = self.config.resolution
+        controls_text = render_text(
+            self.font_small,
+            "Controls: WASD / Arrow Keys to move  |  ESC to exit",
+            COLOR_TEXT_DIM
+        )
+        controls_rect = controls_text.get_rect(
+            center=(screen_w // 2, screen_h - UI_BOTTOM_HEIGHT // 2)
+        )
+        surface.blit(controls_text, controls_rect)
+    
+    def _dirty_rects(self, sprites, player_list, ping):
+        """Rects covering players that moved, came or went, and HUD text that changed."""
+        screen_w, screen_h = self.config.resolution
+        dirty = []
+        for player_id, sprite in sprites.items():
+            bounds = sprite["bounds"]
+            old = self.drawn_bounds.get(player_id)
+            if old is None:
+                dirty.append(bounds)
+            elif old != bounds:
+                # A small step is one rect; a wrap across the play area is two
+                if old.colliderect(bounds):
+                    dirty.append(old.union(bounds))
+                else:
+                    dirty.extend((old, bounds))
+        for player_id, old in self.drawn_bounds.items():
+            if player_id not in sprites:
+                dirty.append(old)
+        if player_list != self.drawn_player_list:
+            dirty.append(self.player_list.rect.copy())
+        if ping != self.drawn_ping:
+            dirty.append(pygame.Rect(0, screen_h - UI_BOTTOM_HEIGHT, screen_w, UI_BOTTOM_HEIGHT))
+        return dirty
+    
+    def _player_sprites(self, players):
+        """
+        Where and how each player is drawn.
         
-        pygame.display.flip()
+        Returns:
+            dict: {player_id: {"rect", "color", "name", "name_rect", "bounds"}}
+        """
+        username = self.config.username
+        sprites = {}
+        for player_id, player_data in players.items():
+            x = player_data.get("x", 0)
+            y = player_data.get("y", 0)
+            name = player_data.get("name", f"Player{player_id}")
+            
+            # Determine color (own player is blue, others are orange)
+            color = COLOR_SELF if name == username else COLOR_OTHER
+            player_rect = pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE)
+            sprite = {"rect": player_rect, "color": color, "name": None, "name_rect": None, "bounds": player_rect}
+            
+            # Player name above rectangle (only if visible in play area)
+            name_y = y - 10
+            if name_y > self.play_area.top:
+                name_surface = render_text(self.font_medium, name, COLOR_TEXT)
+                name_rect = name_surface.get_rect(center=(x + PLAYER_SIZE // 2, name_y))
+                sprite["name"] = name_surface
+                sprite["name_rect"] = name_rect
+                sprite["bounds"] = player_rect.union(name_rect)
+            sprites[player_id] = sprite
+        return sprites
     
-    def _draw_ui_background(self):
+    def _draw_ui_background(self, surface):
         """Draw background for UI areas."""
         screen_w, screen_h = self.config.resolution
         
         # Top UI area
         top_rect = pygame.Rect(0, 0, screen_w, UI_TOP_HEIGHT)
-        pygame.draw.rect(self.screen, COLOR_UI_BG, top_rect)
+        pygame.draw.rect(surface, COLOR_UI_BG, top_rect)
         
         # Bottom UI area
         bottom_rect = pygame.Rect(0, screen_h - UI_BOTTOM_HEIGHT, screen_w, UI_BOTTOM_HEIGHT)
-        pygame.draw.rect(self.screen, COLOR_UI_BG, bottom_rect)
+        pygame.draw.rect(surface, COLOR_UI_BG, bottom_rect)
     
-    def _draw_play_area_background(self):
+    def _draw_play_area_background(self, surface):
         """Draw play area background with visible border."""
         # Play area background (slightly different color)
-        pygame.draw.rect(self.screen, (40, 40, 40), self.play_area)
+        pygame.draw.rect(surface, (40, 40, 40), self.play_area)
         
         # Draw border around play area
         border_color = (100, 100, 100)
-        pygame.draw.rect(self.screen, border_color, self.play_area, 2)  # 2px border
+        pygame.draw.rect(surface, border_color, self.play_area, 2)  # 2px border
     
-    def _draw_players(self, players):
+    def _draw_players(self, sprites):
         """Draw all players (server handles wrapping)."""
-        for player_id, player_data in players.items():
-            x = player_data.get("x", 0)
-            y = player_data.get("y", 0)
-            name = player_data.get("name", f"Player{player_id}")
-            
-            # Determine color (own player is blue, others are orange)
-            is_self = (name == self.config.username)
-            color = COLOR_SELF if is_self else COLOR_OTHER
-            
-            # Draw player rectangle
-            player_rect = pygame.Rect(x, y, PLAYER_SIZE, PLAYER_SIZE)
-            pygame.draw.rect(self.screen, color, player_rect)
-            
-            # Draw player name above rectangle (only if visible in play area)
-            name_y = y - 10
-            if name_y > self.play_area.top:
-                name_surface = self.font_medium.render(name, True, COLOR_TEXT)
-                name_rect = name_surface.get_rect(
-                    center=(x + PLAYER_SIZE // 2, name_y)
-                )
-                self.screen.blit(name_surface, name_rect)
-    
-    def _draw_top_ui(self, players):
-        """Draw top UI elements (title and player grid)."""
-        # Draw title
-        role_text = "HOST" if self.is_host else "CLIENT"
-        title = self.font_title.render(f"DASH DASH - {role_text}", True, COLOR_TEXT)
-        self.screen.blit(title, (UI_SIDE_MARGIN, 10))
-
-        # Draw player list header
-        y_offset = 50
-        player_list_title = self.font_medium.render(f"Players ({len(players)}):", True, COLOR_TEXT)
-        self.screen.blit(player_list_title, (UI_SIDE_MARGIN, y_offset))
-
-        # Collect player info
-        player_names = []
-        for player_id, player_data in sorted(players.items()):
-            name = player_data.get("name", f"Player{player_id}")
-            is_self = (name == self.config.username)
-            player_names.append({'name': name, 'is_self': is_self})
-
-        # Grid layout parameters
-        max_rows = 2
-        max_cols = 4
-        row_height = 18
-        col_spacing = 120  # horizontal spacing between columns
-        x_start = UI_SIDE_MARGIN + 10
-        y_start = y_offset + 25
-
-        for i, player_info in enumerate(player_names):
-            row = i % max_rows
-            col = i // max_rows
-            if col >= max_cols:
-                # More players than grid can display
-                if i == max_rows * max_cols:
-                    more_text = self.font_small.render(
-                        f"... and {len(player_names) - max_rows * max_cols} more",
-                        True,
-                        COLOR_TEXT_DIM
-                    )
-                    self.screen.blit(more_text, (x_start, y_start + row * row_height))
-                break
-
-            x = x_start + col * col_spacing
-            y = y_start + row * row_height
-
-            display_name = f"• {player_info['name']}" + (" (You)" if player_info['is_self'] else "")
-            color = COLOR_SELF if player_info['is_self'] else COLOR_TEXT_DIM
-            name_surface = self.font_small.render(display_name, True, color)
-            self.screen.blit(name_surface, (x, y))
+        for sprite in sprites.values():
+            pygame.draw.rect(self.screen, sprite["color"], sprite["rect"])
+            if sprite["name"] is not None:
+                self.screen.blit(sprite["name"], sprite["name_rect"])
     
-    def _draw_bottom_ui(self):
-        """Draw bottom UI elements (controls hint)."""
+    def _draw_bottom_ui(self, ping):
+        """Draw bottom UI elements (ping; the controls hint is part of the background)."""
         screen_w, screen_h = self.config.resolution
         
-        # Controls hint
-        controls_text = self.font_small.render(
-            "Controls: WASD / Arrow Keys to move  |  ESC to exit",
-            True,
-            COLOR_TEXT_DIM
-        )
-        controls_rect = controls_text.get_rect(
-            center=(screen_w // 2, screen_h - UI_BOTTOM_HEIGHT // 2)
-        )
-        self.screen.blit(controls_text, controls_rect)
+        # Round-trip time from the client's clock sync
+        if ping is not None:
+            ping_text = render_text(self.font_small, ping, COLOR_TEXT_DIM)
+            ping_rect = ping_text.get_rect(
+                midright=(screen_w - UI_SIDE_MARGIN, screen_h - UI_BOTTOM_HEIGHT // 2)
+            )
+            self.screen.blit(ping_text, ping_rect)
     
     def _exit_game(self):
         """Exit the game and return to menu."""
-        print("Exiting game...")
+        log.info("Exiting game...")
         
         if self.back_callback:
             self.back_callback()
     
     def on_exit(self):
         """Called when leaving this screen."""
-        print("Game screen exited")
+        log.info("Game screen exited")
@@ -3,9 +3,13 @@
 import pygame
 from gui.screens.base_screen import BaseScreen
 from gui.elements.button import Button
+from gui.fonts import get_font
+from gui.text_cache import render_text
 
 
 class MainMenu(BaseScreen):
+    FONTS = ((72, True), (20,))
+    
     def __init__(self, screen, config, callbacks):
         super().__init__(screen, config)
         self.callbacks = callbacks
@@ -28,13 +32,10 @@ class MainMenu(BaseScreen):
             rect = pygame.Rect(cx - bw // 2, y - bh // 2, bw, bh)
             self.add_button(Button(txt, rect, cb, 28))
     
-    def draw(self):
-        super().draw()
-        font = pygame.font.SysFont(None, 72, bold=True)
-        title = font.render("DASH DASH", True, self.config.text_color)
+    def render(self):
+        super().render()
+        title = render_text(get_font(72, bold=True), "DASH DASH", self.config.text_color)
         self.screen.blit(title, title.get_rect(center=(self.config.resolution[0] // 2, 100)))
         
-        vfont = pygame.font.SysFont(None, 20)
-        ver = vfont.render(f"v{self.config.get('game.version')}", True, (150, 150, 150))
+        ver = render_text(get_font(20), f"v{self.config.get('game.version')}", (150, 150, 150))
         self.screen.blit(ver, ver.get_rect(bottomright=(self.config.resolution[0] - 10, self.config.resolution[1] - 10)))
-        pygame.display.flip()
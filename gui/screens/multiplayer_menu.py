@@ -1,18 +1,29 @@
 """
 Multiplayer Menu Screen
 Connect to server, host or join games.
+
+Games are rooms on the server named by the lobby name from the settings:
+Host Game creates it, Join Game enters an existing one and Connect to
+Server does whichever applies.
 """
 
 import pygame
 from gui.screens.base_screen import BaseScreen
 from gui.elements.button import Button
+from gui.fonts import get_font
+from gui.text_cache import render_text
 from gui.elements.label import Label
 from game.multiplayer.client import NetworkClient
+from library.log import get_logger
+
+log = get_logger("gui")
 
 
 class MultiplayerMenu(BaseScreen):
     """Multiplayer menu with connection management."""
     
+    FONTS = ((72, True), (20,), (18,))
+    
     def __init__(self, screen, config, callbacks):
         super().__init__(screen, config)
         self.callbacks = callbacks
@@ -49,25 +60,25 @@ class MultiplayerMenu(BaseScreen):
         )
         self.add_button(self.connect_btn)
         
-        # Join button (disabled initially)
+        # Join button
         join_rect = pygame.Rect(cx - bw // 2, int(h * 0.59) - bh // 2, bw, bh)
         self.join_btn = Button(
             "Join Game",
             join_rect,
             lambda: self._join_game(),
             font_size=28,
-            enabled=False
+            enabled=True
         )
         self.add_button(self.join_btn)
         
-        # Host button (disabled initially)
+        # Host button
         host_rect = pygame.Rect(cx - bw // 2, int(h * 0.71) - bh // 2, bw, bh)
         self.host_btn = Button(
             "Host Game",
             host_rect,
             lambda: self._host_game(),
             font_size=28,
-            enabled=False
+            enabled=True
         )
         self.add_button(self.host_btn)
         
@@ -90,25 +101,41 @@ class MultiplayerMenu(BaseScreen):
             self._disconnect_from_server()
             return
         
-        print("Attempting to connect to server...")
+        self._open_connection(create=None)
+    
+    def _open_connection(self, create):
+        """
+        Connect and enter the lobby named in the settings.
+        
+        Args:
+            create: True to create the lobby, False to join it, None for either
+        
+        Returns:
+            bool: True if connected
+        """
+        log.info("Attempting to connect to server...")
         
         # Update UI to show connecting state
         self.status_label.text = "Connecting..."
         self.connect_btn.enabled = False
         
         # Force a draw update to show "Connecting..."
-        self.draw()
+        self.present()
         
         # Get server info from config
         host = self.config.server_ip
         port = self.config.server_port
         username = self.config.username
         client_id = self.config.client_id
+        lobby = self.config.lobby_name
         
-        print(f"Connecting to {host}:{port} as {username} (ID: {client_id})")
+        log.info(f"Connecting to {host}:{port} as {username} (ID: {client_id}), lobby: {lobby}")
         
         # Try to connect
-        success, error = self.client.connect(host, port, username, client_id)
+        success, error = self.client.connect(
+            host, port, username, client_id,
+            room=lobby, create=create, max_players=self.config.max_players
+        )
         
         if success:
             # Connection successful
@@ -116,24 +143,25 @@ class MultiplayerMenu(BaseScreen):
             self.connect_btn.text = "Disconnect"
             self.connect_btn.enabled = True
             
-            # Enable join/host buttons
-            self.join_btn.enabled = True
-            self.host_btn.enabled = True
-            
-            print("Connected successfully!")
+            log.info("Connected successfully!")
         else:
             # Connection failed
             if "already connected" in error.lower():
                 self.status_label.text = "Already Connected"
+            elif "lobby name" in error.lower():
+                self.status_label.text = "Lobby Not Found" if create is False else "Lobby Taken"
+            elif "full" in error.lower():
+                self.status_label.text = "Lobby Full"
             else:
                 self.status_label.text = "Connection Failed"
             self.connect_btn.enabled = True
             
-            print(f"Connection failed: {error}")
+            log.warning(f"Connection failed: {error}")
+        return success
     
     def _disconnect_from_server(self):
         """Disconnect from server."""
-        print("Disconnecting...")
+        log.info("Disconnecting...")
         
         self.client.disconnect()
         
@@ -142,25 +170,22 @@ class MultiplayerMenu(BaseScreen):
         self.connect_btn.text = "Connect to Server"
         self.connect_btn.enabled = True
         
-        # Disable join/host buttons
-        self.join_btn.enabled = False
-        self.host_btn.enabled = False
-        
-        print("Disconnected")
+        log.info("Disconnected")
     
     def _join_game(self):
-        """Join an existing game."""
-        print("Joining game...")
-        # TODO: Show lobby browser or join directly
-        # For now, just start the game
+        """Join the existing game named by the lobby name."""
+        log.info("Joining game...")
+        # Already connected (e.g. back from a game): return to that room
+        if not self.client.is_connected() and not self._open_connection(create=False):
+            return
         if self.callbacks.get('start_game'):
             self.callbacks['start_game'](self.client, is_host=False)
     
     def _host_game(self):
-        """Host a new game."""
-        print("Hosting game...")
-        # TODO: Create lobby with settings
-        # For now, just start the game as host
+        """Host a new game under the lobby name with the configured max players."""
+        log.info("Hosting game...")
+        if not self.client.is_connected() and not self._open_connection(create=True):
+            return
         if self.callbacks.get('start_game'):
             self.callbacks['start_game'](self.client, is_host=True)
     
@@ -185,8 +210,6 @@ class MultiplayerMenu(BaseScreen):
                 self.status_label.text = "Connected"
                 self.connect_btn.text = "Disconnect"
                 self.connect_btn.enabled = True
-                self.join_btn.enabled = True
-                self.host_btn.enabled = True
         else:
             # Not connected - check if we were connected before
             if self.connect_btn.text == "Disconnect":
@@ -194,38 +217,37 @@ class MultiplayerMenu(BaseScreen):
                 self.status_label.text = "Disconnected"
                 self.connect_btn.text = "Connect to Server"
                 self.connect_btn.enabled = True
-                self.join_btn.enabled = False
-                self.host_btn.enabled = False
                 
                 # Check for error message
                 error = self.client.get_error()
                 if error:
-                    print(f"Connection error: {error}")
+                    log.warning(f"Connection error: {error}")
+    
+    def screen_state(self):
+        """The server info line, drawn outside the widgets."""
+        return self._server_info()
     
-    def draw(self):
+    def _server_info(self):
+        return (
+            f"Server: {self.config.server_ip}:{self.config.server_port} | "
+            f"Lobby: {self.client.room or self.config.lobby_name} | {self.status_label.text}"
+        )
+    
+    def render(self):
         """Draw the multiplayer menu."""
-        super().draw()
+        super().render()
         
         # Draw title
-        font = pygame.font.SysFont(None, 72, bold=True)
-        title = font.render("MULTIPLAYER", True, self.config.text_color)
+        title = render_text(get_font(72, bold=True), "MULTIPLAYER", self.config.text_color)
         self.screen.blit(title, title.get_rect(center=(self.config.resolution[0] // 2, 100)))
         
         # Draw version
-        vfont = pygame.font.SysFont(None, 20)
-        ver = vfont.render(f"v{self.config.get('game.version')}", True, (150, 150, 150))
+        ver = render_text(get_font(20), f"v{self.config.get('game.version')}", (150, 150, 150))
         self.screen.blit(ver, ver.get_rect(bottomright=(self.config.resolution[0] - 10, self.config.resolution[1] - 10)))
         
         # Draw server info
-        info_font = pygame.font.SysFont(None, 18)
-        server_info = info_font.render(
-            f"Server: {self.config.server_ip}:{self.config.server_port} | {self.status_label.text}",
-            True,
-            (150, 150, 150)
-        )
+        server_info = render_text(get_font(18), self._server_info(), (150, 150, 150))
         self.screen.blit(server_info, (10, self.config.resolution[1] - 30))
-        
-        pygame.display.flip()
     
     def on_exit(self):
         """Called when leaving this screen."""
@@ -4,9 +4,16 @@ import pygame
 from gui.screens.base_screen import BaseScreen
 from gui.elements.button import Button
 from gui.elements.text_input import TextInput
+from gui.fonts import get_font
+from gui.text_cache import render_text
+from library.log import get_logger
+
+log = get_logger("gui")
 
 
 class SettingsMenu(BaseScreen):
+    FONTS = ((28, True), (22,), (20,))
+    
     def __init__(self, screen, config, callbacks):
         super().__init__(screen, config)
         self.callback = callbacks.get('main_menu')
@@ -25,7 +32,9 @@ class SettingsMenu(BaseScreen):
             {'title': 'Multiplayer', 'items': [
                 {'key': 'lobby_name', 'label': 'Lobby Name', 'val': self.config.lobby_name, 'max': 32},
                 {'key': 'max_players', 'label': 'Max Players (2-8)', 'val': self.config.max_players, 'max': 1},
-                {'key': 'mp_speed', 'label': 'Speed (1-100)', 'val': self.config.multiplayer_speed, 'max': 3}
+                {'key': 'mp_speed', 'label': 'Speed (1-100)', 'val': self.config.multiplayer_speed, 'max': 3},
+                {'key': 'input_rate', 'label': 'Input Rate (10-120 Hz)', 'val': self.config.input_rate, 'max': 3},
+                {'key': 'interpolation_delay', 'label': 'Smoothing Delay (0-500 ms)', 'val': self.config.interpolation_delay, 'max': 3}
             ]},
             {'title': 'Server', 'items': [
                 {'key': 'server_ip', 'label': 'IP', 'val': self.config.server_ip, 'max': 15},
@@ -57,12 +66,14 @@ class SettingsMenu(BaseScreen):
             self.config.multiplayer_speed = self.input_map['mp_speed'].get_text()
             self.config.lobby_name = self.input_map['lobby_name'].get_text()
             self.config.max_players = self.input_map['max_players'].get_text()
+            self.config.input_rate = self.input_map['input_rate'].get_text()
+            self.config.interpolation_delay = self.input_map['interpolation_delay'].get_text()
             self.config.save()
-            print("Settings saved!")
+            log.info("Settings saved!")
             if self.callback:
                 self.callback()
         except ValueError as e:
-            print(f"Error: {e}")
+            log.error(f"Failed to save settings: {e}")
         
     
     def handle_event(self, event):
@@ -76,33 +87,31 @@ class SettingsMenu(BaseScreen):
                 el['input'].rect.y = el['y'] + self.scroll_y
         super().handle_event(event)
     
-    def draw(self):
-        super().draw()
+    def screen_state(self):
+        """Section boxes and field labels move with the scroll position."""
+        return self.scroll_y
+    
+    def render(self):
         self.screen.fill(self.config.bg_color)
         theme = {'button_color': self.config.button_color, 'button_hover': self.config.button_hover,
                  'text_color': self.config.text_color, 'input_border': self.config.input_border,
                  'input_active': self.config.input_active}
         
-        ft = pygame.font.SysFont(None, 28, bold=True)
-        fl = pygame.font.SysFont(None, 22)
-        
         for sec in self.sections:
             r = sec['rect'].move(0, self.scroll_y)
             if r.bottom < 70 or r.top > self.config.resolution[1]:
                 continue
             pygame.draw.rect(self.screen, (50, 50, 50), r, border_radius=8)
-            t = ft.render(sec['title'], True, self.config.text_color)
+            t = render_text(get_font(28, bold=True), sec['title'], self.config.text_color)
             self.screen.blit(t, t.get_rect(centerx=self.config.resolution[0] // 2, top=r.y + 10))
             for el in sec['elements']:
                 if el['input'].rect.bottom < 70 or el['input'].rect.top > self.config.resolution[1]:
                     continue
-                lbl = fl.render(el['label'], True, self.config.text_color)
+                lbl = render_text(get_font(22), el['label'], self.config.text_color)
                 self.screen.blit(lbl, lbl.get_rect(midright=(el['input'].rect.left - 20, el['input'].rect.centery)))
                 el['input'].draw(self.screen, theme)
         
         for b in self.buttons:
             b.draw(self.screen, theme)
-        vfont = pygame.font.SysFont(None, 20)
-        ver = vfont.render(f"v{self.config.get('game.version')}", True, (150, 150, 150))
+        ver = render_text(get_font(20), f"v{self.config.get('game.version')}", (150, 150, 150))
         self.screen.blit(ver, ver.get_rect(bottomright=(self.config.resolution[0] - 10, self.config.resolution[1] - 10)))
-        pygame.display.flip()
@@ -0,0 +1,90 @@
+"""
+Text Cache
+Rendered text surfaces and text sizes shared by every widget and screen.
+
+font.render() rasterizes every glyph each time it is called, and most
+text on screen (labels, buttons, name tags, the HUD) is the same from
+one frame to the next. render_text() keeps the surfaces it made, keyed
+by (font, text, color, antialias), and evicts the least recently used
+ones once they take more than MAX_CACHE_BYTES. Cached surfaces are
+shared: blit them, never draw on them.
+"""
+
+from collections import OrderedDict
+
+MAX_CACHE_BYTES = 8 * 1024 * 1024  # Pixel memory of cached surfaces
+MAX_SIZE_ENTRIES = 4096            # Cached font.size() results
+
+
+class TextCache:
+    """LRU cache of font.render() surfaces and font.size() results."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, max_sizes=MAX_SIZE_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_sizes = max_sizes
+        self.surfaces = OrderedDict()  # {(font, text, color, antialias): (surface, bytes)}
+        self.sizes = OrderedDict()     # {(font, text): (width, height)}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Surface of `text` in `font`, rendered once and reused.
+
+        Args:
+            font: pygame.font.Font
+            text: String to draw
+            color: RGB(A) tuple or list
+            antialias: Smooth glyph edges
+
+        Returns:
+            pygame.Surface: Shared surface, don't draw on it
+        """
+        key = (font, text, tuple(color), antialias)
+        entry = self.surfaces.get(key)
+        if entry is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        size = surface.get_pitch() * surface.get_height()
+        self.surfaces[key] = (surface, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, (_, evicted) = self.surfaces.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+        return surface
+
+    def size(self, font, text):
+        """font.size(text), remembered."""
+        key = (font, text)
+        size = self.sizes.get(key)
+        if size is not None:
+            self.sizes.move_to_end(key)
+            return size
+        size = self.sizes[key] = font.size(text)
+        if len(self.sizes) > self.max_sizes:
+            self.sizes.popitem(last=False)
+        return size
+
+    def clear(self):
+        self.surfaces.clear()
+        self.sizes.clear()
+        self.bytes = 0
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """Cached font.render(text, antialias, color); see TextCache.render."""
+    return text_cache.render(font, text, color, antialias)
+
+
+def text_size(font, text):
+    """Cached font.size(text)."""
+    return text_cache.size(font, text)
@@ -10,6 +10,14 @@ from library.validators import validate_username, validate_ip, validate_port, un
 class ConfigManager:
     CONFIG_DIR = Path("config")
     CONFIG_FILE = CONFIG_DIR / "settings.yaml"
+    # setting: CONSTRAINTS entry its loaded value is clamped to
+    RANGES = {
+        'singleplayer.speed': 'speed',
+        'multiplayer.speed': 'speed',
+        'multiplayer.max_players': 'max_players',
+        'multiplayer.input_rate': 'input_rate',
+        'multiplayer.interpolation_delay': 'interpolation_delay'
+    }
     
     def __init__(self):
         self._config = {}
@@ -31,6 +39,23 @@ class ConfigManager:
         if not self.get("user.client_id"):
             self.set("user.client_id", str(uuid.uuid4()))
             self.save()
+        self._clamp_ranges()
+    
+    def _clamp_ranges(self):
+        """Bring hand-edited numbers back into range, e.g. input_rate: 0, which the game divides by."""
+        for key, name in self.RANGES.items():
+            c = CONSTRAINTS[name]
+            try:
+                val = int(self.get(key))
+            except (TypeError, ValueError, OverflowError):
+                val = self._default(key)
+            self.set(key, min(c['max'], max(c['min'], val)))
+    
+    def _default(self, key):
+        val = DEFAULT_CONFIG
+        for k in key.split('.'):
+            val = val[k]
+        return val
     
     def _merge(self, loaded):
         import copy
@@ -190,3 +215,29 @@ class ConfigManager:
             self.set('multiplayer.max_players', val)
         else:
             raise ValueError(f"Max players {c['min']}-{c['max']}")
+    
+    @property
+    def input_rate(self):
+        return self.get('multiplayer.input_rate')
+    
+    @input_rate.setter
+    def input_rate(self, v):
+        val = int(v)
+        c = CONSTRAINTS['input_rate']
+        if c['min'] <= val <= c['max']:
+            self.set('multiplayer.input_rate', val)
+        else:
+            raise ValueError(f"Input rate {c['min']}-{c['max']}")
+    
+    @property
+    def interpolation_delay(self):
+        return self.get('multiplayer.interpolation_delay')
+    
+    @interpolation_delay.setter
+    def interpolation_delay(self, v):
+        val = int(v)
+        c = CONSTRAINTS['interpolation_delay']
+        if c['min'] <= val <= c['max']:
+            self.set('multiplayer.interpolation_delay', val)
+        else:
+            raise ValueError(f"Interpolation delay {c['min']}-{c['max']}")
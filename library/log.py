@@ -0,0 +1,225 @@
+"""
+Logging
+Levelled, rate-limited logging that writes from a background thread.
+
+Code logs through get_logger(category), e.g. get_logger("server.net").
+A call below the configured level costs one cached level check, so
+debug detail can stay in hot paths. Calls that pass are formatted in the
+caller and put on a queue; a background thread does the slow stdout
+write, so a blocked terminal never stalls a tick or a frame. If the
+queue fills up, records are dropped rather than waited for.
+
+Chatty categories can be limited to a number of records per second or
+sampled (one in N). Limits apply to a category and everything below it
+and never to errors. Records a rate limit suppressed are counted on the
+next one that gets through.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+ROOT = "dash"            # Parent logger of every category
+QUEUE_SIZE = 10000       # Records waiting for the writer thread before new ones are dropped
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+FORMATS = ("text", "json")
+
+# Attributes every LogRecord has; anything else came in through extra= and is a structured field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "suppressed"}
+
+_state = {"handler": None, "listener": None}
+
+
+def get_logger(category):
+    """Logger of one category, e.g. "server.net" or "client"."""
+    return logging.getLogger(f"{ROOT}.{category}")
+
+
+class RateLimitFilter(logging.Filter):
+    """Per-category token bucket and sampling for records below ERROR."""
+
+    def __init__(self, limits=None, samples=None):
+        """
+        Args:
+            limits: {category: records per second}, bursts of up to one second's worth pass
+            samples: {category: N}, let one in every N records through
+        """
+        super().__init__()
+        self.limits = dict(limits or {})
+        self.samples = dict(samples or {})
+        self.lock = threading.Lock()
+        self.rules = {}        # {logger name: (category, limit, sample)}, resolved once per logger
+        self.buckets = {}      # {category: [tokens, last refill]}
+        self.counts = {}       # {category: records seen, for sampling}
+        self.suppressed = {}   # {category: records dropped since the last one passed}
+
+    def _rule(self, name):
+        rule = self.rules.get(name)
+        if rule is None:
+            category = name[len(ROOT) + 1:] if name.startswith(ROOT + ".") else name
+            limit = sample = None
+            # The most specific configured category wins: "server.net.x" uses "server.net"
+            parts = category.split(".")
+            for end in range(len(parts), 0, -1):
+                prefix = ".".join(parts[:end])
+                if limit is None and prefix in self.limits:
+                    limit = self.limits[prefix]
+                if sample is None and prefix in self.samples:
+                    sample = self.samples[prefix]
+            rule = self.rules[name] = (category, limit, sample)
+        return rule
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        category, limit, sample = self._rule(record.name)
+        if limit is None and sample is None:
+            return True
+        with self.lock:
+            if sample:
+                count = self.counts.get(category, 0)
+                self.counts[category] = count + 1
+                if count % sample:
+                    return False
+            if limit:
+                now = time.monotonic()
+                bucket = self.buckets.get(category)
+                if bucket is None:
+                    bucket = self.buckets[category] = [float(limit), now]
+                bucket[0] = min(float(limit), bucket[0] + (now - bucket[1]) * limit)
+                bucket[1] = now
+                if bucket[0] < 1.0:
+                    self.suppressed[category] = self.suppressed.get(category, 0) + 1
+                    return False
+                bucket[0] -= 1.0
+            suppressed = self.suppressed.pop(category, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the writer falls behind."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        if self.dropped:
+            # Unlocked on purpose: a miscount under contention is harmless
+            record.suppressed = getattr(record, "suppressed", 0) + self.dropped
+            self.dropped = 0
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    """`12:00:01.250 [TAG] message`, the same lines the game always printed, with a timestamp."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s.%(msecs)03d %(message)s", "%H:%M:%S")
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" (+{suppressed} suppressed)"
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, category, message and any extra= fields."""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "category": record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + ".") else record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        return json.dumps(entry, default=str)
+
+
+def parse_categories(text):
+    """Comma-separated category list, e.g. from --debug, as a tuple."""
+    return tuple(part.strip() for part in (text or "").split(",") if part.strip())
+
+
+def setup_logging(level="INFO", debug=(), limits=None, samples=None, fmt="text", stream=None):
+    """
+    Route every category through the background writer. Calling it again
+    replaces the previous setup.
+
+    Args:
+        level: Level name for every category
+        debug: Categories to log at DEBUG regardless of `level`
+        limits: {category: records per second}
+        samples: {category: N}, keep one in N records
+        fmt: "text" or "json"
+        stream: Where to write (default: sys.stdout)
+    """
+    shutdown_logging()
+    root = logging.getLogger(ROOT)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    root.propagate = False
+    # Reset categories a previous setup put at DEBUG
+    for name, logger in list(logging.root.manager.loggerDict.items()):
+        if name.startswith(ROOT + ".") and isinstance(logger, logging.Logger):
+            logger.setLevel(logging.NOTSET)
+    for category in debug:
+        get_logger(category).setLevel(logging.DEBUG)
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+    handler.addFilter(RateLimitFilter(limits, samples))
+    listener = QueueListener(handler.queue, writer)
+    root.addHandler(handler)
+    listener.start()
+    _state["handler"] = handler
+    _state["listener"] = listener
+
+
+def shutdown_logging():
+    """Write out everything queued and stop the writer thread."""
+    handler, listener = _state["handler"], _state["listener"]
+    if listener is not None:
+        listener.stop()
+    if handler is not None:
+        logging.getLogger(ROOT).removeHandler(handler)
+    _state["handler"] = _state["listener"] = None
+
+
+def _restart_in_child():
+    # A forked process (a sharded worker) inherits the queue but not the writer thread
+    listener = _state["listener"]
+    if listener is None:
+        return
+    handler = _state["handler"]
+    handler.queue = queue.Queue(QUEUE_SIZE)
+    listener = QueueListener(handler.queue, *listener.handlers)
+    listener.start()
+    _state["listener"] = listener
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,177 @@
+"""
+Tracing
+Opt-in span recorder that writes Chrome trace JSON, for finding the
+single slow tick or frame that averages hide.
+
+Spans go into a ring buffer sized for the configured window, so tracing
+can stay on for minutes; dump() writes the last `seconds` of it for
+chrome://tracing or ui.perfetto.dev. Timestamps come from
+time.perf_counter_ns(), the monotonic clock every process shares, so
+the dumps of a sharded server's workers line up when opened together.
+
+While tracing is off, span() hands back a shared no-op context manager,
+so instrumented hot paths pay for one attribute check.
+"""
+
+import json
+import os
+import signal
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from library.log import get_logger
+
+EVENTS_PER_SECOND = 5000  # Ring buffer capacity per second of window
+MAX_EVENTS = 500000       # Hard cap on the ring buffer, about 60 MB
+
+log = get_logger("trace")
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("events", "name", "category", "args", "start")
+
+    def __init__(self, events, name, category, args):
+        self.events = events
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.events.append(
+            (self.name, self.category, self.start, time.perf_counter_ns(), threading.get_native_id(), self.args)
+        )
+        return False
+
+
+class Tracer:
+    """Process-wide span ring buffer, off until configure() is called with a window."""
+
+    def __init__(self):
+        self.enabled = False
+        self.seconds = 0
+        self.directory = Path("traces")
+        self.label = "trace"
+        self.events = deque(maxlen=1)  # (name, category, start ns, end ns, thread id, args or None)
+
+    def configure(self, seconds, directory="traces", label="trace"):
+        """
+        Args:
+            seconds: Window to keep and dump, 0 turns tracing off
+            directory: Where dumps are written
+            label: File name prefix, e.g. "server" or "client"
+        """
+        self.seconds = seconds
+        self.directory = Path(directory)
+        self.label = label
+        self.events = deque(maxlen=max(1, min(MAX_EVENTS, int(seconds * EVENTS_PER_SECOND))))
+        self.enabled = seconds > 0
+
+    def span(self, name, category, args=None):
+        """
+        Context manager timing one phase.
+
+        Args:
+            name: Phase name, e.g. "simulate"
+            category: Group the phase belongs to, e.g. "tick" or "frame"
+            args: Optional dict shown with the span
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self.events, name, category, args)
+
+    def dump(self):
+        """
+        Write the last `seconds` of spans from a background thread.
+
+        Returns:
+            Path or None: File being written, None if tracing is off
+        """
+        if not self.enabled:
+            return None
+        # Copying the deque is one C call, so recording threads can't change it halfway
+        events = list(self.events)
+        threads = {thread.native_id: thread.name for thread in threading.enumerate()}
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = self.directory / f"{self.label}-{os.getpid()}-{stamp}.json"
+        cutoff = time.perf_counter_ns() - int(self.seconds * 1e9)
+        threading.Thread(target=self._write, args=(path, events, threads, cutoff), daemon=True).start()
+        return path
+
+    def _write(self, path, events, threads, cutoff):
+        pid = os.getpid()
+        trace = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{self.label} {pid}"}}
+        ]
+        seen = set()
+        for name, category, start, end, tid, args in events:
+            if end < cutoff:
+                continue
+            event = {
+                "name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                "ts": start / 1000, "dur": (end - start) / 1000
+            }
+            if args:
+                event["args"] = args
+            trace.append(event)
+            seen.add(tid)
+        for tid in seen:
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": threads.get(tid, str(tid))}})
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}))
+        except OSError as e:
+            log.error(f"[ERROR] Failed to write trace to {path}: {e}")
+            return
+        log.info(f"[TRACE] Wrote {len(trace) - len(seen) - 1} spans to {path}")
+
+
+tracer = Tracer()
+
+
+def dump_on_signal(callback=None):
+    """
+    Dump the trace when the process gets SIGUSR1 (Unix only).
+
+    Args:
+        callback: Called instead of dumping, e.g. to pass the signal on
+                  to the processes that hold the spans
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return
+
+    def handler(signum, frame):
+        if callback is not None:
+            callback()
+        else:
+            tracer.dump()
+
+    signal.signal(signal.SIGUSR1, handler)
+
+
+def _reset_in_child():
+    # A forked worker starts with an empty buffer of its own
+    if tracer.enabled:
+        tracer.events = deque(maxlen=tracer.events.maxlen)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_in_child)
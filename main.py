@@ -7,11 +7,20 @@ os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 import pygame
 import sys
 from library.config_manager import ConfigManager
+from library.log import get_logger, parse_categories, setup_logging, shutdown_logging
+from library.trace import tracer, dump_on_signal
+from gui.screens.base_screen import update_display
 from gui.screens.main_menu import MainMenu
 from gui.screens.settings_menu import SettingsMenu
 from gui.screens.multiplayer_menu import MultiplayerMenu
 from gui.screens.game_screen import GameScreen
 
+log = get_logger("game")
+
+# Per-snapshot client detail (logging.debug: client.net in settings.yaml) is capped at 20 lines a second
+LOG_LIMITS = {"client.net": 20}
+TRACE_DUMP_KEY = pygame.K_F9  # Writes the last trace.seconds of frames when tracing is on
+
 
 class Game:
     """Main game application."""
@@ -19,6 +28,14 @@ class Game:
     def __init__(self):
         pygame.init()
         self.config = ConfigManager()
+        setup_logging(
+            self.config.get('logging.level', "INFO"),
+            parse_categories(self.config.get('logging.debug')),
+            LOG_LIMITS,
+            fmt=self.config.get('logging.format', "text")
+        )
+        tracer.configure(self.config.get('trace.seconds', 0), self.config.get('trace.dir', "traces"), "client")
+        dump_on_signal()
         self.screen = pygame.display.set_mode(self.config.resolution)
         pygame.display.set_caption(f"{self.config.get('game.name')} v{self.config.get('game.version')}")
         self.running = True
@@ -56,7 +73,7 @@ class Game:
     def _change_screen(self, screen_name):
         """Switch to a different screen."""
         if screen_name not in self.screens:
-            print(f"Warning: Screen '{screen_name}' not found!")
+            log.warning(f"Screen '{screen_name}' not found!")
             return
         
         if self.current_screen:
@@ -65,12 +82,12 @@ class Game:
         self.current_screen = self.screens[screen_name]
         self.current_screen.on_enter()
         
-        print(f"Switched to screen: {screen_name}")
+        log.info(f"Switched to screen: {screen_name}")
     
     def _start_singleplayer(self):
         """Start a singleplayer game."""
-        print("Starting Singleplayer...")
-        print(f"Speed: {self.config.singleplayer_speed}, Username: {self.config.username}")
+        log.info("Starting Singleplayer...")
+        log.info(f"Speed: {self.config.singleplayer_speed}, Username: {self.config.username}")
         # TODO: Implement singleplayer game
     
     def _start_multiplayer_game(self, client, is_host):
@@ -81,7 +98,7 @@ class Game:
             client: NetworkClient instance (already connected)
             is_host: bool, True if hosting
         """
-        print(f"Starting multiplayer game (host={is_host})...")
+        log.info(f"Starting multiplayer game (host={is_host})...")
         
         # Store client reference
         self.network_client = client
@@ -102,7 +119,7 @@ class Game:
     
     def _exit_multiplayer_game(self):
         """Exit multiplayer game and return to multiplayer menu."""
-        print("Exiting multiplayer game...")
+        log.info("Exiting multiplayer game...")
         
         # Remove game screen
         if 'game' in self.screens:
@@ -113,30 +130,46 @@ class Game:
     
     def _quit_game(self):
         """Exit the game."""
-        print("Quitting game...")
+        log.info("Quitting game...")
         self.running = False
     
     def run(self):
         """Main game loop."""
         while self.running:
-            dt = self.clock.tick(60) / 1000.0
+            with tracer.span("clock.tick", "frame"):
+                dt = self.clock.tick(60) / 1000.0
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                
-                if self.current_screen:
-                    self.current_screen.handle_event(event)
+            with tracer.span("event pump", "frame"):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                    
+                    if event.type == pygame.KEYDOWN and event.key == TRACE_DUMP_KEY and tracer.enabled:
+                        tracer.dump()
+                        continue
+                    
+                    # The window manager lost what was on screen; push all of it again
+                    if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) and self.current_screen:
+                        self.current_screen.invalidate()
+                    
+                    if self.current_screen:
+                        self.current_screen.handle_event(event)
             
             if self.current_screen:
-                self.current_screen.update(dt)
-                self.current_screen.draw()
+                with tracer.span("update", "frame"):
+                    self.current_screen.update(dt)
+                with tracer.span("draw", "frame"):
+                    dirty = self.current_screen.draw()
+                # Screens draw into the back buffer; only what changed is pushed, once, here
+                with tracer.span("display.update", "frame"):
+                    update_display(dirty)
         
         # Cleanup
         if self.network_client and self.network_client.is_connected():
             self.network_client.disconnect()
         
         pygame.quit()
+        shutdown_logging()
         sys.exit()
 
 
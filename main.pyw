@@ -8,6 +8,7 @@ os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
 import pygame
 import sys
 from library.config_manager import ConfigManager
+from gui.screens.base_screen import update_display
 from gui.screens.main_menu import MainMenu
 from gui.screens.settings_menu import SettingsMenu
 from gui.screens.multiplayer_menu import MultiplayerMenu
@@ -73,7 +74,7 @@ class Game:
                     self.current_screen.handle_event(event)
             if self.current_screen:
                 self.current_screen.update(dt)
-                self.current_screen.draw()
+                update_display(self.current_screen.draw())
         pygame.quit()
         sys.exit()
 
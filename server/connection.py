@@ -0,0 +1,55 @@
+"""
+Client Connection
+Network-side state of one connected socket, kept apart from the player
+table so snapshots can be built without touching socket objects.
+"""
+
+import time
+
+from game.multiplayer.framing import MAX_CLIENT_FRAME_SIZE, FrameReader
+from server.outbound import OutboundQueue
+
+
+class Connection:
+    """One client socket and its protocol state."""
+
+    def __init__(self, conn, addr, player_id, max_lag_ticks):
+        self.conn = conn
+        self.addr = addr
+        self.player_id = player_id
+        self.protocol = None  # Set once the handshake is accepted
+        self.client_id = None
+        self.reserved_client_id = None  # client_id the supervisor reserved for this socket (sharded mode)
+        self.room = None      # Room the handshake put the player in
+        self.ack = None       # Newest snapshot tick the client acknowledged
+        self.input_seq = 0    # Sequence number of the newest input accepted
+        self.views = {}       # {tick: frozenset of player ids sent} with interest culling on
+        self.reader = FrameReader(max_frame_size=MAX_CLIENT_FRAME_SIZE)
+        self.accepted = time.monotonic()   # When the socket was accepted, for the handshake deadline
+        self.last_seen = self.accepted     # When the client last sent anything, for heartbeats
+        # Metrics, summed by ServerMetrics.collect()
+        self.messages_in = 0
+        self.bytes_in = 0
+        self.rtt = None       # Smoothed seconds from a snapshot's tick to its ack
+        self.outbound = OutboundQueue(max_lag_ticks)
+        # Event loop bookkeeping
+        self.closing = False  # Close once the outbound queue is flushed
+        self.writing = False  # Registered for EVENT_WRITE
+
+    @property
+    def registered(self):
+        return self.protocol is not None
+
+    def flush(self):
+        """Send queued data without blocking. Returns True when drained."""
+        return self.outbound.flush(self.conn)
+
+    def remember_view(self, tick, visible, keep):
+        """Record which players were sent at tick, forgetting views older than keep ticks."""
+        self.views[tick] = visible
+        oldest = tick - keep
+        while self.views:
+            first = next(iter(self.views))
+            if first > oldest:
+                break
+            del self.views[first]
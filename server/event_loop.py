@@ -0,0 +1,205 @@
+"""
+Event Loop Server
+Single-threaded selectors driver that accepts, reads and writes every
+connection of a GameServer without spawning a thread per socket.
+
+As a sharded worker it has no listening socket: clients are handed over
+by the supervisor along with the handshake bytes it already read.
+"""
+
+import selectors
+import socket
+import time
+
+from library.log import get_logger
+from library.trace import tracer
+from server.supervisor import MAX_HANDOFF_SIZE, decode_handoff
+
+log = get_logger("server")
+net_log = get_logger("server.net")
+
+
+class EventLoop:
+    """Runs GameServer I/O from one selectors loop."""
+
+    def __init__(self, game_server):
+        self.game_server = game_server
+        self.selector = selectors.DefaultSelector()
+        self.connections = {}  # {player_id: Connection} served by this loop
+
+    def run(self):
+        """Serve until game_server.running is cleared."""
+        listener = self.game_server.server
+        if listener is not None:
+            listener.setblocking(False)
+            self.selector.register(listener, selectors.EVENT_READ, data=None)
+        channel = self.game_server.supervisor
+        if channel is not None:
+            self.selector.register(channel, selectors.EVENT_READ, data=None)
+        interval = 1.0 / self.game_server.server_config.tick_rate
+        next_tick = time.perf_counter()
+        next_reap = next_tick + 1.0
+        try:
+            while self.game_server.running:
+                timeout = max(0.0, next_tick - time.perf_counter())
+                events = self.selector.select(timeout=timeout)
+                if events:
+                    with tracer.span("input drain", "input"):
+                        self._dispatch(events, listener, channel)
+                now = time.perf_counter()
+                if now >= next_tick:
+                    frames = self.game_server.tick()
+                    with tracer.span("send", "tick"):
+                        self._broadcast(frames)
+                    if channel is not None:
+                        self.game_server.report_departures()
+                    self.game_server.report_stats()
+                    if now >= next_reap:
+                        self._reap(time.monotonic())
+                        next_reap = now + 1.0
+                    next_tick += interval
+                    if next_tick < now:
+                        # Fell behind: skip the missed ticks instead of bursting to catch up
+                        next_tick = now + interval
+        finally:
+            for connection in list(self.connections.values()):
+                self._close(connection)
+            self.selector.close()
+
+    def _dispatch(self, events, listener, channel):
+        """Handle one select() worth of ready sockets."""
+        for key, mask in events:
+            if key.data is None:
+                if key.fileobj is listener:
+                    self._accept(listener)
+                else:
+                    self._receive_handoff(channel)
+                continue
+            connection = key.data
+            try:
+                if mask & selectors.EVENT_READ:
+                    self._read(connection)
+                if mask & selectors.EVENT_WRITE and connection.player_id in self.connections:
+                    self._write(connection)
+            except Exception as e:
+                net_log.warning(f"[ERROR] Player {connection.player_id}: {e}")
+                self._close(connection)
+
+    def _accept(self, listener):
+        try:
+            conn, addr = listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        self._add(conn, addr)
+
+    def _receive_handoff(self, channel):
+        """Adopt a client socket passed by the supervisor and replay its handshake."""
+        try:
+            message, fds, _, _ = socket.recv_fds(channel, MAX_HANDOFF_SIZE, 1)
+        except (BlockingIOError, InterruptedError):
+            return
+        if not message and not fds:
+            log.error(f"[WORKER {self.game_server.worker_index}] Lost the supervisor, shutting down")
+            self.game_server.running = False
+            return
+        addr, client_id, data = decode_handoff(message)
+        connection = self._add(socket.socket(fileno=fds[0]), addr)
+        if connection is None:
+            self.game_server.release_reservation(client_id)
+            return
+        connection.reserved_client_id = client_id
+        if data:
+            connection.reader.feed(data)
+            self._handle_messages(connection)
+
+    def _add(self, conn, addr):
+        connection = self.game_server.accept_player(conn, addr)
+        if connection is None:
+            return None
+        self.connections[connection.player_id] = connection
+        self.selector.register(conn, selectors.EVENT_READ, data=connection)
+        net_log.info(f"[NEW CONNECTION] Player {connection.player_id} connected from {addr}",
+                     extra={"player": connection.player_id})
+        net_log.info(f"[ACTIVE CONNECTIONS] {len(self.connections)} / {self.game_server.capacity()}")
+        return connection
+
+    def _read(self, connection):
+        try:
+            count = connection.reader.recv_from(connection.conn)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            net_log.warning(f"[ERROR] Player {connection.player_id}: {e}")
+            self._close(connection)
+            return
+        if not count:
+            if not connection.registered:
+                net_log.warning(f"[ERROR] Player {connection.player_id} disconnected before sending client_id")
+            self._close(connection)
+            return
+        connection.last_seen = time.monotonic()
+        connection.bytes_in += count
+        self._handle_messages(connection)
+
+    def _handle_messages(self, connection):
+        """Register or apply every complete message buffered for a connection."""
+        try:
+            for message in connection.reader.messages():
+                if connection.closing:
+                    return
+                if connection.registered:
+                    if self.game_server.apply_input(connection, self.game_server.decode_input(connection.protocol, message)):
+                        self._write(connection)
+                    continue
+                if not self.game_server.register_player(connection, self.game_server.decode_handshake(message)):
+                    connection.closing = True
+                self._write(connection)
+        except Exception as e:
+            # Whatever a client sent, only its own connection goes, never the loop
+            net_log.warning(f"[ERROR] Player {connection.player_id}: {e}")
+            self._close(connection)
+
+    def _write(self, connection):
+        """Flush the connection's outbound queue, waiting for EVENT_WRITE if the socket is full."""
+        try:
+            drained = connection.flush()
+        except OSError as e:
+            net_log.warning(f"[ERROR] Failed to send update to Player {connection.player_id}: {e}")
+            self._close(connection)
+            return
+        if drained and connection.closing:
+            self._close(connection)
+        elif drained == connection.writing:
+            connection.writing = not drained
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if connection.writing else 0)
+            self.selector.modify(connection.conn, events, data=connection)
+
+    def _broadcast(self, frames):
+        for player_id in self.game_server.queue_snapshots(frames):
+            connection = self.connections.get(player_id)
+            if connection:
+                self._close(connection)
+        for connection in list(self.connections.values()):
+            if connection.registered and not connection.closing:
+                self._write(connection)
+
+    def _reap(self, now):
+        """Close connections past their handshake or heartbeat deadline."""
+        for connection in list(self.connections.values()):
+            reason = self.game_server.timed_out(connection, now)
+            if reason:
+                net_log.warning(f"[TIMEOUT] Player {connection.player_id} - {reason}", extra={"player": connection.player_id})
+                self._close(connection)
+
+    def _close(self, connection):
+        if self.connections.pop(connection.player_id, None) is None:
+            return
+        try:
+            self.selector.unregister(connection.conn)
+        except (KeyError, ValueError):
+            pass
+        try:
+            connection.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.game_server.remove_player(connection.player_id)
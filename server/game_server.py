@@ -3,55 +3,171 @@ Game Server - Updated with Diagonal Movement and Client ID Validation
 Manages multiplayer game sessions and synchronizes player positions.
 """
 
+import errno
 import socket
 import threading
 import json
+import os
+import selectors
 import sys
+import time
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from server.server_config import ServerConfig
-from game.constants import *
+from server.event_loop import EventLoop
+from server.supervisor import Supervisor, HAS_FD_PASSING, MAX_DEPARTURES, MAX_REPORT_SIZE
+from server.connection import Connection
+from server.metrics import ServerMetrics, MetricsDumper, MetricsEndpoint, render as render_metrics
+from server.room import Room, room_name as requested_room
+from library.log import get_logger, parse_categories, setup_logging
+from library.trace import tracer, dump_on_signal
+from game.multiplayer.framing import encode_frame
+from game.multiplayer.protocol import (
+    PROTOCOL_JSON, BINARY_VERSION, MAX_PLAYER_ID, decode_client_message, encode_pong,
+    validate_client_message, validate_handshake
+)
+
+log = get_logger("server")
+net_log = get_logger("server.net")      # Connections coming and going
+input_log = get_logger("server.input")  # Every client message, DEBUG only
+tick_log = get_logger("server.tick")    # Every tick, DEBUG only
+
+# Connection churn (e.g. a bot fleet joining) is capped so it can't flood the terminal
+LOG_LIMITS = {"server.net": 50}
+# With --debug server.input, log one message in 30 instead of all of them
+LOG_SAMPLES = {"server.input": 30}
 
 
 class GameServer:
-    def __init__(self):
-        self.players = {}  # {player_id: {..., 'conn': conn}}
+    def __init__(self, server_config=None, listen=True):
+        """
+        Args:
+            server_config: ServerConfig to use, None to load it and parse the command line
+            listen: Bind the listening socket (sharded workers are handed sockets instead)
+        """
+        self.connections = {}  # {player_id: Connection} for every socket, in a room or not
+        self.rooms = {}  # {name: Room}
         self.client_ids = set()
         self.player_id_counter = 1
-        self.lock = threading.Lock()
-        self.server_config = ServerConfig()
-        self.server_config.parse_args()
-        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server.bind((self.server_config.host, self.server_config.port))
-        self.server.listen()
-        self.state_changed = threading.Event()
+        self.lock = threading.Lock()  # Guards connections, rooms and client_ids, never room state
+        if server_config is None:
+            server_config = ServerConfig()
+            server_config.parse_args()
+        self.server_config = server_config
+        self.server = None
+        if listen:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server.bind((self.server_config.host, self.server_config.port))
+            self.server.listen()
+        self.supervisor = None  # Unix socket to the supervisor when running as a sharded worker
+        self.worker_index = None
+        self.departed = []  # client_ids the supervisor reserved whose sockets are gone, not yet reported
+        self.ticks_run = 0  # Tick counters reported to the supervisor
+        self.tick_seconds = 0.0
+        self.last_report = time.perf_counter()
+        self.metrics = ServerMetrics()
+        self.metrics_dumper = MetricsDumper(self.server_config.metrics_file, self.server_config.metrics_interval)
         self.running = True
 
     def start(self):
-        print("=" * 70)
-        print(f"[STARTED] Dash Dash Game Server")
-        print("=" * 70)
-        print(f"  Host: {self.server_config.host}")
-        print(f"  Port: {self.server_config.port}")
-        print(f"  Max Players: {self.server_config.max_players}")
-        print(f"  Config: {ServerConfig.CONFIG_FILE}")
-        print("=" * 70)
-        print("Waiting for connections...")
-        print()
+        setup_logging(
+            self.server_config.log_level, parse_categories(self.server_config.log_debug),
+            LOG_LIMITS, LOG_SAMPLES, self.server_config.log_format
+        )
+        tracer.configure(self.server_config.trace_seconds, self.server_config.trace_dir, "server")
+        log.info("=" * 70)
+        log.info(f"[STARTED] Dash Dash Game Server")
+        log.info("=" * 70)
+        log.info(f"  Host: {self.server_config.host}")
+        log.info(f"  Port: {self.server_config.port}")
+        log.info(f"  Max Players: {self.server_config.max_players} per room")
+        log.info(f"  Max Rooms: {self.server_config.max_rooms}")
+        log.info(f"  Mode: {self.server_config.mode}")
+        log.info(f"  Tick Rate: {self.server_config.tick_rate} Hz")
+        log.info(f"  Interest Radius: {self.server_config.interest_radius or 'off'}")
+        log.info(f"  Metrics: {self._metrics_summary()}")
+        log.info(f"  Trace: {self._trace_summary()}")
+        log.info(f"  Config: {ServerConfig.CONFIG_FILE}")
+        log.info("=" * 70)
+        log.info("Waiting for connections...")
+        if self.server_config.mode != "sharded":
+            # Sharded workers report to the supervisor, which serves the merged metrics
+            self._start_metrics_endpoint(lambda: render_metrics(self.metrics.get_samples()))
+            dump_on_signal()
+        if self.server_config.mode == "event_loop":
+            self._run_event_loop()
+            return
+        if self.server_config.mode == "sharded":
+            self._run_sharded()
+            return
         threading.Thread(target=self.connection_handler, daemon=True).start()
-        threading.Thread(target=self.broadcaster, daemon=True).start()
+        threading.Thread(target=self.tick_loop, daemon=True).start()
         try:
             while self.running:
                 threading.Event().wait(1)
         except KeyboardInterrupt:
-            print("\n[SHUTDOWN] Server shutting down...")
-            self.running = False
+            self._shutdown()
+
+    def _metrics_summary(self):
+        parts = []
+        if self.server_config.metrics_port:
+            parts.append(f"http://127.0.0.1:{self.server_config.metrics_port}/metrics")
+        if self.server_config.metrics_file:
+            parts.append(f"{self.server_config.metrics_file} every {self.server_config.metrics_interval}s")
+        return ", ".join(parts) or "off"
+
+    def _trace_summary(self):
+        if not tracer.enabled:
+            return "off"
+        return f"last {self.server_config.trace_seconds:g}s to {self.server_config.trace_dir}/ on kill -USR1 {os.getpid()}"
+
+    def _start_metrics_endpoint(self, text_fn):
+        """Serve metrics on localhost if metrics_port is set; a busy port only costs the endpoint."""
+        if not self.server_config.metrics_port:
+            return None
+        try:
+            endpoint = MetricsEndpoint(self.server_config.metrics_port, text_fn)
+        except OSError as e:
+            log.warning(f"[WARNING] Metrics endpoint unavailable on port {self.server_config.metrics_port}: {e}")
+            return None
+        endpoint.start()
+        return endpoint
+
+    def _run_event_loop(self):
+        """Serve every connection from a single selectors loop in this thread."""
+        log.info("[MODE] Single-threaded event loop")
+        try:
+            EventLoop(self).run()
+        except KeyboardInterrupt:
+            self._shutdown()
+
+    def _run_sharded(self):
+        """Hand clients to one event-loop worker process per core, grouped by room."""
+        if not HAS_FD_PASSING:
+            log.warning("[WARNING] Sharded mode needs Unix socket handoff, falling back to the event loop")
+            self._run_event_loop()
+            return
+        count = self.server_config.workers or os.cpu_count() or 1
+        log.info(f"[MODE] Sharded across {count} worker processes")
+        try:
+            supervisor = Supervisor(self.server_config, self.server, count)
+            self._start_metrics_endpoint(supervisor.metrics_text)
+            # Workers keep their own spans; the supervisor only passes the signal on
+            dump_on_signal(supervisor.signal_workers)
+            supervisor.run()
+        except KeyboardInterrupt:
+            self._shutdown()
+
+    def _shutdown(self):
+        log.info("[SHUTDOWN] Server shutting down...")
+        self.running = False
+        if self.server is not None:
             self.server.close()
-            print("[STOPPED] Server stopped")
+        log.info("[STOPPED] Server stopped")
 
     def connection_handler(self):
         while self.running:
@@ -59,121 +175,410 @@ class GameServer:
                 conn, addr = self.server.accept()
             except Exception:
                 break
+            connection = self.accept_player(conn, addr)
+            if connection is None:
+                continue
+            threading.Thread(target=self.receiver, args=(connection,), daemon=True).start()
+            net_log.info(f"[ACTIVE CONNECTIONS] {threading.active_count() - 1} / {self.capacity()}")
+
+    def capacity(self):
+        """Connections the process accepts: every room full."""
+        return self.server_config.max_rooms * self.server_config.max_players
+
+    def accept_player(self, conn, addr):
+        """
+        Reserve a player slot for a freshly accepted socket.
+
+        Returns:
+            Connection or None: The new connection, or None if the server is full
+        """
+        with self.lock:
+            if len(self.connections) >= self.capacity():
+                net_log.info(f"[REJECTED] Connection from {addr} - Server full ({self.capacity()}/{self.capacity()})")
+                conn.close()
+                return None
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Sends never block: a full socket buffer just leaves data queued
+            conn.setblocking(False)
+            player_id = self._next_player_id()
+            connection = Connection(conn, addr, player_id, self.server_config.max_lag_ticks)
+            self.connections[player_id] = connection
+        return connection
+
+    def _next_player_id(self):
+        """Next free player id, wrapping so it always fits the binary wire id."""
+        while True:
+            player_id = self.player_id_counter
+            self.player_id_counter = player_id % MAX_PLAYER_ID + 1
+            if player_id not in self.connections:
+                return player_id
+
+    def timed_out(self, connection, now):
+        """
+        Check a connection against the handshake and heartbeat deadlines.
+
+        Returns:
+            str or None: Why the connection must be dropped, None if it's alive
+        """
+        if not connection.registered:
+            if now - connection.accepted > self.server_config.handshake_timeout:
+                return f"No handshake within {self.server_config.handshake_timeout}s"
+        elif now - connection.last_seen > self.server_config.heartbeat_timeout:
+            return f"Silent for {self.server_config.heartbeat_timeout}s"
+        return None
+
+    def register_player(self, connection, input_state):
+        """
+        Complete the handshake for a player from its first message.
+
+        The handshake names the room to enter. "create": True only creates
+        a new room, "create": False only joins an existing one, leaving it
+        out does either. The room queues the welcome; the caller flushes.
+
+        Args:
+            connection: Connection returned by accept_player
+            input_state: Decoded handshake dict (name, client_id, protocol,
+                room, create, max_players)
+
+        Returns:
+            bool: True if the player was accepted
+        """
+        player_id = connection.player_id
+        client_id = input_state.get("client_id")
+        protocol = BINARY_VERSION if input_state.get("protocol") == BINARY_VERSION else PROTOCOL_JSON
+        room_name = requested_room(input_state)
+        create = input_state.get("create")
+        with self.lock:
+            room = self.rooms.get(room_name)
+            error = None
+            if client_id and client_id in self.client_ids:
+                net_log.info(f"[REJECTED] Player {player_id} - Client ID already connected: {client_id}")
+                error = "CLIENT_ALREADY_CONNECTED"
+            elif room is None and create is False:
+                error = "ROOM_NOT_FOUND"
+            elif room is not None and create is True:
+                error = "ROOM_EXISTS"
+            elif room is None and len(self.rooms) >= self.server_config.max_rooms:
+                error = "SERVER_FULL"
+            elif room is not None and room.is_full():
+                error = "ROOM_FULL"
+            if error:
+                if error != "CLIENT_ALREADY_CONNECTED":
+                    net_log.info(f"[REJECTED] Player {player_id} - Room '{room_name}': {error}")
+                error_response = {"error": error}
+                connection.outbound.put(encode_frame(json.dumps(error_response).encode()))
+                return False
+
+            if room is None:
+                # validate_handshake() made sure max_players is an int if given
+                limit = self.server_config.max_players
+                max_players = min(limit, max(1, input_state.get("max_players") or limit))
+                room = Room(room_name, max_players, self.server_config)
+                self.rooms[room_name] = room
+                log.info(f"[ROOM CREATED] '{room_name}' - Max Players: {max_players}")
+            if client_id:
+                self.client_ids.add(client_id)
+            connection.client_id = client_id
+            connection.protocol = protocol
+            connection.room = room
+            name = input_state.get("name") or f"Player{player_id}"
+            with room.lock:
+                room.add_player(connection, name, client_id)
+            net_log.info(f"[REGISTERED] Player {player_id} - Name: {name}, Client ID: {client_id}, "
+                         f"Room: {room_name}, Protocol: {'binary' if protocol else 'json'}",
+                         extra={"player": player_id, "room": room_name})
+        return True
+
+    def decode_handshake(self, message):
+        """
+        Decode a connection's first message into a handshake dict.
+
+        Raises:
+            ValueError: For anything but a JSON object with correctly typed fields
+        """
+        return validate_handshake(json.loads(message))
+
+    def decode_input(self, protocol, message):
+        """
+        Decode a post-handshake message into an input_state dict.
+
+        Raises:
+            ValueError: For a malformed message; the caller drops the connection
+        """
+        if protocol == BINARY_VERSION:
+            return validate_client_message(decode_client_message(message))
+        return validate_client_message(json.loads(message))
+
+    def apply_input(self, connection, input_state):
+        """
+        Queue one input on the player's room; it is applied on the room's next tick.
+
+        Clock sync pings are answered right away instead.
+
+        Returns:
+            bool: True if a reply was queued that the caller should flush now
+        """
+        connection.messages_in += 1
+        input_log.debug("[INPUT] Player %s: %s", connection.player_id, input_state)
+        if "ping" in input_state:
+            self.answer_ping(connection, input_state["ping"])
+            return True
+        if connection.room is not None:
+            connection.room.apply_input(connection, input_state)
+        return False
+
+    def answer_ping(self, connection, client_time):
+        """Queue a pong with the server clock and the room's tick, for the client's clock sync."""
+        received = time.monotonic()
+        tick = connection.room.tick_count if connection.room is not None else 0
+        if connection.protocol == BINARY_VERSION:
+            pong = encode_pong(client_time, received, time.monotonic(), tick)
+        else:
+            pong = json.dumps({"pong": client_time, "received": received, "sent": time.monotonic(), "tick": tick}).encode()
+        connection.outbound.put(encode_frame(pong))
+
+    def tick(self):
+        """
+        Tick every room once.
+
+        Rooms only take their own lock, so a busy room never holds up another.
+
+        Returns:
+            list: (connection, roster bytes, input ack, snapshot frame) for every player
+        """
+        with tracer.span("tick", "tick"):
+            start = time.perf_counter()
             with self.lock:
-                if len(self.players) >= self.server_config.max_players:
-                    print(f"[REJECTED] Connection from {addr} - Server full ({self.server_config.max_players}/{self.server_config.max_players})")
-                    conn.close()
-                    continue
-                player_id = self.player_id_counter
-                self.player_id_counter += 1
-                self.players[player_id] = {"conn": conn, "addr": addr}
-            threading.Thread(target=self.receiver, args=(conn, addr, player_id), daemon=True).start()
-            print(f"[ACTIVE CONNECTIONS] {threading.active_count() - 1} / {self.server_config.max_players}")
-
-    def receiver(self, conn, addr, player_id):
-        print(f"[NEW CONNECTION] Player {player_id} connected from {addr}")
+                self.metrics.server_lock_wait += time.perf_counter() - start
+                rooms = list(self.rooms.values())
+            frames = []
+            for room in rooms:
+                try:
+                    frames.extend(room.tick())
+                except Exception as e:
+                    # One broken room must not stop the others
+                    log.error(f"[ERROR] Room '{room.name}' failed to tick, closing it: {e}")
+                    self.close_room(room)
+        elapsed = time.perf_counter() - start
+        self.ticks_run += 1
+        self.tick_seconds += elapsed
+        self.metrics.observe_tick(elapsed)
+        tick_log.debug("[TICK] %d room(s), %d frame(s) in %.2f ms", len(rooms), len(frames), elapsed * 1000)
+        now = time.monotonic()
+        if self.metrics.due(now):
+            with self.lock:
+                connections = list(self.connections.values())
+            self.metrics.collect(connections, rooms)
+            if self.supervisor is None:
+                self.metrics_dumper.maybe_dump(now, lambda: render_metrics(self.metrics.get_samples()))
+        return frames
+
+    def close_room(self, room):
+        """Stop ticking a room and disconnect its players; their sockets are reaped like any other that closes."""
+        with self.lock:
+            if self.rooms.get(room.name) is room:
+                del self.rooms[room.name]
+                self.metrics.retire_room(room)
+            connections = [connection for connection in self.connections.values() if connection.room is room]
+        for connection in connections:
+            try:
+                connection.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def release_reservation(self, client_id):
+        """Queue a client_id the supervisor reserved for this worker to be reported free (sharded mode only)."""
+        if client_id:
+            self.departed.append(client_id)
+
+    def report_departures(self):
+        """Tell the supervisor which reserved client_ids left, so they can connect again."""
+        while self.departed:
+            chunk = self.departed[:MAX_DEPARTURES]
+            try:
+                self.supervisor.send(json.dumps({"left": chunk}).encode())
+            except (BlockingIOError, InterruptedError):
+                return  # Kept for the next tick
+            except OSError:
+                log.error(f"[WORKER {self.worker_index}] Lost the supervisor, shutting down")
+                self.running = False
+                return
+            del self.departed[:len(chunk)]
+
+    def report_stats(self):
+        """Send this worker's counters to the supervisor about once a second (sharded mode only)."""
+        if self.supervisor is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_report < 1.0:
+            return
+        with self.lock:
+            rooms = list(self.rooms.values())
+            connections = len(self.connections)
+        stats = {
+            "worker": self.worker_index,
+            "pid": os.getpid(),
+            "rooms": len(rooms),
+            "players": sum(len(room.players) for room in rooms),
+            "connections": connections,
+            "ticks": self.ticks_run,
+            "tick_seconds": self.tick_seconds,
+            "interval": now - self.last_report,
+            # Per-player samples would grow the report past MAX_REPORT_SIZE with enough players
+            "metrics": self.metrics.get_samples(per_player=False)
+        }
+        message = json.dumps(stats).encode()
+        if len(message) > MAX_REPORT_SIZE:
+            log.warning(f"[WORKER {self.worker_index}] Stats report of {len(message)} bytes is too large, sending it without metrics")
+            stats["metrics"] = []
+            message = json.dumps(stats).encode()
         try:
-            data = conn.recv(1024)
-            if not data:
-                print(f"[ERROR] Player {player_id} disconnected before sending client_id")
-                conn.close()
+            self.supervisor.send(message)
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError as e:
+            if e.errno == errno.EMSGSIZE:
+                log.warning(f"[WORKER {self.worker_index}] Stats report of {len(message)} bytes rejected: {e}")
+            else:
+                log.error(f"[WORKER {self.worker_index}] Lost the supervisor, shutting down")
+                self.running = False
+        self.ticks_run = 0
+        self.tick_seconds = 0.0
+        self.last_report = now
+
+    def queue_snapshots(self, frames):
+        """
+        Put one tick's frames on every player's outbound queue.
+
+        Players that joined after the tick already got its state in their welcome.
+
+        Returns:
+            list: Ids of players that lagged past max_lag_ticks and must be dropped
+        """
+        laggards = []
+        for connection, roster, input_ack, frame in frames:
+            outbound = connection.outbound
+            if roster:
+                outbound.put(roster)
+            if not outbound.put_snapshot(input_ack, frame):
+                net_log.warning(f"[LAGGING] Player {connection.player_id} fell {outbound.lag_ticks} ticks behind, disconnecting",
+                                extra={"player": connection.player_id})
+                laggards.append(connection.player_id)
+        return laggards
+
+    def remove_player(self, player_id):
+        """Free the slot, client_id and socket of a player and leave its room."""
+        with self.lock:
+            connection = self.connections.pop(player_id, None)
+            if connection is None:
                 return
-            input_state = json.loads(data.decode())
-            client_id = input_state.get("client_id")
-            with self.lock:
-                if client_id and client_id in self.client_ids:
-                    print(f"[REJECTED] Player {player_id} - Client ID already connected: {client_id}")
-                    error_response = {"error": "CLIENT_ALREADY_CONNECTED"}
-                    conn.sendall(json.dumps(error_response).encode())
-                    conn.close()
-                    return
-                if client_id:
-                    self.client_ids.add(client_id)
-                self.players[player_id].update({
-                    "x": self.server_config.spawn_x,
-                    "y": self.server_config.spawn_y,
-                    "name": input_state.get("name", f"Player{player_id}"),
-                    "client_id": client_id
-                })
-                # Only send serializable player info
-                serializable_players = {
-                    pid: {k: v for k, v in pdata.items() if k != "conn" and k != "addr"}
-                    for pid, pdata in self.players.items()
-                }
-                conn.sendall(json.dumps(serializable_players).encode())
-                print(f"[REGISTERED] Player {player_id} - Name: {self.players[player_id]['name']}, Client ID: {client_id}")
+            try:
+                connection.conn.close()
+            except Exception:
+                pass
+            if connection.client_id:
+                self.client_ids.discard(connection.client_id)
+            self.release_reservation(connection.reserved_client_id)
+            self.metrics.retire(connection)
+            room = connection.room
+            remaining = 0
+            if room is not None:
+                with room.lock:
+                    room.remove_player(player_id)
+                    remaining = len(room.players)
+                if not remaining and self.rooms.get(room.name) is room:
+                    del self.rooms[room.name]
+                    self.metrics.retire_room(room)
+                    log.info(f"[ROOM CLOSED] '{room.name}'")
+        net_log.info(f"[DISCONNECTED] Player {player_id} disconnected", extra={"player": player_id})
+        if room is not None:
+            net_log.info(f"[ACTIVE PLAYERS] {remaining} player(s) remaining in room '{room.name}'")
+
+    def receiver(self, connection):
+        player_id = connection.player_id
+        conn = connection.conn
+        net_log.info(f"[NEW CONNECTION] Player {player_id} connected from {connection.addr}", extra={"player": player_id})
+        reader = connection.reader
+        # Not select.select(): it fails for descriptors past FD_SETSIZE, which a big server reaches
+        selector = selectors.DefaultSelector()
+        selector.register(conn, selectors.EVENT_READ)
+        try:
             while self.running:
-                data = conn.recv(1024)
-                if not data:
+                # A half-open socket never becomes readable, so deadlines are checked here
+                reason = self.timed_out(connection, time.monotonic())
+                if reason:
+                    net_log.warning(f"[TIMEOUT] Player {player_id} - {reason}", extra={"player": player_id})
+                    break
+                # The socket is non-blocking for the broadcaster's sake, wait here instead
+                if not selector.select(timeout=1.0):
+                    continue
+                try:
+                    count = reader.recv_from(conn)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                if not count:
+                    if not connection.registered:
+                        net_log.warning(f"[ERROR] Player {player_id} disconnected before sending client_id")
                     break
-                input_state = json.loads(data.decode())
-                with self.lock:
-                    if player_id in self.players:
-                        movement = input_state.get("movement", MOVE_NONE)
-                        dx = dy = 0
-                        if movement & MOVE_UP:
-                            dy -= 1
-                        if movement & MOVE_DOWN:
-                            dy += 1
-                        if movement & MOVE_LEFT:
-                            dx -= 1
-                        if movement & MOVE_RIGHT:
-                            dx += 1
-                        if dx != 0 and dy != 0:
-                            speed = PLAYER_SPEED_DIAGONAL
-                        else:
-                            speed = self.server_config.player_speed
-                        self.players[player_id]["x"] += dx * speed
-                        self.players[player_id]["y"] += dy * speed
-                        if input_state.get("name"):
-                            self.players[player_id]["name"] = input_state["name"]
-                        self.state_changed.set()
+                connection.last_seen = time.monotonic()
+                connection.bytes_in += count
+                with tracer.span("input drain", "input"):
+                    for message in reader.messages():
+                        if connection.registered:
+                            if self.apply_input(connection, self.decode_input(connection.protocol, message)):
+                                connection.flush()
+                            continue
+                        accepted = self.register_player(connection, self.decode_handshake(message))
+                        connection.flush()
+                        if not accepted:
+                            return
         except Exception as e:
-            print(f"[ERROR] Player {player_id}: {e}")
+            net_log.warning(f"[ERROR] Player {player_id}: {e}")
         finally:
-            with self.lock:
-                if player_id in self.players:
-                    client_id = self.players[player_id].get("client_id")
-                    if client_id:
-                        self.client_ids.discard(client_id)
-                    try:
-                        self.players[player_id]["conn"].close()
-                    except Exception:
-                        pass
-                    del self.players[player_id]
-            print(f"[DISCONNECTED] Player {player_id} disconnected")
-            print(f"[ACTIVE PLAYERS] {len(self.players)} player(s) remaining")
-
-    def broadcaster(self):
-        last_state = None
+            selector.close()
+            self.remove_player(player_id)
+
+    def tick_loop(self):
+        """Run the simulation at a fixed rate and broadcast one snapshot per tick."""
+        interval = 1.0 / self.server_config.tick_rate
+        next_tick = time.perf_counter()
         while self.running:
-            self.state_changed.wait()
-            with self.lock:
-                # Only send serializable player info
-                serializable_players = {
-                    pid: {k: v for k, v in pdata.items() if k != "conn" and k != "addr"}
-                    for pid, pdata in self.players.items()
-                }
-                state = json.dumps(serializable_players).encode()
-                if state != last_state:
-                    disconnected_pids = []
-                    for pid, pdata in self.players.items():
-                        conn_obj = pdata.get("conn")
-                        if conn_obj:
-                            try:
-                                conn_obj.sendall(state)
-                            except Exception as e:
-                                print(f"[ERROR] Failed to send update to Player {pid}: {e}")
-                                disconnected_pids.append(pid)
-                    for pid in disconnected_pids:
-                        if pid in self.players:
-                            try:
-                                self.players[pid]["conn"].close()
-                            except Exception:
-                                pass
-                            del self.players[pid]
-                    last_state = state
-                self.state_changed.clear()
+            try:
+                frames = self.tick()
+                with tracer.span("send", "tick"):
+                    self.broadcast(frames)
+            except Exception as e:
+                # tick() already closes a failing room; nothing else may end the thread unnoticed
+                log.error(f"[ERROR] Tick failed: {e}")
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind: skip the missed ticks instead of bursting to catch up
+                next_tick = time.perf_counter()
+
+    def broadcast(self, frames):
+        """Queue a tick's frames and push them out without blocking on any client."""
+        drop = self.queue_snapshots(frames)
+        with self.lock:
+            targets = list(self.connections.values())
+        # Flush outside the server lock: a slow socket only keeps its own data queued
+        for connection in targets:
+            try:
+                connection.flush()
+            except OSError as e:
+                net_log.warning(f"[ERROR] Failed to send update to Player {connection.player_id}: {e}")
+                drop.append(connection.player_id)
+        # The receiver thread notices the dead socket and frees the slot
+        for pid in drop:
+            connection = self.connections.get(pid)
+            if connection is None:
+                continue
+            try:
+                connection.conn.shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
 
 
 if __name__ == "__main__":
@@ -186,6 +591,8 @@ if __name__ == "__main__":
     print("  python game_server.py                    # Use config/defaults")
     print("  python game_server.py -H 0.0.0.0 -p 5000 # Override settings")
     print("  python game_server.py -p 8080 --save     # Save to config")
+    print("  python game_server.py --mode event_loop  # Single-threaded server")
+    print("  python game_server.py --mode sharded     # One process per core")
     print()
     
     GameServer().start()
@@ -0,0 +1,268 @@
+"""
+Server Metrics
+Runtime counters and gauges, exposed in Prometheus text format on a
+localhost-only HTTP endpoint and optionally written to a file.
+
+Nothing here runs per message. Hot paths only bump plain integer fields
+on their own Connection, OutboundQueue or Room; about once a second
+collect() walks the connections and rooms and turns those fields into
+samples, and the endpoint serves the last collected samples. Counters of
+closed connections and rooms are folded into running totals so they
+never go backwards.
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from library.log import get_logger
+
+COLLECT_INTERVAL = 1.0  # Seconds between collections
+TICK_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.25)
+RTT_QUANTILES = (0.5, 0.9, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+log = get_logger("server.metrics")
+
+# name: (type, help)
+METRICS = {
+    "dash_connections": ("gauge", "Open client connections"),
+    "dash_rooms": ("gauge", "Open rooms"),
+    "dash_players": ("gauge", "Players in rooms"),
+    "dash_ticks_total": ("counter", "Simulation ticks run"),
+    "dash_tick_seconds": ("histogram", "Time to simulate and encode one tick of every room"),
+    "dash_lock_wait_seconds_total": ("counter", "Time spent waiting for locks"),
+    "dash_messages_received_total": ("counter", "Messages received from clients"),
+    "dash_messages_sent_total": ("counter", "Messages queued for clients"),
+    "dash_bytes_received_total": ("counter", "Bytes received from clients"),
+    "dash_bytes_sent_total": ("counter", "Bytes sent to clients"),
+    "dash_snapshots_dropped_total": ("counter", "Snapshots replaced before a slow client took them"),
+    "dash_outbound_queue_bytes": ("gauge", "Bytes waiting in outbound queues"),
+    "dash_outbound_queue_max_bytes": ("gauge", "Largest outbound queue"),
+    "dash_player_rtt_seconds": ("gauge", "Smoothed time from sending a snapshot to its ack, per player"),
+    "dash_rtt_seconds": ("summary", "Smoothed snapshot round trip times of the connected players"),
+    "dash_workers_alive": ("gauge", "Running worker processes (sharded mode)"),
+}
+PER_PLAYER = ("dash_player_rtt_seconds",)  # Families with one sample per player
+
+
+class ServerMetrics:
+    """Metrics registry of one server process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()  # Guards samples and the tick histogram, never game state
+        self.samples = []  # [(name, {label: value}, value)] from the last collect()
+        self.tick_count = 0
+        self.tick_sum = 0.0
+        self.tick_buckets = [0] * len(TICK_BUCKETS)
+        # Counters of connections and rooms that are gone
+        self.retired = {
+            "messages_in": 0, "bytes_in": 0, "messages_out": 0, "bytes_out": 0, "dropped": 0, "lock_wait": 0.0
+        }
+        self.server_lock_wait = 0.0
+        self.next_collect = 0.0
+
+    def observe_tick(self, seconds):
+        """Record one tick's duration. Called once per tick."""
+        with self.lock:
+            self.tick_count += 1
+            self.tick_sum += seconds
+            for index, bound in enumerate(TICK_BUCKETS):
+                if seconds <= bound:
+                    self.tick_buckets[index] += 1
+                    break
+
+    def retire(self, connection):
+        """Keep the counters of a connection that is being removed."""
+        outbound = connection.outbound
+        with self.lock:
+            self.retired["messages_in"] += connection.messages_in
+            self.retired["bytes_in"] += connection.bytes_in
+            self.retired["messages_out"] += outbound.messages_sent
+            self.retired["bytes_out"] += outbound.bytes_sent
+            self.retired["dropped"] += outbound.dropped
+
+    def retire_room(self, room):
+        with self.lock:
+            self.retired["lock_wait"] += room.lock_wait
+
+    def due(self, now):
+        """True about once per COLLECT_INTERVAL; the caller then runs collect()."""
+        if now < self.next_collect:
+            return False
+        self.next_collect = now + COLLECT_INTERVAL
+        return True
+
+    def collect(self, connections, rooms):
+        """
+        Turn the connections' and rooms' counters into samples.
+
+        Args:
+            connections: Every open Connection
+            rooms: Every open Room
+        """
+        messages_in = bytes_in = messages_out = bytes_out = dropped = 0
+        queued = largest = 0
+        rtts = []
+        for connection in connections:
+            outbound = connection.outbound
+            messages_in += connection.messages_in
+            bytes_in += connection.bytes_in
+            messages_out += outbound.messages_sent
+            bytes_out += outbound.bytes_sent
+            dropped += outbound.dropped
+            pending = outbound.pending()
+            queued += pending
+            largest = max(largest, pending)
+            if connection.rtt is not None:
+                rtts.append((connection.player_id, connection.rtt))
+        room_lock_wait = sum(room.lock_wait for room in rooms)
+        players = sum(len(room.players) for room in rooms)
+
+        with self.lock:
+            retired = self.retired
+            samples = [
+                ("dash_connections", {}, len(connections)),
+                ("dash_rooms", {}, len(rooms)),
+                ("dash_players", {}, players),
+                ("dash_ticks_total", {}, self.tick_count),
+                ("dash_lock_wait_seconds_total", {"lock": "server"}, self.server_lock_wait),
+                ("dash_lock_wait_seconds_total", {"lock": "room"}, room_lock_wait + retired["lock_wait"]),
+                ("dash_messages_received_total", {}, messages_in + retired["messages_in"]),
+                ("dash_messages_sent_total", {}, messages_out + retired["messages_out"]),
+                ("dash_bytes_received_total", {}, bytes_in + retired["bytes_in"]),
+                ("dash_bytes_sent_total", {}, bytes_out + retired["bytes_out"]),
+                ("dash_snapshots_dropped_total", {}, dropped + retired["dropped"]),
+                ("dash_outbound_queue_bytes", {}, queued),
+                ("dash_outbound_queue_max_bytes", {}, largest),
+            ]
+            cumulative = 0
+            for bound, count in zip(TICK_BUCKETS, self.tick_buckets):
+                cumulative += count
+                samples.append(("dash_tick_seconds_bucket", {"le": str(bound)}, cumulative))
+            samples.append(("dash_tick_seconds_bucket", {"le": "+Inf"}, self.tick_count))
+            samples.append(("dash_tick_seconds_sum", {}, self.tick_sum))
+            samples.append(("dash_tick_seconds_count", {}, self.tick_count))
+            samples.extend(rtt_summary([rtt for _, rtt in rtts]))
+            samples.extend(("dash_player_rtt_seconds", {"player": str(pid)}, rtt) for pid, rtt in rtts)
+            self.samples = samples
+
+    def get_samples(self, per_player=True):
+        """
+        Samples of the last collect().
+
+        Args:
+            per_player: Include the per-player samples, whose count grows with
+                the players; leave them out to keep a report to the supervisor small
+        """
+        with self.lock:
+            if per_player:
+                return list(self.samples)
+            return [sample for sample in self.samples if sample[0] not in PER_PLAYER]
+
+
+def rtt_summary(rtts):
+    """Quantiles, sum and count of the players' RTTs, a fixed number of samples however many players there are."""
+    rtts = sorted(rtts)
+    samples = []
+    if rtts:
+        for quantile in RTT_QUANTILES:
+            index = min(len(rtts) - 1, int(quantile * len(rtts)))
+            samples.append(("dash_rtt_seconds", {"quantile": str(quantile)}, rtts[index]))
+    samples.append(("dash_rtt_seconds_sum", {}, sum(rtts)))
+    samples.append(("dash_rtt_seconds_count", {}, len(rtts)))
+    return samples
+
+
+def render(samples):
+    """
+    Prometheus text exposition of a list of samples.
+
+    Args:
+        samples: [(name, {label: value}, value)], several sources may be mixed
+    """
+    by_family = {}
+    for name, labels, value in samples:
+        family = name
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                family = name[:-len(suffix)]
+        by_family.setdefault(family, []).append((name, labels, value))
+    lines = []
+    for family, family_samples in by_family.items():
+        kind, help_text = METRICS.get(family, ("untyped", ""))
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for name, labels, value in family_samples:
+            if labels:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+            else:
+                lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path, text):
+    """Replace a metrics file atomically, so readers never see half of it."""
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "w") as f:
+            f.write(text)
+        os.replace(temporary, path)
+    except OSError as e:
+        log.error(f"[ERROR] Failed to write metrics to {path}: {e}")
+
+
+class MetricsDumper:
+    """Writes the metrics to a file every `interval` seconds, when configured."""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.next_dump = time.monotonic() + interval
+
+    def maybe_dump(self, now, text_fn):
+        """Write text_fn() if a dump is due. Cheap to call every tick."""
+        if not self.path or now < self.next_dump:
+            return
+        self.next_dump = now + self.interval
+        write_file(self.path, text_fn())
+
+
+class MetricsEndpoint:
+    """HTTP endpoint on 127.0.0.1 serving GET /metrics from a background thread."""
+
+    def __init__(self, port, text_fn):
+        """
+        Args:
+            port: Local port to listen on
+            text_fn: Returns the current Prometheus text; called from the endpoint thread
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = text_fn().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Localhost only: the endpoint has no authentication
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        log.info(f"[METRICS] Serving http://127.0.0.1:{self.httpd.server_address[1]}/metrics")
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,123 @@
+"""
+Outbound Queue
+Per-connection send buffer drained with non-blocking sends.
+
+Reliable messages (handshake replies, roster changes) are always
+delivered in order. Snapshots are coalesced: a snapshot the socket hasn't
+started taking yet is replaced by the next one, so a slow client only
+ever gets the newest state and never holds up anybody else.
+
+Queued buffers are usually shared between clients (one encoded snapshot
+for everyone), so they are never copied into a per-client buffer: they
+go out together with a scatter-gather sendmsg() where the platform has it.
+"""
+
+import socket
+import threading
+from collections import deque
+from itertools import islice
+
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+MAX_BUFFERS_PER_SEND = 64  # Stay well under IOV_MAX
+
+
+class OutboundQueue:
+    """Send buffer for one client socket."""
+
+    def __init__(self, max_lag_ticks):
+        """
+        Args:
+            max_lag_ticks: Consecutive ticks a client may leave its snapshot
+                unsent before put_snapshot() reports it as a laggard
+        """
+        self.max_lag_ticks = max_lag_ticks
+        self.lock = threading.Lock()
+        self.messages = deque()  # Reliable buffers not yet handed to the socket
+        self.snapshot = None     # Buffers of the newest snapshot not yet handed to the socket
+        self.sending = deque()   # memoryviews the socket is taking, oldest first
+        self.lag_ticks = 0
+        self.dropped = 0         # Snapshots replaced before they were sent
+        self.messages_sent = 0   # Messages and snapshots queued, for metrics
+        self.bytes_sent = 0
+
+    def put(self, *buffers):
+        """Queue buffers that must be delivered, in order."""
+        with self.lock:
+            self.messages.extend(buffers)
+            self.messages_sent += 1
+
+    def put_snapshot(self, *buffers):
+        """
+        Queue the newest snapshot, replacing one still waiting.
+
+        A snapshot can be several buffers, e.g. a per-client header in
+        front of a frame shared with other clients; empty ones are skipped.
+
+        Returns:
+            bool: False if the client has lagged for more than max_lag_ticks
+        """
+        with self.lock:
+            if self.snapshot is not None or self.sending:
+                self.lag_ticks += 1
+            else:
+                self.lag_ticks = 0
+            if self.snapshot is not None:
+                self.dropped += 1
+            self.snapshot = [buffer for buffer in buffers if buffer]
+            self.messages_sent += 1
+            return self.lag_ticks <= self.max_lag_ticks
+
+    def pending(self):
+        """Bytes waiting to be sent."""
+        with self.lock:
+            size = sum(len(m) for m in self.messages) + sum(len(v) for v in self.sending)
+            if self.snapshot is not None:
+                size += sum(len(b) for b in self.snapshot)
+            return size
+
+    def flush(self, sock):
+        """
+        Send as much as the socket takes without blocking.
+
+        The socket must be non-blocking. Socket errors other than
+        "would block" propagate so the caller can drop the client.
+
+        Returns:
+            bool: True if everything queued has been sent
+        """
+        with self.lock:
+            while True:
+                if not self.sending:
+                    if not self.messages and self.snapshot is None:
+                        return True
+                    self.sending.extend(memoryview(m) for m in self.messages)
+                    self.messages.clear()
+                    if self.snapshot is not None:
+                        self.sending.extend(memoryview(b) for b in self.snapshot)
+                        self.snapshot = None
+                    if not HAS_SENDMSG and len(self.sending) > 1:
+                        joined = b"".join(self.sending)
+                        self.sending.clear()
+                        self.sending.append(memoryview(joined))
+                buffers = list(islice(self.sending, MAX_BUFFERS_PER_SEND))
+                try:
+                    if HAS_SENDMSG:
+                        sent = sock.sendmsg(buffers)
+                    else:
+                        sent = sock.send(buffers[0])
+                except (BlockingIOError, InterruptedError):
+                    return False
+                self.bytes_sent += sent
+                offered = sum(len(b) for b in buffers)
+                remaining = sent
+                while remaining:
+                    head = self.sending[0]
+                    if remaining >= len(head):
+                        remaining -= len(head)
+                        self.sending.popleft()
+                    else:
+                        self.sending[0] = head[remaining:]
+                        remaining = 0
+                if sent < offered:
+                    # Socket buffer is full
+                    return False
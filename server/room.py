@@ -0,0 +1,259 @@
+"""
+Game Room
+One match: its own player table, simulation tick, snapshot history and
+broadcast set. Rooms never touch each other's state, and each one has its
+own lock, so many small matches can share a server process.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+
+from server.snapshots import SnapshotHistory
+from server.spatial_grid import SpatialGrid
+from game.constants import *
+from game.movement import movement_step
+from game.multiplayer.framing import encode_frame
+from game.multiplayer.protocol import (
+    BINARY_VERSION, DEFAULT_ROOM, MAX_ROOM_NAME, encode_player_info, encode_player_left, encode_input_ack
+)
+from library.trace import tracer
+
+
+MAX_INPUT_BACKLOG = 2  # Queued inputs beyond this are skipped to keep input latency bounded
+RTT_SMOOTHING = 0.1    # Weight of a new sample in a connection's smoothed round-trip time
+
+
+def room_name(handshake):
+    """The room a handshake asks for, trimmed to MAX_ROOM_NAME characters."""
+    return str(handshake.get("room") or DEFAULT_ROOM).strip()[:MAX_ROOM_NAME] or DEFAULT_ROOM
+
+
+class Room:
+    """A named match and everything needed to simulate and broadcast it."""
+
+    def __init__(self, name, max_players, server_config):
+        """
+        Args:
+            name: Room name clients join by
+            max_players: Players allowed in this room
+            server_config: ServerConfig with tick, snapshot and culling settings
+        """
+        self.name = name
+        self.max_players = max_players
+        self.server_config = server_config
+        self.lock = threading.Lock()
+        self.players = {}  # {player_id: {"x", "y", "name", "client_id"}}
+        self.connections = {}  # {player_id: Connection} of the players above
+        self.input_queue = {}  # {player_id: deque of input_state} in sequence order
+        self.movement = {}  # {player_id: MOVE_* flags held until the next input}
+        self.applied = {}  # {player_id: [seq of the held input, ticks it has been applied]}
+        self.roster_events = []  # Binary join/rename/leave messages for the next tick
+        self.roster_frame = None  # Cached binary PLAYER_INFO frames for every player
+        self.tick_count = 0
+        self.tick_times = {}  # {tick: time.monotonic() it was encoded} for round-trip times
+        self.lock_wait = 0.0  # Seconds spent waiting for self.lock, for metrics
+        self.history = SnapshotHistory(
+            server_config.keyframe_interval,
+            length=2 * server_config.keyframe_interval
+        )
+        self.grid = None  # SpatialGrid of player positions when interest culling is on
+        radius = server_config.interest_radius
+        if radius > 0:
+            # Radius rounded up to whole player sizes, so a query touches about 3x3 cells
+            self.grid = SpatialGrid(PLAYER_SIZE * math.ceil(radius / PLAYER_SIZE))
+
+    def is_full(self):
+        return len(self.players) >= self.max_players
+
+    def add_player(self, connection, name, client_id):
+        """
+        Put a player in the room and queue its welcome.
+
+        The welcome is queued under the room lock, so it always precedes the
+        player's first snapshot. It is a small per-client header followed by
+        buffers shared with the other players: the cached roster (binary)
+        and the last tick's keyframe. Caller must hold self.lock.
+        """
+        player_id = connection.player_id
+        self.players[player_id] = {
+            "x": self.server_config.spawn_x,
+            "y": self.server_config.spawn_y,
+            "name": name,
+            "client_id": client_id
+        }
+        self.connections[player_id] = connection
+        if self.grid is not None:
+            self.grid.insert(player_id, self.server_config.spawn_x, self.server_config.spawn_y)
+        self.roster_events.append(encode_frame(encode_player_info(player_id, name)))
+        self.roster_frame = None
+
+        header = {
+            "protocol": connection.protocol,
+            "player_id": player_id,
+            "room": self.name,
+            "max_players": self.max_players,
+            # Movement rules, so the client can predict its own player
+            "tick_rate": self.server_config.tick_rate,
+            "player_speed": self.server_config.player_speed,
+            # Clients ping at least this often so they aren't reaped as silent
+            "heartbeat_interval": self.server_config.heartbeat_timeout / 3
+        }
+        welcome = [encode_frame(json.dumps(header).encode())]
+        if connection.protocol == BINARY_VERSION:
+            welcome.append(self._roster())
+        if self.history.tick is not None:
+            welcome.append(self._snapshot_frame(connection))
+        connection.outbound.put(*welcome)
+
+    def remove_player(self, player_id):
+        """Take a player out of the room. Caller must hold self.lock."""
+        self.connections.pop(player_id, None)
+        player = self.players.pop(player_id, None)
+        if player is not None:
+            if self.grid is not None:
+                self.grid.remove(player_id)
+            self.roster_events.append(encode_frame(encode_player_left(player_id)))
+            self.roster_frame = None
+        self.input_queue.pop(player_id, None)
+        self.movement.pop(player_id, None)
+        self.applied.pop(player_id, None)
+
+    def _roster(self):
+        """Binary PLAYER_INFO frames for every player, rebuilt only after roster changes."""
+        if self.roster_frame is None:
+            self.roster_frame = b"".join(
+                encode_frame(encode_player_info(pid, player["name"])) for pid, player in self.players.items()
+            )
+        return self.roster_frame
+
+    def apply_input(self, connection, input_state):
+        """Queue one input for the room's coming ticks, dropping stale or repeated ones."""
+        start = time.perf_counter()
+        with self.lock:
+            self.lock_wait += time.perf_counter() - start
+            if connection.player_id not in self.players:
+                return
+            if "ack" in input_state:
+                # Deltas are built against the newest tick the client confirmed
+                connection.ack = max(connection.ack or 0, input_state["ack"])
+                sent = self.tick_times.get(input_state["ack"])
+                if sent is not None:
+                    rtt = time.monotonic() - sent
+                    connection.rtt = rtt if connection.rtt is None else connection.rtt + (rtt - connection.rtt) * RTT_SMOOTHING
+                if len(input_state) == 1:
+                    return
+            sequence = input_state.get("seq")
+            if sequence is not None:
+                if sequence <= connection.input_seq:
+                    return
+                connection.input_seq = sequence
+            self.input_queue.setdefault(connection.player_id, deque()).append(input_state)
+
+    def simulate(self):
+        """
+        Advance the room by one tick. Caller must hold self.lock.
+
+        Applies the next queued movement of every player, in sequence
+        order (it stays held until the next one), then moves every player
+        exactly once. A backlog longer than MAX_INPUT_BACKLOG, e.g. after a
+        network stall, is skipped instead of replayed late.
+        """
+        for player_id in list(self.input_queue):
+            inputs = self.input_queue[player_id]
+            player = self.players.get(player_id)
+            while inputs and player is not None:
+                input_state = inputs.popleft()
+                name = input_state.get("name")
+                if name and name != player["name"]:
+                    player["name"] = name
+                    self.roster_events.append(encode_frame(encode_player_info(player_id, name)))
+                    self.roster_frame = None
+                if "movement" in input_state:
+                    self.movement[player_id] = input_state["movement"]
+                    self.applied[player_id] = [input_state.get("seq", 0), 0]
+                    if len(inputs) < MAX_INPUT_BACKLOG:
+                        break
+            if not inputs or player is None:
+                del self.input_queue[player_id]
+
+        # Speeds are tuned per 1/SIMULATION_BASE_RATE s, scale them to the tick length
+        scale = SIMULATION_BASE_RATE / self.server_config.tick_rate
+        for player_id, movement in self.movement.items():
+            player = self.players.get(player_id)
+            if player is None:
+                continue
+            self.applied[player_id][1] += 1
+            dx, dy = movement_step(movement, self.server_config.player_speed, scale)
+            if not (dx or dy):
+                continue
+            player["x"] += dx
+            player["y"] += dy
+            if self.grid is not None:
+                self.grid.move(player_id, player["x"], player["y"])
+        self.tick_count += 1
+
+    def tick(self):
+        """
+        Run one simulation step and encode its snapshot.
+
+        Returns:
+            list: (connection, roster bytes, input ack, snapshot frame) per
+                player - binary roster changes must be delivered, the input
+                ack and the keyframe or delta may be coalesced together.
+                Players sharing a protocol and acknowledged tick share the
+                same frame bytes object; the input ack is per player.
+        """
+        start = time.perf_counter()
+        with self.lock:
+            self.lock_wait += time.perf_counter() - start
+            with tracer.span("simulate", "tick"):
+                self.simulate()
+            with tracer.span("encode", "tick"):
+                self.history.record(self.tick_count, {
+                    pid: (player["x"], player["y"], player["name"]) for pid, player in self.players.items()
+                })
+                self.tick_times[self.tick_count] = time.monotonic()
+                self.tick_times.pop(self.tick_count - self.history.length, None)
+                roster = b"".join(self.roster_events)
+                self.roster_events.clear()
+                frames = []
+                for connection in self.connections.values():
+                    frame = self._snapshot_frame(connection)
+                    binary = connection.protocol == BINARY_VERSION
+                    frames.append((connection, roster if binary else b"", self._input_ack(connection), frame))
+            return frames
+
+    def _input_ack(self, connection):
+        """
+        Tell a client which of its inputs the tick's state includes, for prediction.
+
+        Returns:
+            bytes: Framed input ack, empty until the player sent an input
+        """
+        applied = self.applied.get(connection.player_id)
+        if applied is None:
+            return b""
+        sequence, held = applied
+        if connection.protocol == BINARY_VERSION:
+            return encode_frame(encode_input_ack(self.tick_count, sequence, held))
+        return encode_frame(json.dumps({"input_ack": sequence, "held": held, "tick": self.tick_count}).encode())
+
+    def _snapshot_frame(self, connection):
+        """
+        Current tick's keyframe or delta for one client. Caller must hold self.lock.
+
+        With interest culling on, only players within interest_radius of
+        the client's own player are included.
+        """
+        if self.grid is None:
+            return self.history.frame_for(connection.protocol, connection.ack)
+        player = self.players[connection.player_id]
+        visible = frozenset(self.grid.query(player["x"], player["y"], self.server_config.interest_radius))
+        frame = self.history.view_frame_for(
+            connection.protocol, connection.ack, visible, connection.views.get(connection.ack)
+        )
+        connection.remember_view(self.history.tick, visible, self.history.length)
+        return frame
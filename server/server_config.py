@@ -3,18 +3,92 @@ Server Configuration Manager
 Handles server config file and command-line arguments.
 """
 
+import math
 import yaml
 import argparse
 from pathlib import Path
 
+from library.log import LEVELS, FORMATS
+
 
 DEFAULT_SERVER_CONFIG = {
     "host": "0.0.0.0",      # Listen on all interfaces
     "port": 50000,
-    "max_players": 8,
+    "max_players": 8,       # Per room
+    "max_rooms": 16,
     "player_speed": 5,
     "spawn_x": 400,
-    "spawn_y": 300
+    "spawn_y": 300,
+    "mode": "threaded",     # "threaded", "event_loop" or "sharded"
+    "workers": 0,           # Sharded mode worker processes (0 = one per CPU core)
+    "tick_rate": 30,        # Simulation steps (and snapshots) per second
+    "keyframe_interval": 30,  # Full snapshot every N ticks, deltas in between
+    "max_lag_ticks": 60,      # Ticks a client may leave snapshots unsent before it's dropped
+    "handshake_timeout": 5,   # Seconds a new socket gets to send its handshake
+    "heartbeat_timeout": 6,   # Seconds a client may stay silent before it's dropped
+    "metrics_port": 0,        # Serve Prometheus metrics on 127.0.0.1:<port> (0 = off)
+    "metrics_file": "",       # Also write them to this file ("" = off)
+    "metrics_interval": 10,   # Seconds between metrics file writes
+    "log_level": "INFO",      # DEBUG, INFO, WARNING or ERROR
+    "log_format": "text",     # "text" or "json" (one object per line)
+    "log_debug": "",          # Comma-separated categories logged at DEBUG, e.g. "server.input"
+    "trace_seconds": 0,       # Keep this many seconds of tick spans, dumped on SIGUSR1 (0 = off)
+    "trace_dir": "traces",    # Where trace dumps are written
+    "interest_radius": 0      # Only send players within this many pixels (0 = send everyone)
+}
+
+SERVER_MODES = ("threaded", "event_loop", "sharded")
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+# rule: check, for validate()
+RULES = {
+    "positive integer": lambda value: _is_int(value) and value > 0,
+    "non-negative integer": lambda value: _is_int(value) and value >= 0,
+    "positive number": lambda value: _is_number(value) and value > 0,
+    "non-negative number": lambda value: _is_number(value) and value >= 0,
+    "number": _is_number,
+    "port number (1-65535)": lambda value: _is_int(value) and 1 <= value <= 65535,
+    "port number (0-65535)": lambda value: _is_int(value) and 0 <= value <= 65535,
+    "string": lambda value: isinstance(value, str),
+}
+
+# setting: rule it must pass
+SETTING_RULES = {
+    "host": "string",
+    "port": "port number (1-65535)",
+    "max_players": "positive integer",
+    "max_rooms": "positive integer",
+    "player_speed": "non-negative number",
+    "spawn_x": "number",
+    "spawn_y": "number",
+    "workers": "non-negative integer",
+    "tick_rate": "positive integer",
+    "keyframe_interval": "positive integer",
+    "max_lag_ticks": "positive integer",
+    "handshake_timeout": "positive number",
+    "heartbeat_timeout": "positive number",
+    "metrics_port": "port number (0-65535)",
+    "metrics_file": "string",
+    "metrics_interval": "positive number",
+    "log_debug": "string",
+    "trace_seconds": "non-negative number",
+    "trace_dir": "string",
+    "interest_radius": "non-negative number",
+}
+
+# setting: allowed values
+SETTING_CHOICES = {
+    "mode": SERVER_MODES,
+    "log_level": LEVELS,
+    "log_format": FORMATS,
 }
 
 
@@ -46,6 +120,18 @@ class ServerConfig:
             print("[INFO] Config file not found, creating default...")
             self.config = DEFAULT_SERVER_CONFIG.copy()
             self.save()
+        self.validate()
+    
+    def validate(self):
+        """Refuse to start with a setting the server can't use, e.g. tick_rate: 0 or mode: evented."""
+        for key, rule in SETTING_RULES.items():
+            value = self.config[key]
+            if not RULES[rule](value):
+                raise SystemExit(f"[ERROR] {self.CONFIG_FILE}: {key} must be a {rule}, got {value!r}")
+        for key, choices in SETTING_CHOICES.items():
+            value = self.config[key]
+            if value not in choices:
+                raise SystemExit(f"[ERROR] {self.CONFIG_FILE}: {key} must be one of {', '.join(choices)}, got {value!r}")
     
     def save(self):
         """Save current config to file."""
@@ -76,7 +162,74 @@ class ServerConfig:
         parser.add_argument(
             '-m', '--max-players',
             type=int,
-            help=f"Maximum players (default: {self.config['max_players']})"
+            help=f"Maximum players per room (default: {self.config['max_players']})"
+        )
+        parser.add_argument(
+            '--max-rooms',
+            type=int,
+            help=f"Maximum concurrent rooms (default: {self.config['max_rooms']})"
+        )
+        parser.add_argument(
+            '--mode',
+            choices=SERVER_MODES,
+            help=f"Connection handling mode (default: {self.config['mode']})"
+        )
+        parser.add_argument(
+            '-w', '--workers',
+            type=int,
+            help=f"Worker processes in sharded mode, 0 for one per core (default: {self.config['workers']})"
+        )
+        parser.add_argument(
+            '-t', '--tick-rate',
+            type=int,
+            help=f"Simulation ticks per second (default: {self.config['tick_rate']})"
+        )
+        parser.add_argument(
+            '-r', '--interest-radius',
+            type=int,
+            help=f"Only send players within this distance, 0 for everyone (default: {self.config['interest_radius']})"
+        )
+        parser.add_argument(
+            '--heartbeat-timeout',
+            type=float,
+            help=f"Drop clients silent for this many seconds (default: {self.config['heartbeat_timeout']})"
+        )
+        parser.add_argument(
+            '--handshake-timeout',
+            type=float,
+            help=f"Drop sockets that don't send a handshake within this many seconds (default: {self.config['handshake_timeout']})"
+        )
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            help=f"Serve metrics on 127.0.0.1:PORT, 0 for off (default: {self.config['metrics_port']})"
+        )
+        parser.add_argument(
+            '--metrics-file',
+            type=str,
+            help=f"Write metrics to this file every metrics_interval seconds (default: {self.config['metrics_file'] or 'off'})"
+        )
+        parser.add_argument(
+            '--log-level',
+            choices=LEVELS,
+            help=f"Log level (default: {self.config['log_level']})"
+        )
+        parser.add_argument(
+            '--log-format',
+            choices=FORMATS,
+            help=f"Log line format (default: {self.config['log_format']})"
+        )
+        parser.add_argument(
+            '--debug',
+            type=str,
+            metavar='CATEGORIES',
+            help=f"Log these comma-separated categories at DEBUG, e.g. server.input,server.tick (default: {self.config['log_debug'] or 'none'})"
+        )
+        parser.add_argument(
+            '--trace',
+            type=float,
+            metavar='SECONDS',
+            help=f"Record tick spans, kill -USR1 writes the last SECONDS as a Chrome trace (default: {self.config['trace_seconds'] or 'off'})"
         )
         parser.add_argument(
             '--save',
@@ -93,6 +246,46 @@ class ServerConfig:
             self.config['port'] = args.port
         if args.max_players:
             self.config['max_players'] = args.max_players
+        if args.max_rooms:
+            self.config['max_rooms'] = args.max_rooms
+        if args.mode:
+            self.config['mode'] = args.mode
+        if args.workers is not None:
+            if args.workers < 0:
+                parser.error("--workers can't be negative")
+            self.config['workers'] = args.workers
+        if args.tick_rate:
+            if args.tick_rate <= 0:
+                parser.error("--tick-rate must be positive")
+            self.config['tick_rate'] = args.tick_rate
+        if args.interest_radius is not None:
+            if args.interest_radius < 0:
+                parser.error("--interest-radius can't be negative")
+            self.config['interest_radius'] = args.interest_radius
+        if args.heartbeat_timeout is not None:
+            if args.heartbeat_timeout <= 0:
+                parser.error("--heartbeat-timeout must be positive")
+            self.config['heartbeat_timeout'] = args.heartbeat_timeout
+        if args.handshake_timeout is not None:
+            if args.handshake_timeout <= 0:
+                parser.error("--handshake-timeout must be positive")
+            self.config['handshake_timeout'] = args.handshake_timeout
+        if args.metrics_port is not None:
+            if not 0 <= args.metrics_port <= 65535:
+                parser.error("--metrics-port must be 0-65535")
+            self.config['metrics_port'] = args.metrics_port
+        if args.metrics_file is not None:
+            self.config['metrics_file'] = args.metrics_file
+        if args.log_level:
+            self.config['log_level'] = args.log_level
+        if args.log_format:
+            self.config['log_format'] = args.log_format
+        if args.debug is not None:
+            self.config['log_debug'] = args.debug
+        if args.trace is not None:
+            if args.trace < 0:
+                parser.error("--trace can't be negative")
+            self.config['trace_seconds'] = args.trace
         
         # Save if requested
         if args.save:
@@ -112,6 +305,10 @@ class ServerConfig:
     def max_players(self):
         return self.config['max_players']
     
+    @property
+    def max_rooms(self):
+        return self.config['max_rooms']
+    
     @property
     def player_speed(self):
         return self.config['player_speed']
@@ -123,3 +320,67 @@ class ServerConfig:
     @property
     def spawn_y(self):
         return self.config['spawn_y']
+    
+    @property
+    def mode(self):
+        return self.config['mode']
+    
+    @property
+    def workers(self):
+        return self.config['workers']
+    
+    @property
+    def tick_rate(self):
+        return self.config['tick_rate']
+    
+    @property
+    def keyframe_interval(self):
+        return self.config['keyframe_interval']
+    
+    @property
+    def max_lag_ticks(self):
+        return self.config['max_lag_ticks']
+    
+    @property
+    def interest_radius(self):
+        return self.config['interest_radius']
+    
+    @property
+    def handshake_timeout(self):
+        return self.config['handshake_timeout']
+    
+    @property
+    def heartbeat_timeout(self):
+        return self.config['heartbeat_timeout']
+    
+    @property
+    def metrics_port(self):
+        return self.config['metrics_port']
+    
+    @property
+    def metrics_file(self):
+        return self.config['metrics_file']
+    
+    @property
+    def metrics_interval(self):
+        return self.config['metrics_interval']
+    
+    @property
+    def log_level(self):
+        return self.config['log_level']
+    
+    @property
+    def log_format(self):
+        return self.config['log_format']
+    
+    @property
+    def log_debug(self):
+        return self.config['log_debug']
+    
+    @property
+    def trace_seconds(self):
+        return self.config['trace_seconds']
+    
+    @property
+    def trace_dir(self):
+        return self.config['trace_dir']
@@ -0,0 +1,121 @@
+"""
+Snapshot History
+Keeps recent per-tick world states and encodes delta snapshots against
+the tick each client last acknowledged.
+"""
+
+import json
+from collections import deque
+
+from game.multiplayer.framing import encode_frame
+from game.multiplayer.protocol import BINARY_VERSION, encode_snapshot, encode_delta
+
+
+class SnapshotHistory:
+    """Recent world states and the per-tick snapshot encodings built from them."""
+
+    def __init__(self, keyframe_interval, length):
+        """
+        Args:
+            keyframe_interval: Send everyone a full snapshot every N ticks
+            length: Ticks of history kept; older acks get a keyframe
+        """
+        self.keyframe_interval = keyframe_interval
+        self.states = {}  # {tick: {player_id: (x, y, name)}}
+        self.order = deque()
+        self.length = length
+        self.tick = None
+        self.cache = {}  # {(protocol, base): frame} for the current tick
+
+    def record(self, tick, state):
+        """Store the state of a finished tick and make it the one to encode."""
+        self.states[tick] = state
+        self.order.append(tick)
+        while len(self.order) > self.length:
+            del self.states[self.order.popleft()]
+        self.tick = tick
+        self.cache.clear()
+
+    def _base(self, ack):
+        """The acknowledged tick to delta against, or None for a keyframe."""
+        if ack is None or ack not in self.states or ack >= self.tick or self.tick % self.keyframe_interval == 0:
+            return None
+        return ack
+
+    def frame_for(self, protocol, ack):
+        """
+        Encode the current tick for one client.
+
+        Clients that acknowledged the same tick share one encoded frame.
+
+        Args:
+            protocol: PROTOCOL_JSON or BINARY_VERSION
+            ack: Newest tick the client acknowledged, or None
+
+        Returns:
+            bytes: Framed keyframe or delta
+        """
+        base = self._base(ack)
+        key = (protocol, base)
+        frame = self.cache.get(key)
+        if frame is None:
+            state = self.states[self.tick]
+            if base is None:
+                frame = self._encode(protocol, None, state, [])
+            else:
+                old = self.states[base]
+                removed = [pid for pid in old if pid not in state]
+                frame = self._encode(protocol, base, self._changed(protocol, old, state, old), removed)
+            self.cache[key] = frame
+        return frame
+
+    def view_frame_for(self, protocol, ack, visible, ack_visible):
+        """
+        Encode the current tick restricted to the players one client can see.
+
+        Players leaving the client's view are sent as removed, players
+        entering it as changed. Views differ per client, so these frames
+        are not cached.
+
+        Args:
+            protocol: PROTOCOL_JSON or BINARY_VERSION
+            ack: Newest tick the client acknowledged, or None
+            visible: Player ids in the client's interest area this tick
+            ack_visible: Player ids it was sent at the acknowledged tick, or None
+
+        Returns:
+            bytes: Framed keyframe or delta
+        """
+        base = self._base(ack) if ack_visible is not None else None
+        state = self.states[self.tick]
+        current = {pid: state[pid] for pid in visible if pid in state}
+        if base is None:
+            return self._encode(protocol, None, current, [])
+        old = self.states[base]
+        removed = [pid for pid in ack_visible if pid in old and pid not in current]
+        return self._encode(protocol, base, self._changed(protocol, old, current, ack_visible), removed)
+
+    @staticmethod
+    def _changed(protocol, old, state, known):
+        """Entities of state the client doesn't already have as of the base tick."""
+        if protocol == BINARY_VERSION:
+            # Binary names travel in roster messages, only positions matter here
+            return {
+                pid: entity for pid, entity in state.items()
+                if pid not in known or old.get(pid, ())[:2] != entity[:2]
+            }
+        return {pid: entity for pid, entity in state.items() if pid not in known or old.get(pid) != entity}
+
+    def _encode(self, protocol, base, changed, removed):
+        if protocol == BINARY_VERSION:
+            positions = [(pid, x, y) for pid, (x, y, _) in changed.items()]
+            if base is None:
+                return encode_frame(encode_snapshot(self.tick, positions))
+            return encode_frame(encode_delta(self.tick, base, positions, removed))
+        message = {
+            "tick": self.tick,
+            "base": base,
+            "players": {pid: {"x": x, "y": y, "name": name} for pid, (x, y, name) in changed.items()},
+            "removed": removed
+        }
+        return encode_frame(json.dumps(message).encode())
@@ -0,0 +1,70 @@
+"""
+Spatial Grid
+Uniform hash grid of square cells used to find the players near a point
+without scanning the whole player table.
+"""
+
+
+class SpatialGrid:
+    """Maps grid cells to the players standing in them."""
+
+    def __init__(self, cell_size):
+        """
+        Args:
+            cell_size: Cell edge length in pixels (a multiple of PLAYER_SIZE)
+        """
+        self.cell_size = cell_size
+        self.cells = {}      # {(cx, cy): {player_id, ...}}
+        self.positions = {}  # {player_id: (x, y, cell)}
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, player_id, x, y):
+        cell = self._cell(x, y)
+        self.positions[player_id] = (x, y, cell)
+        self.cells.setdefault(cell, set()).add(player_id)
+
+    def move(self, player_id, x, y):
+        """Update a position; the cell sets only change when a cell border is crossed."""
+        old_cell = self.positions[player_id][2]
+        cell = self._cell(x, y)
+        self.positions[player_id] = (x, y, cell)
+        if cell != old_cell:
+            self._discard(player_id, old_cell)
+            self.cells.setdefault(cell, set()).add(player_id)
+
+    def remove(self, player_id):
+        entry = self.positions.pop(player_id, None)
+        if entry is not None:
+            self._discard(player_id, entry[2])
+
+    def _discard(self, player_id, cell):
+        members = self.cells[cell]
+        members.discard(player_id)
+        if not members:
+            del self.cells[cell]
+
+    def query(self, x, y, radius):
+        """
+        Players within radius of (x, y).
+
+        Returns:
+            list: Player ids, including any standing exactly at (x, y)
+        """
+        size = self.cell_size
+        min_cx, min_cy = int((x - radius) // size), int((y - radius) // size)
+        max_cx, max_cy = int((x + radius) // size), int((y + radius) // size)
+        radius_sq = radius * radius
+        positions = self.positions
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                members = self.cells.get((cx, cy))
+                if not members:
+                    continue
+                for player_id in members:
+                    px, py, _ = positions[player_id]
+                    if (px - x) * (px - x) + (py - y) * (py - y) <= radius_sq:
+                        found.append(player_id)
+        return found
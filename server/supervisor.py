@@ -0,0 +1,340 @@
+"""
+Sharded Server Supervisor
+Spreads rooms over several worker processes so one server can use every
+CPU core despite the GIL.
+
+The supervisor owns the listening socket. It reads each new client's
+handshake, picks the worker that owns the requested room (a stable hash
+of the room name, so all players of a room meet in the same process) and
+passes the socket to that worker over a Unix socket with SCM_RIGHTS.
+Workers run the usual event loop on the sockets they are handed, report
+their stats and metrics every second and are restarted if they die.
+
+A client_id may only be connected once across all workers: the
+supervisor reserves it at handoff and rejects duplicates itself, and
+workers report the client_ids whose sockets closed so they are freed.
+"""
+
+import json
+import multiprocessing
+import os
+import selectors
+import signal
+import socket
+import time
+import zlib
+
+from game.multiplayer.framing import MAX_CLIENT_FRAME_SIZE, FrameReader, encode_frame
+from game.multiplayer.protocol import validate_handshake
+from library.log import get_logger, shutdown_logging
+from library.trace import dump_on_signal
+from server.metrics import MetricsDumper, render as render_metrics
+from server.room import room_name
+
+log = get_logger("server")
+net_log = get_logger("server.net")
+
+HAS_FD_PASSING = hasattr(socket, "send_fds") and hasattr(socket, "AF_UNIX")
+MAX_HANDSHAKE_BYTES = 64 * 1024
+MAX_HANDOFF_SIZE = MAX_HANDSHAKE_BYTES + 1024
+MAX_REPORT_SIZE = 64 * 1024  # Largest message a worker sends the supervisor
+MAX_DEPARTURES = 100         # client_ids per departure report, well under MAX_REPORT_SIZE
+STATS_INTERVAL = 10.0       # Seconds between aggregated stats lines
+RESTART_DELAY = 1.0         # Minimum seconds between restarts of one worker
+
+
+def worker_for(room, workers):
+    """Index of the worker that owns a room."""
+    return zlib.crc32(room.encode("utf-8")) % workers
+
+
+def encode_handoff(addr, client_id, data):
+    """Message sent along with a client socket: its address, reserved client_id and the bytes already read."""
+    return json.dumps({"addr": list(addr[:2]), "client_id": client_id}).encode() + b"\n" + data
+
+
+def decode_handoff(message):
+    """
+    Returns:
+        tuple: (addr, client_id or None, bytes already read from the socket)
+    """
+    header, data = message.split(b"\n", 1)
+    header = json.loads(header)
+    return tuple(header["addr"]), header.get("client_id"), data
+
+
+def run_worker(server_config, index, channel, inherited):
+    """
+    Worker process entry point: serve handed-over sockets with an event loop.
+
+    Args:
+        server_config: ServerConfig shared by every worker
+        index: Worker number, for logs and stats
+        channel: Worker end of the supervisor's Unix socket pair
+        inherited: Sockets forked from the supervisor that this worker must not hold
+    """
+    for sock in inherited:
+        sock.close()
+    # Imported here: game_server imports this module for the launcher
+    from server.game_server import GameServer
+    from server.event_loop import EventLoop
+
+    # Replace the supervisor's handler, which would pass the signal on again
+    dump_on_signal()
+    game_server = GameServer(server_config, listen=False)
+    game_server.supervisor = channel
+    game_server.worker_index = index
+    channel.setblocking(False)
+    log.info(f"[WORKER {index}] Started (pid {os.getpid()})")
+    try:
+        EventLoop(game_server).run()
+    except KeyboardInterrupt:
+        pass
+    log.info(f"[WORKER {index}] Stopped")
+    # The process ends with os._exit, which skips atexit: write out the queued lines now
+    shutdown_logging()
+
+
+class Worker:
+    """Supervisor-side handle of one worker process."""
+
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.channel = None  # Supervisor end of the socket pair
+        self.started = 0.0
+        self.stats = {}      # Latest report from the worker
+
+
+class Supervisor:
+    """Hands clients to worker processes by room and keeps the workers running."""
+
+    def __init__(self, server_config, listener, count):
+        """
+        Args:
+            server_config: ServerConfig passed on to every worker
+            listener: Bound, listening server socket
+            count: Number of worker processes
+        """
+        self.server_config = server_config
+        self.listener = listener
+        self.workers = [Worker(index) for index in range(count)]
+        self.selector = selectors.DefaultSelector()
+        self.pending = {}  # {socket: (addr, FrameReader, deadline)} waiting for a handshake
+        self.client_ids = {}  # {client_id: worker index} of every client handed to a worker and not yet gone
+        self.context = multiprocessing.get_context("fork")
+        self.metrics_dumper = MetricsDumper(server_config.metrics_file, server_config.metrics_interval)
+
+    def run(self):
+        """Serve until interrupted, then stop every worker."""
+        self.listener.setblocking(False)
+        self.selector.register(self.listener, selectors.EVENT_READ, data="listener")
+        for worker in self.workers:
+            self._start(worker)
+        next_check = time.monotonic() + 1.0
+        next_stats = time.monotonic() + STATS_INTERVAL
+        try:
+            while True:
+                for key, _ in self.selector.select(timeout=1.0):
+                    if key.data == "listener":
+                        self._accept()
+                    elif isinstance(key.data, Worker):
+                        self._read_report(key.data)
+                    else:
+                        self._read_handshake(key.fileobj)
+                now = time.monotonic()
+                if now >= next_check:
+                    self._check_workers()
+                    self._expire_handshakes(now)
+                    next_check = now + 1.0
+                if now >= next_stats:
+                    self._print_stats()
+                    next_stats = now + STATS_INTERVAL
+                self.metrics_dumper.maybe_dump(now, self.metrics_text)
+        finally:
+            self._stop()
+
+    def _start(self, worker):
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        # The child closes every supervisor-side socket it inherits through fork
+        inherited = [self.listener, parent_end] + [w.channel for w in self.workers if w.channel is not None]
+        inherited.extend(self.pending)
+        worker.process = self.context.Process(
+            target=run_worker,
+            args=(self.server_config, worker.index, child_end, inherited),
+            daemon=True
+        )
+        worker.process.start()
+        child_end.close()
+        # A busy or hung worker must never block the supervisor, and with it every other worker
+        parent_end.setblocking(False)
+        worker.channel = parent_end
+        worker.started = time.monotonic()
+        worker.stats = {}
+        self.selector.register(parent_end, selectors.EVENT_READ, data=worker)
+
+    def _check_workers(self):
+        """Restart workers that exited, at most once per RESTART_DELAY each."""
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.process.is_alive() or now - worker.started < RESTART_DELAY:
+                continue
+            log.warning(f"[WORKER {worker.index}] Exited with code {worker.process.exitcode}, restarting")
+            self._release(worker)
+            try:
+                self.selector.unregister(worker.channel)
+            except (KeyError, ValueError):
+                pass
+            worker.channel.close()
+            worker.process.join()
+            self._start(worker)
+
+    def _stop(self):
+        for conn in list(self.pending):
+            self._drop(conn)
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=2)
+            if worker.channel is not None:
+                worker.channel.close()
+        self.selector.close()
+
+    def _accept(self):
+        try:
+            conn, addr = self.listener.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        conn.setblocking(False)
+        deadline = time.monotonic() + self.server_config.handshake_timeout
+        self.pending[conn] = (addr, FrameReader(max_frame_size=MAX_CLIENT_FRAME_SIZE), deadline)
+        self.selector.register(conn, selectors.EVENT_READ, data=None)
+
+    def _read_handshake(self, conn):
+        addr, reader, _ = self.pending[conn]
+        try:
+            count = reader.recv_from(conn)
+            messages = reader.messages() if count else []
+        except (BlockingIOError, InterruptedError):
+            return
+        except (OSError, ValueError) as e:
+            net_log.warning(f"[ERROR] Handshake from {addr}: {e}")
+            self._drop(conn)
+            return
+        if not count:
+            self._drop(conn)
+            return
+        if not messages:
+            if len(reader.unread()) > MAX_HANDSHAKE_BYTES:
+                net_log.info(f"[REJECTED] Connection from {addr} - Handshake too large")
+                self._drop(conn)
+            return
+        try:
+            handshake = validate_handshake(json.loads(messages[0]))
+            room = room_name(handshake)
+        except ValueError as e:
+            net_log.warning(f"[ERROR] Handshake from {addr}: {e}")
+            self._drop(conn)
+            return
+        client_id = handshake.get("client_id")
+        if client_id and client_id in self.client_ids:
+            net_log.info(f"[REJECTED] Connection from {addr} - Client ID already connected: {client_id}")
+            try:
+                conn.send(encode_frame(json.dumps({"error": "CLIENT_ALREADY_CONNECTED"}).encode()))
+            except OSError:
+                pass
+            self._drop(conn)
+            return
+        data = b"".join(encode_frame(message) for message in messages) + reader.unread()
+        worker = self.workers[worker_for(room, len(self.workers))]
+        try:
+            socket.send_fds(worker.channel, [encode_handoff(addr, client_id, data)], [conn.fileno()])
+        except (BlockingIOError, InterruptedError):
+            net_log.warning(f"[REJECTED] Connection from {addr} - Worker {worker.index} is not taking clients")
+        except OSError as e:
+            log.error(f"[ERROR] Failed to hand {addr} to worker {worker.index}: {e}")
+        else:
+            if client_id:
+                self.client_ids[client_id] = worker.index
+        # The worker holds its own copy of the socket if the handoff went through
+        self._drop(conn)
+
+    def _expire_handshakes(self, now):
+        for conn, (addr, _, deadline) in list(self.pending.items()):
+            if now >= deadline:
+                net_log.info(f"[REJECTED] Connection from {addr} - No handshake within {self.server_config.handshake_timeout}s")
+                self._drop(conn)
+
+    def _drop(self, conn):
+        self.pending.pop(conn, None)
+        try:
+            self.selector.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
+
+    def _read_report(self, worker):
+        """Read a worker's stats or the client_ids that left it."""
+        try:
+            message, _, flags, _ = worker.channel.recvmsg(MAX_REPORT_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            message = b""
+        if not message:
+            # Worker went away; _check_workers restarts it
+            self.selector.unregister(worker.channel)
+            return
+        if flags & socket.MSG_TRUNC:
+            log.warning(f"[WARNING] Worker {worker.index} sent a report over {MAX_REPORT_SIZE} bytes, dropped")
+            return
+        try:
+            report = json.loads(message)
+        except ValueError as e:
+            log.warning(f"[WARNING] Unreadable report from worker {worker.index}: {e}")
+            return
+        if "left" in report:
+            for client_id in report["left"]:
+                # Only the worker holding a client_id may free it
+                if self.client_ids.get(client_id) == worker.index:
+                    del self.client_ids[client_id]
+        else:
+            worker.stats = report
+
+    def _release(self, worker):
+        """Free the client_ids of a worker that died, whose sockets died with it."""
+        for client_id, index in list(self.client_ids.items()):
+            if index == worker.index:
+                del self.client_ids[client_id]
+
+    def metrics_text(self):
+        """Every worker's latest metrics, labelled by worker, in Prometheus text format."""
+        alive = sum(1 for worker in self.workers if worker.process is not None and worker.process.is_alive())
+        samples = [("dash_workers_alive", {}, alive)]
+        for worker in self.workers:
+            for name, labels, value in worker.stats.get("metrics", ()):
+                samples.append((name, {"worker": str(worker.index), **labels}, value))
+        return render_metrics(samples)
+
+    def signal_workers(self):
+        """Ask every worker to dump its trace (they each keep their own)."""
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                try:
+                    os.kill(worker.process.pid, signal.SIGUSR1)
+                except OSError:
+                    pass
+
+    def _print_stats(self):
+        alive = sum(1 for worker in self.workers if worker.process.is_alive())
+        reports = [worker.stats for worker in self.workers if worker.stats]
+        rooms = sum(stats["rooms"] for stats in reports)
+        players = sum(stats["players"] for stats in reports)
+        ticks = sum(stats["ticks"] for stats in reports)
+        tick_seconds = sum(stats["tick_seconds"] for stats in reports)
+        busiest = max((stats["tick_seconds"] / stats["interval"] for stats in reports if stats["interval"]), default=0.0)
+        average = tick_seconds / ticks * 1000 if ticks else 0.0
+        log.info(f"[STATS] Workers: {alive}/{len(self.workers)}, Rooms: {rooms}, Players: {players}, "
+                 f"Tick: {average:.2f} ms avg, Busiest worker: {busiest * 100:.0f}% ticking")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the game packages the same way the scripts in benchmarks/ do
+sys.path.insert(0, str(Path(__file__).parent.parent))
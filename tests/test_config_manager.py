@@ -0,0 +1,40 @@
+"""Hand-edited settings.yaml values are brought back into range on load."""
+
+import pytest
+import yaml
+
+from config.defaults import CONSTRAINTS
+from library.config_manager import ConfigManager
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(ConfigManager, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(ConfigManager, "CONFIG_FILE", tmp_path / "settings.yaml")
+    return tmp_path / "settings.yaml"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (0, CONSTRAINTS["input_rate"]["min"]),
+    (-5, CONSTRAINTS["input_rate"]["min"]),
+    (100000, CONSTRAINTS["input_rate"]["max"]),
+    ("fast", 30),
+    (None, 30),
+    (float("inf"), 30),
+    (60, 60),
+])
+def test_input_rate_is_clamped(settings_file, value, expected):
+    settings_file.write_text(yaml.safe_dump({"multiplayer": {"input_rate": value}}))
+    assert ConfigManager().input_rate == expected
+
+
+def test_other_ranges_are_clamped(settings_file):
+    settings_file.write_text(yaml.safe_dump({
+        "singleplayer": {"speed": 0},
+        "multiplayer": {"max_players": 99, "interpolation_delay": -100}
+    }))
+    config = ConfigManager()
+    assert config.singleplayer_speed == CONSTRAINTS["speed"]["min"]
+    assert config.max_players == CONSTRAINTS["max_players"]["max"]
+    assert config.interpolation_delay == 0
+    assert config.multiplayer_speed == 10
@@ -0,0 +1,121 @@
+"""
+Framing tests: split, coalesced and oversized frames through FrameReader,
+from hand-cut chunks and over a real socket pair.
+"""
+
+import json
+import random
+import socket
+import threading
+
+import pytest
+
+from game.multiplayer.framing import HEADER, MAX_CLIENT_FRAME_SIZE, MAX_FRAME_SIZE, FrameError, FrameReader, encode_frame
+
+
+def make_snapshot(player_count):
+    """A players dict shaped like the server broadcast."""
+    return json.dumps({
+        str(pid): {"x": 400 + pid, "y": 300 - pid, "name": f"Player{pid}", "client_id": f"client-{pid:08d}"}
+        for pid in range(1, player_count + 1)
+    }).encode()
+
+
+def make_payloads(count, rng):
+    """Mostly small inputs with regular oversized snapshots mixed in."""
+    payloads = []
+    for i in range(count):
+        if i % 500 == 499:
+            payloads.append(make_snapshot(rng.choice((64, 512, 4096))))
+        else:
+            payloads.append(json.dumps({"movement": rng.randrange(16), "name": "Player", "seq": i}).encode())
+    return payloads
+
+
+def test_frame_split_across_reads():
+    payload = b'{"movement": 1, "seq": 7}'
+    reader = FrameReader()
+    stream = encode_frame(payload)
+    for byte in stream[:-1]:
+        reader.feed(bytes([byte]))
+        assert reader.messages() == []
+    reader.feed(stream[-1:])
+    assert reader.messages() == [payload]
+    assert reader.unread() == b""
+
+
+def test_coalesced_frames_come_out_in_order():
+    payloads = [b"first", b"", b"third" * 100]
+    reader = FrameReader()
+    reader.feed(b"".join(encode_frame(p) for p in payloads) + encode_frame(b"partial")[:6])
+    assert reader.messages() == payloads
+    assert reader.unread() == encode_frame(b"partial")[:6]
+
+
+def test_oversized_snapshot_grows_the_buffer():
+    snapshot = make_snapshot(4096)
+    assert len(snapshot) > 256 * 1024
+    reader = FrameReader(buffer_size=1024)
+    stream = encode_frame(b"before") + encode_frame(snapshot) + encode_frame(b"after")
+    received = []
+    for start in range(0, len(stream), 1000):
+        reader.feed(stream[start:start + 1000])
+        received.extend(reader.messages())
+    assert received == [b"before", snapshot, b"after"]
+
+
+def test_frame_over_the_limit_is_rejected():
+    with pytest.raises(FrameError):
+        encode_frame(bytes(MAX_FRAME_SIZE + 1))
+    reader = FrameReader()
+    reader.feed(HEADER.pack(MAX_FRAME_SIZE + 1))
+    with pytest.raises(FrameError):
+        reader.messages()
+
+
+def test_client_frame_limit():
+    reader = FrameReader(max_frame_size=MAX_CLIENT_FRAME_SIZE)
+    reader.feed(encode_frame(bytes(MAX_CLIENT_FRAME_SIZE)))
+    assert reader.messages() == [bytes(MAX_CLIENT_FRAME_SIZE)]
+    # Rejected from the header alone, before the payload is buffered
+    reader.feed(HEADER.pack(MAX_CLIENT_FRAME_SIZE + 1))
+    with pytest.raises(FrameError):
+        reader.messages()
+
+
+def test_random_splits():
+    rng = random.Random(1)
+    payloads = make_payloads(5000, rng)
+    stream = b"".join(encode_frame(p) for p in payloads)
+    reader = FrameReader(buffer_size=1024)
+    received = []
+    pos = 0
+    while pos < len(stream):
+        size = rng.choice((1, 3, 7, rng.randrange(1, 16384)))
+        reader.feed(stream[pos:pos + size])
+        pos += size
+        received.extend(reader.messages())
+    assert received == payloads
+
+
+def test_socket_pair():
+    payloads = make_payloads(5000, random.Random(2))
+    left, right = socket.socketpair()
+
+    def writer():
+        for payload in payloads:
+            left.sendall(encode_frame(payload))
+        left.shutdown(socket.SHUT_WR)
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    reader = FrameReader()
+    received = []
+    try:
+        while reader.recv_from(right):
+            received.extend(reader.messages())
+    finally:
+        thread.join()
+        left.close()
+        right.close()
+    assert received == payloads
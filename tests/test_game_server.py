@@ -0,0 +1,90 @@
+"""GameServer rooms, driven without the network loops."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from server.game_server import GameServer
+from server.server_config import ServerConfig
+
+
+@pytest.fixture
+def game_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(ServerConfig, "CONFIG_FILE", tmp_path / "server_config.yaml")
+    server = GameServer(ServerConfig(), listen=False)
+    yield server
+    for connection in list(server.connections.values()):
+        server.remove_player(connection.player_id)
+
+
+@pytest.fixture
+def connect(game_server):
+    """Register a player in a room over a loopback socket; returns (connection, client end)."""
+    listener = socket.create_server(("127.0.0.1", 0))
+    clients = []
+
+    def _connect(room, name):
+        client = socket.create_connection(listener.getsockname())
+        clients.append(client)
+        conn, addr = listener.accept()
+        connection = game_server.accept_player(conn, addr)
+        assert game_server.register_player(connection, {"name": name, "client_id": name, "room": room})
+        return connection, client
+
+    yield _connect
+    for client in clients:
+        client.close()
+    listener.close()
+
+
+def test_failing_room_is_closed_and_the_others_keep_ticking(game_server, connect, monkeypatch):
+    healthy, _ = connect("healthy", "a")
+    broken, broken_client = connect("broken", "b")
+    room = broken.room
+
+    def fail():
+        raise ValueError("Frame too large")
+
+    monkeypatch.setattr(room, "tick", fail)
+    frames = game_server.tick()
+    assert [frame[0] for frame in frames] == [healthy]
+    assert "broken" not in game_server.rooms
+    # The broken room's player is disconnected, the healthy one isn't
+    broken_client.settimeout(1.0)
+    while broken_client.recv(65536):
+        pass
+    assert [frame[0] for frame in game_server.tick()] == [healthy]
+
+
+def test_tick_loop_survives_a_failing_room(game_server, connect, monkeypatch):
+    healthy, healthy_client = connect("healthy", "a")
+    broken, _ = connect("broken", "b")
+
+    def fail():
+        raise ValueError("Frame too large")
+
+    monkeypatch.setattr(broken.room, "tick", fail)
+    # Also fail the broadcast once: the thread must log it and keep ticking
+    broadcast = game_server.broadcast
+    calls = []
+
+    def flaky_broadcast(frames):
+        calls.append(len(frames))
+        if len(calls) == 1:
+            raise OSError("Broadcast failed")
+        broadcast(frames)
+
+    monkeypatch.setattr(game_server, "broadcast", flaky_broadcast)
+    thread = threading.Thread(target=game_server.tick_loop, daemon=True)
+    thread.start()
+    try:
+        healthy_client.settimeout(1.0)
+        assert healthy_client.recv(65536)
+        time.sleep(0.2)
+        assert thread.is_alive() and len(calls) > 2
+        assert "broken" not in game_server.rooms
+    finally:
+        game_server.running = False
+        thread.join(timeout=2)
@@ -0,0 +1,37 @@
+"""What a worker reports to the supervisor must not grow with its players."""
+
+import json
+
+from server.connection import Connection
+from server.metrics import ServerMetrics, render
+from server.supervisor import MAX_REPORT_SIZE
+
+
+def collect(players):
+    metrics = ServerMetrics()
+    connections = []
+    for pid in range(1, players + 1):
+        connection = Connection(None, ("127.0.0.1", pid), pid, max_lag_ticks=2)
+        connection.rtt = pid / 1000
+        connections.append(connection)
+    metrics.collect(connections, [])
+    return metrics
+
+
+def test_report_leaves_out_per_player_samples():
+    metrics = collect(5000)
+    report = metrics.get_samples(per_player=False)
+    assert len(report) == len(collect(3).get_samples(per_player=False))
+    assert not [sample for sample in report if sample[0] == "dash_player_rtt_seconds"]
+    assert len(json.dumps({"metrics": report}).encode()) < MAX_REPORT_SIZE
+    assert len(metrics.get_samples()) == len(report) + 5000
+
+
+def test_rtt_summary():
+    samples = {(name, tuple(labels.items())): value for name, labels, value in collect(100).get_samples(per_player=False)}
+    assert samples[("dash_rtt_seconds", (("quantile", "0.5"),))] == 0.051
+    assert samples[("dash_rtt_seconds", (("quantile", "0.99"),))] == 0.1
+    assert samples[("dash_rtt_seconds_count", ())] == 100
+    assert abs(samples[("dash_rtt_seconds_sum", ())] - 5.05) < 1e-9
+    text = render(collect(0).get_samples(per_player=False))
+    assert "# TYPE dash_rtt_seconds summary\ndash_rtt_seconds_sum 0\ndash_rtt_seconds_count 0\n" in text
@@ -0,0 +1,114 @@
+"""Binary protocol round trips and the server's checks on client messages."""
+
+import math
+
+import pytest
+
+from game.constants import MOVE_DOWN, MOVE_RIGHT
+from game.multiplayer.protocol import (
+    MAX_CLIENT_ID, MAX_NAME_BYTES, MSG_DELTA, MSG_INPUT_ACK, MSG_NAME, MSG_PLAYER_INFO, MSG_PLAYER_LEFT, MSG_PONG, MSG_SNAPSHOT,
+    ProtocolError, decode_client_message, decode_server_message, encode_ack, encode_delta, encode_input,
+    encode_input_ack, encode_name, encode_ping, encode_player_info, encode_player_left, encode_pong,
+    encode_snapshot, validate_client_message, validate_handshake
+)
+
+
+def test_client_messages_round_trip():
+    assert decode_client_message(encode_input(42, MOVE_DOWN | MOVE_RIGHT)) == {"seq": 42, "movement": MOVE_DOWN | MOVE_RIGHT}
+    assert decode_client_message(encode_name("Zoë")) == {"name": "Zoë"}
+    assert decode_client_message(encode_ack(2 ** 32 - 1)) == {"ack": 2 ** 32 - 1}
+    assert decode_client_message(encode_ping(12.5)) == {"ping": 12.5}
+
+
+def test_long_names_are_cut_on_a_character_boundary():
+    name = "é" * MAX_NAME_BYTES
+    decoded = decode_client_message(encode_name(name))["name"]
+    assert len(decoded.encode("utf-8")) <= MAX_NAME_BYTES
+    assert set(decoded) == {"é"}
+
+
+@pytest.mark.parametrize("payload", [b"", b"\x01\x00", b"\x7f", encode_ack(1) + b"\x00"])
+def test_bad_client_messages_raise(payload):
+    with pytest.raises(ProtocolError):
+        decode_client_message(payload)
+
+
+def test_server_messages_round_trip():
+    positions = [(1, 10.5, 20.25), (65535, -3.0, 0.0)]
+    assert decode_server_message(encode_snapshot(7, positions)) == (MSG_SNAPSHOT, (7, positions))
+    assert decode_server_message(encode_delta(9, 7, positions[:1], [4, 5])) == (MSG_DELTA, (9, 7, positions[:1], [4, 5]))
+    assert decode_server_message(encode_delta(9, 7, [], [])) == (MSG_DELTA, (9, 7, [], []))
+    assert decode_server_message(encode_player_info(3, "bob")) == (MSG_PLAYER_INFO, (3, "bob"))
+    assert decode_server_message(encode_player_left(3)) == (MSG_PLAYER_LEFT, 3)
+    assert decode_server_message(encode_input_ack(9, 12, 70000)) == (MSG_INPUT_ACK, (9, 12, 0xFFFF))
+    assert decode_server_message(encode_pong(1.5, 2.5, 3.5, 9)) == (MSG_PONG, (1.5, 2.5, 3.5, 9))
+
+
+@pytest.mark.parametrize("payload", [
+    b"",
+    encode_snapshot(1, [(1, 0.0, 0.0)])[:-1],
+    encode_delta(1, 0, [(1, 0.0, 0.0)], [2]) + b"\x00",
+    encode_pong(1.0, 2.0, 3.0, 4)[:-2],
+    b"\x99",
+])
+def test_bad_server_messages_raise(payload):
+    with pytest.raises(ProtocolError):
+        decode_server_message(payload)
+
+
+def test_valid_handshake_and_messages_pass():
+    handshake = {"name": "bob", "client_id": "abc", "room": "r", "create": True, "protocol": 3, "movement": 0,
+                 "max_players": 4}
+    assert validate_handshake(handshake) is handshake
+    for message in ({"seq": 1, "movement": 15, "name": "bob", "client_id": "abc"}, {"ack": 0}, {"ping": 1.5}):
+        assert validate_client_message(message) is message
+
+
+@pytest.mark.parametrize("handshake", [
+    [1, 2],
+    "hello",
+    {"name": 5},
+    {"client_id": ["x"]},
+    {"client_id": "x" * (MAX_CLIENT_ID + 1)},
+    {"room": {"a": 1}},
+    {"create": "yes"},
+    {"max_players": 1e999},
+    {"max_players": "4"},
+    {"max_players": True},
+    {"name": "x" * (MAX_NAME_BYTES + 1)},
+    {"name": "é" * (MAX_NAME_BYTES // 2 + 1)},
+])
+def test_bad_handshakes_are_rejected(handshake):
+    with pytest.raises(ProtocolError):
+        validate_handshake(handshake)
+
+
+@pytest.mark.parametrize("message", [
+    [1, 2],
+    None,
+    {"ack": "x"},
+    {"ack": -1},
+    {"seq": 1.5, "movement": 1},
+    {"seq": True, "movement": 1},
+    {"seq": 1, "movement": "x"},
+    {"seq": 1, "movement": 16},
+    {"seq": 1, "movement": -1},
+    {"name": 5},
+    {"name": "x" * 3_000_000},
+    {"ping": "x"},
+    {"ping": math.nan},
+])
+def test_bad_client_messages_are_rejected(message):
+    with pytest.raises(ProtocolError):
+        validate_client_message(message)
+
+
+def test_binary_movement_outside_the_flags_is_rejected():
+    with pytest.raises(ProtocolError):
+        validate_client_message(decode_client_message(encode_input(1, 200)))
+
+
+def test_oversized_binary_name_is_rejected():
+    assert decode_client_message(encode_name("x" * MAX_NAME_BYTES)) == {"name": "x" * MAX_NAME_BYTES}
+    with pytest.raises(ProtocolError):
+        decode_client_message(bytes([MSG_NAME]) + b"x" * (MAX_NAME_BYTES + 1))
@@ -0,0 +1,48 @@
+"""server_config.yaml values are checked when the server starts."""
+
+import pytest
+import yaml
+
+from server.server_config import DEFAULT_SERVER_CONFIG, ServerConfig
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "server_config.yaml"
+    monkeypatch.setattr(ServerConfig, "CONFIG_FILE", path)
+    return path
+
+
+def test_defaults_are_valid(config_file):
+    assert ServerConfig().config == DEFAULT_SERVER_CONFIG
+    assert config_file.exists()
+
+
+@pytest.mark.parametrize("key, value", [
+    ("tick_rate", 0),
+    ("keyframe_interval", -1),
+    ("max_lag_ticks", 2.5),
+    ("max_players", "8"),
+    ("workers", -1),
+    ("heartbeat_timeout", 0),
+    ("handshake_timeout", ".5"),
+    ("metrics_interval", None),
+    ("port", 70000),
+    ("metrics_port", True),
+    ("interest_radius", float("nan")),
+    ("mode", "evented"),
+    ("log_level", "info"),
+    ("log_format", "xml"),
+    ("host", 127001),
+])
+def test_bad_values_stop_the_server(config_file, key, value):
+    config_file.write_text(yaml.safe_dump({**DEFAULT_SERVER_CONFIG, key: value}))
+    with pytest.raises(SystemExit, match=key):
+        ServerConfig()
+
+
+def test_good_values_load(config_file):
+    changes = {"heartbeat_timeout": 2.5, "workers": 4, "mode": "sharded", "player_speed": 0, "metrics_port": 9100}
+    config_file.write_text(yaml.safe_dump({**DEFAULT_SERVER_CONFIG, **changes}))
+    config = ServerConfig().config
+    assert {key: config[key] for key in changes} == changes
@@ -0,0 +1,105 @@
+"""SnapshotHistory keyframes and deltas, applied the way NetworkClient applies them."""
+
+import json
+
+import pytest
+
+from game.multiplayer.client import NetworkClient
+from game.multiplayer.framing import HEADER
+from game.multiplayer.protocol import (
+    BINARY_VERSION, MSG_DELTA, MSG_SNAPSHOT, PROTOCOL_JSON, decode_server_message
+)
+from server.snapshots import SnapshotHistory
+
+
+def unframe(frame):
+    (length,) = HEADER.unpack_from(frame)
+    assert length == len(frame) - HEADER.size
+    return frame[HEADER.size:]
+
+
+def apply(client, protocol, frame):
+    """Decode one frame and apply it with the client's own snapshot code."""
+    payload = unframe(frame)
+    if protocol == BINARY_VERSION:
+        msg_type, data = decode_server_message(payload)
+        if msg_type == MSG_SNAPSHOT:
+            return client._apply_snapshot(data[0], None, {str(pid): (x, y, None) for pid, x, y in data[1]}, [])
+        assert msg_type == MSG_DELTA
+        return client._apply_snapshot(data[0], data[1], {str(pid): (x, y, None) for pid, x, y in data[2]}, data[3])
+    data = json.loads(payload)
+    players = {pid: (p["x"], p["y"], p["name"]) for pid, p in data["players"].items()}
+    return client._apply_snapshot(data["tick"], data["base"], players, data["removed"])
+
+
+def positions(state):
+    return {str(pid): (x, y) for pid, (x, y, *_) in state.items()}
+
+
+def worlds():
+    """Ticks of a small world where players move, join and leave."""
+    world = {1: (10.0, 10.0, "a"), 2: (20.0, 20.0, "b"), 3: (30.0, 30.0, "c")}
+    states = [dict(world)]
+    world[1] = (15.0, 10.0, "a")
+    states.append(dict(world))
+    world[4] = (40.0, 40.0, "d")
+    del world[2]
+    states.append(dict(world))
+    world[3] = (30.0, 30.0, "c renamed")
+    states.append(dict(world))
+    states.append(dict(world))
+    return states
+
+
+@pytest.mark.parametrize("protocol", [PROTOCOL_JSON, BINARY_VERSION])
+def test_deltas_rebuild_every_tick(protocol):
+    history = SnapshotHistory(keyframe_interval=100, length=10)
+    client = NetworkClient()
+    ack = None
+    for tick, state in enumerate(worlds(), start=1):
+        history.record(tick, state)
+        assert apply(client, protocol, history.frame_for(protocol, ack)) == tick
+        rebuilt = client.snapshots[tick]
+        assert positions(rebuilt) == positions(state)
+        if protocol == PROTOCOL_JSON:
+            assert {pid: entity[2] for pid, entity in rebuilt.items()} == {str(pid): e[2] for pid, e in state.items()}
+        ack = tick
+
+
+def test_delta_only_carries_changes():
+    history = SnapshotHistory(keyframe_interval=100, length=10)
+    states = worlds()
+    history.record(1, states[0])
+    history.record(2, states[1])
+    msg_type, (tick, base, changed, removed) = decode_server_message(unframe(history.frame_for(BINARY_VERSION, 1)))
+    assert (msg_type, tick, base, changed, removed) == (MSG_DELTA, 2, 1, [(1, 15.0, 10.0)], [])
+    history.record(3, states[2])
+    _, (_, _, changed, removed) = decode_server_message(unframe(history.frame_for(BINARY_VERSION, 2)))
+    assert changed == [(4, 40.0, 40.0)] and removed == [2]
+
+
+def test_keyframe_when_the_ack_is_unusable():
+    history = SnapshotHistory(keyframe_interval=4, length=3)
+    for tick in range(1, 9):
+        history.record(tick, {1: (float(tick), 0.0, "a")})
+    # Keyframe tick, unknown ack and an ack that fell out of the history all get keyframes
+    assert decode_server_message(unframe(history.frame_for(BINARY_VERSION, 7)))[0] == MSG_SNAPSHOT
+    history.record(9, {1: (9.0, 0.0, "a")})
+    assert decode_server_message(unframe(history.frame_for(BINARY_VERSION, None)))[0] == MSG_SNAPSHOT
+    assert decode_server_message(unframe(history.frame_for(BINARY_VERSION, 2)))[0] == MSG_SNAPSHOT
+    assert decode_server_message(unframe(history.frame_for(BINARY_VERSION, 8)))[0] == MSG_DELTA
+
+
+def test_clients_with_the_same_ack_share_a_frame():
+    history = SnapshotHistory(keyframe_interval=100, length=10)
+    history.record(1, {1: (0.0, 0.0, "a")})
+    history.record(2, {1: (1.0, 0.0, "a")})
+    assert history.frame_for(BINARY_VERSION, 1) is history.frame_for(BINARY_VERSION, 1)
+    assert history.frame_for(BINARY_VERSION, 1) is not history.frame_for(PROTOCOL_JSON, 1)
+
+
+def test_client_skips_a_delta_with_an_unknown_base():
+    history = SnapshotHistory(keyframe_interval=100, length=10)
+    history.record(1, {1: (0.0, 0.0, "a")})
+    history.record(2, {1: (1.0, 0.0, "a")})
+    assert apply(NetworkClient(), BINARY_VERSION, history.frame_for(BINARY_VERSION, 1)) is None